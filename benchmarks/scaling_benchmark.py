@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+End-to-end scaling benchmark for the GPS pipeline
+
+Generates synthetic collar datasets (see utils/synthetic_tracks.py) for a
+matrix of bird counts and points per bird, then times and memory-profiles
+each pipeline stage:
+
+- load:      DataLoader.load_all_csv_files
+- filter:    PerformanceOptimizer.filter_by_time_step
+- proximity: ProximityEngine.analyze_proximity
+- frames:    TrailSystem.create_frames_with_trail (or the browser payload of --output-mode indexed/player);
+             --frame-construction compares graph objects with validated / unvalidated frame dicts
+- html:      write_animation_html (streamed compact figure JSON + fullscreen assets [+ browser runtime / chunk files]);
+             --compare-encoding also reports the size and write time saved against plain fig.to_html JSON
+             --asset-mode shared references the output folder's plotly.js / runtime bundle instead of embedding it
+- export:    export_animation_video (MP4, needs kaleido/ffmpeg; off by default)
+
+Stages run in order and feed each other. Results are written as JSON.
+
+Usage:
+    python benchmarks/scaling_benchmark.py --birds 2 4 --points 1000 10000 --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import traceback
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from utils.synthetic_tracks import SyntheticTrackConfig, generate_dataset
+from utils.animation_timeline import AnimationTimeline, add_timeline_columns
+
+
+DEFAULT_STAGES = ['load', 'filter', 'proximity', 'frames', 'html']
+
+# Stages whose cost grows faster than linearly are skipped above these sizes
+# (points per bird) unless overridden with --limit STAGE=POINTS
+DEFAULT_POINT_LIMITS = {
+    'proximity': 20_000,
+}
+
+
+class BenchmarkContext:
+    """State passed from stage to stage for one dataset"""
+
+    def __init__(self, data_dir: str, work_dir: str, args: argparse.Namespace):
+        self.data_dir = data_dir
+        self.work_dir = work_dir
+        self.args = args
+        self.dataframes: List[pd.DataFrame] = []
+        self.filtered: List[pd.DataFrame] = []
+        self.frame_df: Optional[pd.DataFrame] = None
+        self.figure = None
+        self.client_output: Optional[Dict] = None
+        self.html_path: Optional[str] = None
+
+
+def stage_load(ctx: BenchmarkContext) -> Dict:
+    from core.gps_utils import DataLoader
+    ctx.dataframes = DataLoader(ctx.data_dir).load_all_csv_files()
+    return {'files': len(ctx.dataframes), 'rows': int(sum(len(df) for df in ctx.dataframes))}
+
+
+def stage_filter(ctx: BenchmarkContext) -> Dict:
+    from utils.performance_optimizer import PerformanceOptimizer
+    ctx.filtered = [
+        PerformanceOptimizer.filter_by_time_step(df, ctx.args.time_step) for df in ctx.dataframes
+    ]
+    return {'rows': int(sum(len(df) for df in ctx.filtered)), 'time_step_seconds': ctx.args.time_step}
+
+
+def stage_proximity(ctx: BenchmarkContext) -> Dict:
+    from core.analysis.proximity_engine import ProximityEngine
+    engine = ProximityEngine(proximity_threshold_km=ctx.args.proximity_km)
+    engine.load_dataframes(ctx.filtered or ctx.dataframes)
+    events = engine.analyze_proximity()
+    return {'events': len(events)}
+
+
+def _prepare_frame_data(ctx: BenchmarkContext) -> pd.DataFrame:
+    """Combine filtered tracks the way VisualizationManager does"""
+    frames = []
+    for df in ctx.filtered or ctx.dataframes:
+        df = df.copy()
+        df['Velocity'] = 0.0
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    add_timeline_columns(df)
+    return df.sort_values('Timestamp [UTC]')
+
+
+def stage_frames(ctx: BenchmarkContext) -> Dict:
+    from utils.user_interface import UserInterface
+    from utils.animation_builders import build_color_map, create_base_figure, attach_animation
+    from core.data.trail_system import TrailSystem
+    from utils.parallel_frames import resolve_workers
+
+    df = _prepare_frame_data(ctx)
+    vulture_ids = df['vulture_id'].unique()
+    color_map = build_color_map(vulture_ids)
+    unique_times = AnimationTimeline.from_dataframe(df)
+    if ctx.args.max_frames and len(unique_times) > ctx.args.max_frames:
+        unique_times = unique_times[:ctx.args.max_frames]
+
+    trail_system = TrailSystem(UserInterface())
+    trail_system.trail_length_minutes = ctx.args.trail_minutes
+    fig = create_base_figure(vulture_ids, color_map, strategy=ctx.args.strategy)
+    if ctx.args.output_mode == 'frames' and ctx.args.frame_construction == 'objects':
+        # Reference: graph objects per frame, validated again on assignment
+        frames = trail_system.create_frames_with_trail(df, list(vulture_ids), color_map, unique_times,
+                                                       enable_prominent_time_display=False,
+                                                       strategy=ctx.args.strategy,
+                                                       max_workers=ctx.args.frame_workers)
+        fig.frames = frames
+        ctx.client_output = None
+    else:
+        ctx.client_output = attach_animation(
+            fig,
+            output_mode=ctx.args.output_mode,
+            chunk_frames=ctx.args.chunk_frames,
+            max_workers=ctx.args.frame_workers,
+            validate_frames=ctx.args.frame_construction != 'raw',
+            trail_system=trail_system,
+            df=df,
+            vulture_ids=vulture_ids,
+            color_map=color_map,
+            unique_times=unique_times,
+            strategy=ctx.args.strategy,
+        )
+    ctx.frame_df = df
+    ctx.figure = fig
+    ctx.unique_times = unique_times
+    return {'frames': len(unique_times), 'strategy': ctx.args.strategy, 'output_mode': ctx.args.output_mode,
+            'frame_workers': resolve_workers(ctx.args.frame_workers),
+            'frame_construction': ctx.args.frame_construction}
+
+
+def _best_write_seconds(fig, path: str, client_output: Optional[Dict], repeats: int, **options) -> float:
+    from utils.animation_builders import write_animation_html
+
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        write_animation_html(fig, path, client_output=client_output, **options)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def stage_html(ctx: BenchmarkContext) -> Dict:
+    from utils.animation_builders import (
+        CLIENT_PLAYBACK_MODES, apply_standard_layout, apply_controls_and_slider,
+    )
+    from utils.shared_assets import SHARED_ASSETS_DIR
+    from core.gps_utils import VisualizationHelper
+
+    fig = ctx.figure
+    map_cfg = VisualizationHelper.calculate_map_bounds(ctx.frame_df)
+    apply_standard_layout(fig, center_lat=map_cfg['center']['lat'], center_lon=map_cfg['center']['lon'],
+                          zoom_level=map_cfg['zoom'])
+    apply_controls_and_slider(fig, unique_times=ctx.unique_times, frame_duration_ms=800,
+                              center_lat=map_cfg['center']['lat'], center_lon=map_cfg['center']['lon'],
+                              zoom_level=map_cfg['zoom'],
+                              client_playback=ctx.args.output_mode in CLIENT_PLAYBACK_MODES,
+                              trail_options=[None] + sorted({30, 120, ctx.args.trail_minutes}),
+                              trail_minutes=ctx.args.trail_minutes)
+    ctx.html_path = os.path.join(ctx.work_dir, 'benchmark_animation.html')
+    decimals = None if ctx.args.coordinate_decimals < 0 else ctx.args.coordinate_decimals
+    # Best of two writes when comparing, so neither encoding pays the first write's warm-up
+    repeats = 2 if ctx.args.compare_encoding else 1
+    seconds = _best_write_seconds(fig, ctx.html_path, ctx.client_output, repeats, coordinate_decimals=decimals,
+                                  asset_mode=ctx.args.asset_mode)
+    metrics = {'html_bytes': os.path.getsize(ctx.html_path), 'write_seconds': round(seconds, 4)}
+    if ctx.args.compare_encoding:
+        # Same figure with plain fig.to_html JSON: size and write time saved by the compact encoding
+        plain_path = os.path.join(ctx.work_dir, 'benchmark_animation_plain.html')
+        plain_seconds = _best_write_seconds(fig, plain_path, ctx.client_output, repeats, compact=False,
+                                            asset_mode=ctx.args.asset_mode)
+        metrics['plain_html_bytes'] = os.path.getsize(plain_path)
+        metrics['plain_write_seconds'] = round(plain_seconds, 4)
+        metrics['saved_bytes'] = metrics['plain_html_bytes'] - metrics['html_bytes']
+        metrics['saved_seconds'] = round(plain_seconds - metrics['write_seconds'], 4)
+    chunk_dir = os.path.join(ctx.work_dir, 'benchmark_animation_chunks')
+    if os.path.isdir(chunk_dir):
+        names = os.listdir(chunk_dir)
+        metrics['chunk_files'] = len(names)
+        metrics['chunk_bytes'] = sum(os.path.getsize(os.path.join(chunk_dir, n)) for n in names)
+    asset_dir = os.path.join(ctx.work_dir, SHARED_ASSETS_DIR)
+    if os.path.isdir(asset_dir):
+        # Written once per output folder, shared by every HTML file in it
+        metrics['shared_asset_bytes'] = sum(os.path.getsize(os.path.join(asset_dir, n)) for n in os.listdir(asset_dir))
+    return metrics
+
+
+def stage_export(ctx: BenchmarkContext) -> Dict:
+    from core.export.video_export import export_animation_video
+    if ctx.client_output is not None and 'frames' in ctx.client_output:
+        ctx.figure.frames = ctx.client_output['frames']
+    out = export_animation_video(ctx.figure, os.path.join(ctx.work_dir, 'benchmark_animation.mp4'),
+                                 fps=30, width=640, height=360)
+    return {'video_bytes': os.path.getsize(out) if out and os.path.exists(str(out)) else 0}
+
+
+STAGES: Dict[str, Callable[[BenchmarkContext], Dict]] = {
+    'load': stage_load,
+    'filter': stage_filter,
+    'proximity': stage_proximity,
+    'frames': stage_frames,
+    'html': stage_html,
+    'export': stage_export,
+}
+
+
+def run_stage(name: str, ctx: BenchmarkContext, profile_memory: bool = True) -> Dict:
+    """Run one stage and return timing, peak traced memory and stage metrics"""
+    result = {'stage': name, 'status': 'ok'}
+    if profile_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result['metrics'] = STAGES[name](ctx)
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+    result['seconds'] = round(time.perf_counter() - start, 4)
+    if profile_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_mb'] = round(peak / 1e6, 2)
+    return result
+
+
+def run_matrix(args: argparse.Namespace) -> Dict:
+    """Run every stage for every (birds, points) combination"""
+    limits = dict(DEFAULT_POINT_LIMITS)
+    for item in args.limit or []:
+        stage, _, points = item.partition('=')
+        limits[stage] = int(points)
+
+    results = []
+    for birds in args.birds:
+        for points in args.points:
+            duration_hours = (points - 1) * args.interval / 3600.0
+            cfg = SyntheticTrackConfig(
+                n_birds=birds,
+                duration_hours=duration_hours,
+                fix_interval_seconds=args.interval,
+                encounters_per_day=args.encounters_per_day,
+                seed=args.seed,
+            )
+            work_dir = tempfile.mkdtemp(prefix='gps_bench_')
+            data_dir = os.path.join(work_dir, 'data')
+            try:
+                gen_start = time.perf_counter()
+                generate_dataset(data_dir, cfg)
+                gen_seconds = time.perf_counter() - gen_start
+                print(f"📦 {birds} birds x {points:,} points (generated in {gen_seconds:.1f}s)")
+
+                ctx = BenchmarkContext(data_dir, work_dir, args)
+                for stage in args.stages:
+                    if stage in limits and points > limits[stage]:
+                        entry = {'stage': stage, 'status': 'skipped',
+                                 'reason': f'points per bird above limit {limits[stage]:,}'}
+                    else:
+                        entry = run_stage(stage, ctx, profile_memory=not args.no_memory)
+                    entry.update({'birds': birds, 'points_per_bird': points,
+                                  'total_points': birds * points})
+                    results.append(entry)
+                    shown = f"{entry.get('seconds', 0):.2f}s" if entry['status'] == 'ok' else entry['status']
+                    print(f"   {stage:<10} {shown:>10}  {entry.get('metrics', entry.get('error', entry.get('reason', '')))}")
+            finally:
+                if not args.keep:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+                else:
+                    print(f"   📁 Kept benchmark files in {work_dir}")
+
+    import plotly
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'plotly': plotly.__version__,
+            'fix_interval_seconds': args.interval,
+            'time_step_seconds': args.time_step,
+            'trail_minutes': args.trail_minutes,
+            'max_frames': args.max_frames,
+            'output_mode': args.output_mode,
+            'chunk_frames': args.chunk_frames,
+            'frame_construction': args.frame_construction,
+            'coordinate_decimals': args.coordinate_decimals,
+            'asset_mode': args.asset_mode,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="GPS pipeline scaling benchmark")
+    parser.add_argument('--birds', type=int, nargs='+', default=[2], help="Bird counts to test")
+    parser.add_argument('--points', type=int, nargs='+', default=[1_000, 10_000],
+                        help="Points per bird to test")
+    parser.add_argument('--stages', nargs='+', default=DEFAULT_STAGES, choices=list(STAGES),
+                        help="Stages to run (in pipeline order)")
+    parser.add_argument('--interval', type=int, default=60, help="Synthetic fix interval in seconds")
+    parser.add_argument('--time-step', type=int, default=60, help="Filter time step in seconds")
+    parser.add_argument('--encounters-per-day', type=float, default=4.0)
+    parser.add_argument('--proximity-km', type=float, default=1.0)
+    parser.add_argument('--trail-minutes', type=int, default=120)
+    parser.add_argument('--strategy', default='markers_fade', choices=['markers_fade', 'line_head'])
+    parser.add_argument('--output-mode', default='frames', choices=['frames', 'indexed', 'player', 'chunked'],
+                        help="HTML output mode (see utils.animation_builders.OUTPUT_MODES)")
+    parser.add_argument('--chunk-frames', type=int, default=1000, help="Frames per chunk file (chunked mode)")
+    parser.add_argument('--frame-workers', type=int, default=None,
+                        help="Frame worker processes (default: FRAME_WORKERS or CPU count, 1 = serial)")
+    parser.add_argument('--frame-construction', default='validated', choices=['objects', 'validated', 'raw'],
+                        help="frames mode: graph objects per frame (previous behavior), frame dicts "
+                             "validated once, or frame dicts written unvalidated")
+    parser.add_argument('--coordinate-decimals', type=int, default=6,
+                        help="Coordinate decimals of the compact HTML encoding (-1 = full precision)")
+    parser.add_argument('--compare-encoding', action='store_true',
+                        help="Also write plain fig.to_html JSON and report the size and time saved "
+                             "(write times are only meaningful with --no-memory)")
+    parser.add_argument('--asset-mode', default='embedded', choices=['embedded', 'shared'],
+                        help="Embed plotly.js and the runtime, or reference the output folder's bundle")
+    parser.add_argument('--max-frames', type=int, default=500,
+                        help="Cap on animation frames (0 = all)")
+    parser.add_argument('--limit', action='append', metavar='STAGE=POINTS',
+                        help="Skip STAGE above POINTS per bird (overrides defaults)")
+    parser.add_argument('--no-memory', action='store_true', help="Disable tracemalloc profiling")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep', action='store_true', help="Keep generated data and outputs")
+    parser.add_argument('--output', default='bench_output.json', help="JSON results path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = run_matrix(args)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"✅ Results written to {args.output}")
+    return 0 if all(r['status'] != 'error' for r in report['results']) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+Encounter Renderer Module
+
+Renders live map animations for proximity encounters in batches.
+
+A full ``LiveMapAnimator`` reads environment variables, creates data loaders
+and precipitation managers on construction, which is wasted work when the
+encounter data is already in memory. ``EncounterRenderer`` only keeps what a
+single figure needs (trail system, color map, layout/plot configuration) and
+is created once per worker process. ``EncounterBatchRenderer`` distributes the
+encounters over a process pool; a failing encounter is reported in its
+``EncounterRenderResult`` without affecting the others.
+"""
+
+import os
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.user_interface import UserInterface
+from utils.performance_optimizer import PerformanceOptimizer
+from utils.animation_timeline import AnimationTimeline, add_timeline_columns
+from utils.animation_builders import (
+    build_color_map,
+    create_base_figure,
+    apply_standard_layout,
+    apply_controls_and_slider,
+    attach_animation,
+    write_animation_html,
+    CLIENT_PLAYBACK_MODES,
+    DEFAULT_CHUNK_FRAMES,
+)
+from core.data.trail_system import TrailSystem
+from core.gps_utils import get_numbered_output_path, haversine_distance, VisualizationHelper
+
+
+# Plotly config shared by every encounter animation (same as the live map)
+ENCOUNTER_PLOT_CONFIG = {
+    'displayModeBar': True,
+    'displaylogo': False,
+    'modeBarButtonsToAdd': [
+        'pan2d', 'select2d', 'lasso2d', 'zoomIn2d', 'zoomOut2d', 'autoScale2d', 'resetScale2d'
+    ],
+    'modeBarButtonsToRemove': ['sendDataToCloud'],
+    'responsive': False,
+    'scrollZoom': True,
+    'doubleClick': 'reset',
+    'showTips': True,
+}
+
+
+@dataclass
+class EncounterRenderSettings:
+    """Settings shared by all encounter animations of one batch"""
+    time_step_seconds: int = 60
+    trail_length_hours: Optional[float] = 2.0
+    frame_duration_ms: int = 800
+    performance_mode: bool = False
+    output_dir: Optional[str] = None
+    output_mode: str = 'frames'  # one of utils.animation_builders.OUTPUT_MODES
+    chunk_frames: int = DEFAULT_CHUNK_FRAMES  # frames per track chunk file ('chunked' output mode)
+
+
+@dataclass
+class EncounterRenderTask:
+    """A single encounter to render"""
+    index: int
+    dataframes: List[pd.DataFrame]
+    vultures: List[str] = field(default_factory=list)
+    duration_minutes: float = 0.0
+
+
+@dataclass
+class EncounterRenderResult:
+    """Outcome of rendering a single encounter"""
+    index: int
+    vultures: List[str]
+    duration_minutes: float = 0.0
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.output_path is not None and self.error is None
+
+
+class EncounterRenderer:
+    """Lightweight renderer for encounter animations (one instance per process)"""
+
+    def __init__(self, color_map: Dict[str, str], settings: EncounterRenderSettings):
+        self.ui = UserInterface()
+        self.color_map = dict(color_map)
+        self.settings = settings
+        self.viz_helper = VisualizationHelper()
+        self.trail_system = TrailSystem(self.ui)
+        if settings.trail_length_hours is None:
+            self.trail_system.trail_length_minutes = None
+        else:
+            self.trail_system.trail_length_minutes = int(settings.trail_length_hours * 60)
+
+    def prepare_data(self, dataframes: Sequence[pd.DataFrame]) -> pd.DataFrame:
+        """Apply the time step filter, add velocity and frame keys to the encounter data"""
+        processed = []
+        for df in dataframes:
+            if df is None or df.empty:
+                continue
+            filtered = PerformanceOptimizer.filter_by_time_step(df, self.settings.time_step_seconds)
+            if filtered.empty:
+                continue
+            filtered = filtered.sort_values('Timestamp [UTC]').reset_index(drop=True)
+            filtered['Velocity'] = _track_velocity(filtered)
+            processed.append(filtered)
+
+        if not processed:
+            return pd.DataFrame()
+
+        df = pd.concat(processed, ignore_index=True)
+        add_timeline_columns(df)
+        return df.sort_values('Timestamp [UTC]')
+
+    def render(self, index: int, dataframes: Sequence[pd.DataFrame]) -> str:
+        """
+        Render one encounter animation to HTML
+
+        Args:
+            index: Encounter number used in the output filename
+            dataframes: Per-vulture GPS data of the encounter window
+
+        Returns:
+            Path of the written HTML file
+        """
+        df = self.prepare_data(dataframes)
+        if df.empty:
+            raise ValueError("No GPS data in encounter window after filtering")
+
+        vulture_ids = df['vulture_id'].unique()
+        missing = [vid for vid in vulture_ids if vid not in self.color_map]
+        if missing:
+            # Vultures unknown to the shared map still get a stable color
+            self.color_map.update(build_color_map(missing))
+
+        map_cfg = self.viz_helper.calculate_map_bounds(df, padding_percent=0.1)
+        center_lat = map_cfg['center']['lat']
+        center_lon = map_cfg['center']['lon']
+        zoom_level = map_cfg['zoom']
+
+        strategy = "line_head" if self.settings.performance_mode else "markers_fade"
+        unique_times = AnimationTimeline.from_dataframe(df)
+
+        fig = create_base_figure(vulture_ids, self.color_map, strategy=strategy)
+        client_output = attach_animation(
+            fig,
+            output_mode=self.settings.output_mode,
+            frame_duration_ms=self.settings.frame_duration_ms,
+            chunk_frames=self.settings.chunk_frames,
+            max_workers=1,  # encounters are already rendered in parallel
+            validate_frames=False,  # only written to HTML
+            trail_system=self.trail_system,
+            df=df,
+            vulture_ids=vulture_ids,
+            color_map=self.color_map,
+            unique_times=unique_times,
+            enable_prominent_time_display=False,
+            strategy=strategy,
+        )
+        apply_standard_layout(fig, center_lat=center_lat, center_lon=center_lon, zoom_level=zoom_level)
+        apply_controls_and_slider(
+            fig,
+            unique_times=unique_times,
+            frame_duration_ms=self.settings.frame_duration_ms,
+            center_lat=center_lat,
+            center_lon=center_lon,
+            zoom_level=zoom_level,
+            include_speed_controls=True,
+            client_playback=self.settings.output_mode in CLIENT_PLAYBACK_MODES,
+            trail_options=self.trail_system.trail_length_choices(),
+            trail_minutes=self.trail_system.trail_length_minutes,
+        )
+
+        filename = self.trail_system.get_output_filename(
+            base_name=f'encounter_{index}', bird_names=list(vulture_ids)
+        )
+        output_path = get_numbered_output_path(filename)
+        return write_animation_html(fig, output_path, ENCOUNTER_PLOT_CONFIG, client_output)
+
+    def render_task(self, task: EncounterRenderTask) -> EncounterRenderResult:
+        """Render a task and capture any failure in the result"""
+        result = EncounterRenderResult(
+            index=task.index, vultures=list(task.vultures), duration_minutes=task.duration_minutes
+        )
+        try:
+            result.output_path = self.render(task.index, task.dataframes)
+        except Exception as e:
+            result.error = f"{e}\n{traceback.format_exc()}"
+        return result
+
+
+# Renderer of the current worker process (created by _init_worker)
+_WORKER_RENDERER: Optional[EncounterRenderer] = None
+
+
+def _init_worker(color_map: Dict[str, str], settings: EncounterRenderSettings) -> None:
+    """Process pool initializer: build one renderer per worker process"""
+    global _WORKER_RENDERER
+    if settings.output_dir:
+        os.environ['OUTPUT_DIR'] = settings.output_dir
+    _WORKER_RENDERER = EncounterRenderer(color_map, settings)
+
+
+def _render_in_worker(task: EncounterRenderTask) -> EncounterRenderResult:
+    """Process pool task: render one encounter with the worker's renderer"""
+    return _WORKER_RENDERER.render_task(task)
+
+
+def _track_velocity(df: pd.DataFrame) -> np.ndarray:
+    """Velocity in m/s between consecutive fixes of a sorted single-vulture track"""
+    velocity = np.zeros(len(df), dtype=np.float64)
+    if len(df) < 2:
+        return velocity
+    lat = df['Latitude'].to_numpy(dtype=np.float64)
+    lon = df['Longitude'].to_numpy(dtype=np.float64)
+    dt = df['Timestamp [UTC]'].diff().dt.total_seconds().to_numpy()[1:]
+    distance_m = haversine_distance(lat[:-1], lon[:-1], lat[1:], lon[1:]) * 1000
+    with np.errstate(divide='ignore', invalid='ignore'):
+        velocity[1:] = np.where(dt > 0, distance_m / dt, 0.0)
+    return velocity
+
+
+class EncounterBatchRenderer:
+    """Renders many encounter animations concurrently in a process pool"""
+
+    def __init__(self, vulture_ids: Sequence[str], settings: EncounterRenderSettings,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize the batch renderer
+
+        Args:
+            vulture_ids: All vulture IDs of the dataset; the color map is built
+                once from them so a bird keeps its color across encounters
+            settings: Render settings shared by all encounters
+            max_workers: Number of worker processes (default: CPU count);
+                1 renders serially in the current process
+        """
+        self.settings = settings
+        self.color_map = build_color_map(sorted(vulture_ids))
+        self.max_workers = max(1, int(max_workers or os.cpu_count() or 1))
+
+    def render_all(self, tasks: Sequence[EncounterRenderTask],
+                   on_result: Optional[Callable[[EncounterRenderResult], None]] = None
+                   ) -> List[EncounterRenderResult]:
+        """
+        Render all encounter tasks
+
+        Args:
+            tasks: Encounters to render
+            on_result: Optional callback invoked as each encounter finishes
+
+        Returns:
+            Results ordered by encounter index
+        """
+        if not tasks:
+            return []
+
+        workers = min(self.max_workers, len(tasks))
+        if workers == 1:
+            results = self._render_serial(tasks, on_result)
+        else:
+            results = self._render_parallel(tasks, workers, on_result)
+        return sorted(results, key=lambda r: r.index)
+
+    def _render_serial(self, tasks, on_result) -> List[EncounterRenderResult]:
+        if self.settings.output_dir:
+            os.environ['OUTPUT_DIR'] = self.settings.output_dir
+        renderer = EncounterRenderer(self.color_map, self.settings)
+        results = []
+        for task in tasks:
+            result = renderer.render_task(task)
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return results
+
+    def _render_parallel(self, tasks, workers, on_result) -> List[EncounterRenderResult]:
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.color_map, self.settings),
+        ) as executor:
+            futures = {executor.submit(_render_in_worker, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Worker crashed (e.g. out of memory); only this encounter fails
+                    result = EncounterRenderResult(
+                        index=task.index, vultures=list(task.vultures),
+                        duration_minutes=task.duration_minutes, error=str(e)
+                    )
+                results.append(result)
+                if on_result:
+                    on_result(result)
+        return results
@@ -9,13 +9,19 @@ dedicated modules for better maintainability.
 import sys
 import os
 import pandas as pd
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from gps_utils import get_numbered_output_path, DataLoader
+from core.gps_utils import get_numbered_output_path, DataLoader
 from utils.user_interface import UserInterface
-from core.proximity_engine import ProximityEngine
-from visualization.proximity_plots import ProximityVisualizer
-from animate_live_map import LiveMapAnimator
+from core.analysis.proximity_engine import ProximityEngine
+from core.analysis.track_index import TrackTimeIndex
+from utils.animation_timeline import to_epoch_ns
+from core.analysis.encounter_renderer import (
+    EncounterBatchRenderer,
+    EncounterRenderSettings,
+    EncounterRenderTask,
+)
+from utils.proximity_plots import ProximityVisualizer
 
 
 def main():
@@ -90,7 +96,7 @@ def main():
         
         if generate_animations:
             ui.print_section("🎬 CREATING ENCOUNTER ANIMATIONS")
-            success = create_encounter_animations(events, proximity_engine.gps_data, ui)
+            success = create_encounter_animations(events, proximity_engine.get_track_index(), ui)
             if not success:
                 ui.print_warning("Encounter animation creation failed, continuing with standard analysis...")
         
@@ -130,13 +136,16 @@ def create_encounter_animations(events, gps_data, ui):
     
     Args:
         events: List of proximity events
-        gps_data: Combined GPS data DataFrame
+        gps_data: Combined GPS data DataFrame or its TrackTimeIndex
         ui: User interface for messaging
         
     Returns:
         bool: True if successful, False otherwise
     """
     try:
+        # Sort once; every encounter window is then two binary searches per vulture
+        track_index = gps_data if isinstance(gps_data, TrackTimeIndex) else TrackTimeIndex(gps_data)
+        
         # Group events into encounters (events within 60 minutes of each other)
         encounters = group_proximity_events(events)
         
@@ -197,52 +206,60 @@ def create_encounter_animations(events, gps_data, ui):
                 encounters = encounters[:limit_encounters]
                 ui.print_info(f"Limited to first {limit_encounters} encounters for faster processing")
         
-        animated_count = 0
+        # Worker processes for parallel rendering
+        default_workers = os.cpu_count() or 1
+        max_workers = ui.get_user_input(
+            "Parallel render workers (1 = serial)",
+            str(default_workers),
+            int
+        )
         
+        # Build per-encounter datasets up front; each task only carries its time window
+        tasks = []
         for i, encounter in enumerate(encounters, 1):
-            try:
-                ui.print_info(f"Creating animation for encounter {i}/{len(encounters)}...")
-                
-                # Create encounter dataset
-                encounter_data = create_encounter_dataset(
-                    encounter, gps_data, time_buffer
-                )
-                
-                if encounter_data is None or len(encounter_data) == 0:
-                    ui.print_warning(f"No GPS data found for encounter {i}, skipping...")
-                    continue
-                
-                # Create LiveMapAnimator with encounter data
-                animator = LiveMapAnimator()
-                animator.dataframes = encounter_data
-                animator.combined_data = pd.concat(encounter_data, ignore_index=True)
-                
-                # Configure for encounter animation with user settings
-                animator.selected_time_step = time_step_seconds
-                animator.trail_system.trail_length_minutes = trail_length * 60  # Convert hours to minutes
-                
-                # Create encounter-specific filename
-                encounter_vultures = sorted(encounter['vultures'])
-                base_name = f'encounter_{i}'
-                
-                # Create the visualization
-                success = animator.create_visualization(base_name=base_name)
-                
-                if success:
-                    animated_count += 1
-                    duration = encounter['duration_minutes']
-                    vultures = ', '.join(encounter['vultures'])
-                    ui.print_success(f"Encounter {i} animated: {vultures} ({duration:.1f} min)")
-                else:
-                    ui.print_warning(f"Failed to animate encounter {i}")
-                    
-            except KeyboardInterrupt:
-                ui.print_warning(f"\n⚠️  Animation interrupted by user at encounter {i}")
-                ui.print_info(f"Successfully created {animated_count} animations before interruption")
-                return animated_count > 0
-            except Exception as e:
-                ui.print_error(f"Error animating encounter {i}: {e}")
+            encounter_data = create_encounter_dataset(
+                encounter, track_index, time_buffer
+            )
+            
+            if encounter_data is None or len(encounter_data) == 0:
+                ui.print_warning(f"No GPS data found for encounter {i}, skipping...")
                 continue
+            
+            tasks.append(EncounterRenderTask(
+                index=i,
+                dataframes=encounter_data,
+                vultures=sorted(encounter['vultures']),
+                duration_minutes=encounter['duration_minutes'],
+            ))
+        
+        settings = EncounterRenderSettings(
+            time_step_seconds=time_step_seconds,
+            trail_length_hours=trail_length,
+            output_dir=os.environ.get('OUTPUT_DIR'),
+            output_mode=os.environ.get('ANIMATION_OUTPUT_MODE', 'frames').strip().lower(),
+        )
+        renderer = EncounterBatchRenderer(
+            track_index.vultures, settings, max_workers=max_workers
+        )
+        
+        def report(result):
+            if result.success:
+                vultures = ', '.join(result.vultures)
+                ui.print_success(
+                    f"Encounter {result.index} animated: {vultures} ({result.duration_minutes:.1f} min)"
+                )
+            else:
+                first_line = (result.error or 'unknown error').splitlines()[0]
+                ui.print_error(f"Error animating encounter {result.index}: {first_line}")
+        
+        ui.print_info(f"Rendering {len(tasks)} encounter(s) with up to {renderer.max_workers} worker(s)...")
+        try:
+            results = renderer.render_all(tasks, on_result=report)
+        except KeyboardInterrupt:
+            ui.print_warning("\n⚠️  Animation interrupted by user")
+            return False
+        
+        animated_count = sum(1 for result in results if result.success)
         
         if animated_count > 0:
             ui.print_success(f"Successfully created {animated_count} encounter animations!")
@@ -391,52 +408,29 @@ def create_encounter_dataset(encounter, gps_data, time_buffer_hours):
     """
     Create filtered GPS datasets for a specific encounter
     
+    With a TrackTimeIndex the window of each involved vulture is located by
+    two binary searches and returned as a slice of the indexed data, so the
+    cost depends on the window size rather than the full dataset.
+    
     Args:
         encounter: Encounter dictionary
-        gps_data: Combined GPS DataFrame
+        gps_data: Combined GPS DataFrame or its TrackTimeIndex
         time_buffer_hours: Hours of data to include before/after
         
     Returns:
-        List of DataFrames for the encounter period
+        List of DataFrames for the encounter period (read-only slices when
+        an index is given)
     """
-    import pandas as pd
-    
-    buffer_time = pd.Timedelta(hours=time_buffer_hours)
-    start_time = encounter['start_time'] - buffer_time
-    end_time = encounter['end_time'] + buffer_time
-    
-    encounter_dataframes = []
-    vultures_involved = set(encounter['vultures'])
-    
-    # Filter the combined GPS data by time
-    time_mask = (gps_data['timestamp'] >= start_time) & (gps_data['timestamp'] <= end_time)
-    filtered_data = gps_data[time_mask].copy()
+    track_index = gps_data if isinstance(gps_data, TrackTimeIndex) else TrackTimeIndex(gps_data)
     
-    # Split by vulture and create separate DataFrames for LiveMapAnimator
-    for vulture_id in vultures_involved:
-        vulture_data = filtered_data[filtered_data['vulture_id'] == vulture_id].copy()
-        
-        if not vulture_data.empty:
-            # Convert to LiveMapAnimator expected column format
-            vulture_data = vulture_data.rename(columns={
-                'timestamp': 'Timestamp [UTC]',
-                'latitude': 'Latitude',
-                'longitude': 'Longitude'
-            })
-            
-            # Add required columns for LiveMapAnimator
-            vulture_data['source_file'] = f'encounter_{vulture_id}.csv'
-            
-            # Ensure Height column exists (even if empty)
-            if 'Height' not in vulture_data.columns:
-                if 'altitude' in vulture_data.columns:
-                    vulture_data['Height'] = vulture_data['altitude']
-                else:
-                    vulture_data['Height'] = None
-            
-            encounter_dataframes.append(vulture_data)
+    buffer_ns = int(time_buffer_hours * 3600 * 1e9)
+    start_ns = to_epoch_ns(encounter['start_time'])[0] - buffer_ns
+    end_ns = to_epoch_ns(encounter['end_time'])[0] + buffer_ns
+    start_time = pd.Timestamp(start_ns, unit='ns')
+    end_time = pd.Timestamp(end_ns, unit='ns')
     
-    return encounter_dataframes
+    windows = track_index.windows(sorted(set(encounter['vultures'])), start_time, end_time)
+    return list(windows.values())
 
 
 if __name__ == "__main__":
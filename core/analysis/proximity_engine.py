@@ -5,12 +5,14 @@ Core proximity analysis algorithms and data structures for detecting
 when vultures are in close proximity to each other.
 """
 
+import time
 import pandas as pd
 import numpy as np
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 from dataclasses import dataclass
 from datetime import datetime
-from core.gps_utils import haversine_distance
+from core.gps_utils import haversine_distance, GPSVisualizationError
+from core.analysis.track_index import TrackTimeIndex
 from utils.user_interface import UserInterface
 
 
@@ -42,6 +44,73 @@ class ProximityStatistics:
     events_by_hour: dict
 
 
+@dataclass
+class ProximityProgress:
+    """Data class for reporting proximity analysis progress"""
+    fraction: float
+    blocks_done: int
+    blocks_total: int
+    pairs_done: int
+    pairs_total: int
+    elapsed_seconds: float
+    eta_seconds: Optional[float] = None
+
+
+class AnalysisCancelledError(GPSVisualizationError):
+    """Raised when a running proximity analysis is cancelled"""
+    pass
+
+
+class _ProgressTracker:
+    """Counts finished work blocks, reports progress and checks for cancellation"""
+
+    def __init__(self, blocks_total: int, pairs_total: int,
+                 progress_callback: Optional[Callable[[ProximityProgress], None]] = None,
+                 cancel_token=None):
+        self.blocks_total = max(1, blocks_total)
+        self.pairs_total = pairs_total
+        self.blocks_done = 0
+        self.pairs_done = 0
+        self.progress_callback = progress_callback
+        self.cancel_token = cancel_token
+        self.start_time = time.monotonic()
+
+    def check_cancelled(self) -> None:
+        """Raise AnalysisCancelledError if the cancel token has been set"""
+        if self.cancel_token is not None and self.cancel_token.is_set():
+            raise AnalysisCancelledError(
+                f"Proximity analysis cancelled after {self.blocks_done}/{self.blocks_total} blocks"
+            )
+
+    def block_done(self) -> None:
+        """Record a finished work block and notify the progress callback"""
+        self.blocks_done += 1
+        self._report()
+        self.check_cancelled()
+
+    def pair_done(self) -> None:
+        """Record a finished vulture pair"""
+        self.pairs_done += 1
+
+    def _report(self) -> None:
+        if self.progress_callback is None:
+            return
+        elapsed = time.monotonic() - self.start_time
+        fraction = min(1.0, self.blocks_done / self.blocks_total)
+        eta = None
+        if self.blocks_done > 0:
+            eta = elapsed / self.blocks_done * (self.blocks_total - self.blocks_done)
+        self.progress_callback(ProximityProgress(
+            fraction=fraction,
+            blocks_done=self.blocks_done,
+            blocks_total=self.blocks_total,
+            pairs_done=self.pairs_done,
+            pairs_total=self.pairs_total,
+            elapsed_seconds=elapsed,
+            eta_seconds=eta
+        ))
+
+
 class ProximityEngine:
     """Core proximity analysis engine"""
     
@@ -61,6 +130,7 @@ class ProximityEngine:
         self.proximity_events: List[ProximityEvent] = []
         self.statistics: Optional[ProximityStatistics] = None
         self.gps_data: Optional[pd.DataFrame] = None
+        self._track_index: Optional[TrackTimeIndex] = None
     
     def load_dataframes(self, dataframes: List[pd.DataFrame]) -> None:
         """
@@ -90,6 +160,7 @@ class ProximityEngine:
         if 'timestamp' in self.gps_data.columns:
             self.gps_data['timestamp'] = pd.to_datetime(self.gps_data['timestamp'])
         
+        self._track_index = None
         print(f"Loaded {len(self.gps_data):,} GPS points from {len(dataframes)} files")
     
     def load_data(self, data_path: str) -> None:
@@ -105,8 +176,24 @@ class ProximityEngine:
         if 'timestamp' in self.gps_data.columns:
             self.gps_data['timestamp'] = pd.to_datetime(self.gps_data['timestamp'])
         
+        self._track_index = None
         print(f"Loaded {len(self.gps_data):,} GPS points from {data_path}")
     
+    def get_track_index(self) -> TrackTimeIndex:
+        """
+        Get the per-vulture sorted time index of the loaded data
+        
+        The index is built on first use and reused until new data is loaded.
+        
+        Returns:
+            TrackTimeIndex over the combined GPS data
+        """
+        if self.gps_data is None:
+            raise ValueError("No GPS data loaded. Call load_dataframes() or load_data() first.")
+        if self._track_index is None:
+            self._track_index = TrackTimeIndex(self.gps_data)
+        return self._track_index
+    
     def _standardize_columns(self) -> None:
         """Standardize column names for consistent access"""
         # Map common column name variations
@@ -171,12 +258,28 @@ class ProximityEngine:
             self.ui.print_info("Configuration cancelled")
             return False
     
-    def analyze_proximity(self) -> List[ProximityEvent]:
+    def analyze_proximity(self,
+                          progress_callback: Optional[Callable[[ProximityProgress], None]] = None,
+                          cancel_token=None,
+                          block_size: int = 500) -> List[ProximityEvent]:
         """
         Analyze proximity between vultures using loaded data
         
+        The work is split into blocks of ``block_size`` points of the first
+        vulture of each pair. After every block the progress callback is
+        called and the cancel token is checked.
+        
+        Args:
+            progress_callback: Optional callable receiving a ProximityProgress
+            cancel_token: Optional event-like object (threading.Event or
+                multiprocessing.Event); analysis stops once ``is_set()`` is True
+            block_size: Number of GPS points processed between progress checks
+        
         Returns:
             List of proximity events
+        
+        Raises:
+            AnalysisCancelledError: If the cancel token was set during analysis
         """
         if self.gps_data is None:
             raise ValueError("No GPS data loaded. Call load_dataframes() or load_data() first.")
@@ -196,6 +299,17 @@ class ProximityEngine:
         proximity_events = []
         total_pairs = len(vultures) * (len(vultures) - 1) // 2
         pair_count = 0
+        block_size = max(1, int(block_size))
+        
+        # Every pair (vulture1, vulture2) iterates over the points of vulture1
+        points_per_vulture = self.gps_data['vulture_id'].value_counts()
+        total_blocks = 0
+        for i, vulture1 in enumerate(vultures):
+            blocks_for_vulture = max(1, -(-int(points_per_vulture.get(vulture1, 0)) // block_size))
+            total_blocks += blocks_for_vulture * (len(vultures) - i - 1)
+        
+        tracker = _ProgressTracker(total_blocks, total_pairs, progress_callback, cancel_token)
+        tracker.check_cancelled()
         
         # Analyze each pair of vultures
         for i, vulture1 in enumerate(vultures):
@@ -209,16 +323,20 @@ class ProximityEngine:
                 
                 # Find proximity events for this pair
                 pair_events = self._find_proximity_events_for_pair(
-                    vulture1, data1, vulture2, data2
+                    vulture1, data1, vulture2, data2,
+                    tracker=tracker, block_size=block_size
                 )
                 proximity_events.extend(pair_events)
+                tracker.pair_done()
         
         print(f"\n✅ Found {len(proximity_events)} proximity events")
         self.proximity_events = proximity_events
         return proximity_events
     
     def _find_proximity_events_for_pair(self, vulture1: str, data1: pd.DataFrame, 
-                                       vulture2: str, data2: pd.DataFrame) -> List[ProximityEvent]:
+                                       vulture2: str, data2: pd.DataFrame,
+                                       tracker: Optional[_ProgressTracker] = None,
+                                       block_size: int = 500) -> List[ProximityEvent]:
         """
         Find proximity events between a specific pair of vultures
         
@@ -227,6 +345,8 @@ class ProximityEngine:
             data1: GPS data for first vulture
             vulture2: Second vulture ID  
             data2: GPS data for second vulture
+            tracker: Optional progress tracker notified after each block
+            block_size: Number of points of vulture1 per work block
             
         Returns:
             List of proximity events for this pair
@@ -234,12 +354,40 @@ class ProximityEngine:
         events = []
         
         if data1.empty or data2.empty:
+            if tracker is not None:
+                # Skipped pairs still count their blocks so the fraction reaches 1.0
+                for _ in range(max(1, -(-len(data1) // block_size))):
+                    tracker.block_done()
             return events
         
         # Sort by timestamp
         data1 = data1.sort_values('timestamp')
         data2 = data2.sort_values('timestamp')
         
+        for block_start in range(0, len(data1), block_size):
+            block = data1.iloc[block_start:block_start + block_size]
+            events.extend(self._find_proximity_events_in_block(vulture1, block, vulture2, data2))
+            if tracker is not None:
+                tracker.block_done()
+        
+        return events
+    
+    def _find_proximity_events_in_block(self, vulture1: str, data1: pd.DataFrame,
+                                        vulture2: str, data2: pd.DataFrame) -> List[ProximityEvent]:
+        """
+        Find proximity events for a block of points of the first vulture
+        
+        Args:
+            vulture1: First vulture ID
+            data1: Block of GPS data for first vulture
+            vulture2: Second vulture ID
+            data2: Sorted GPS data for second vulture
+            
+        Returns:
+            List of proximity events for this block
+        """
+        events = []
+        
         # For each point of vulture1, find the closest point in time from vulture2
         for _, row1 in data1.iterrows():
             timestamp1 = row1['timestamp']
@@ -371,3 +519,28 @@ class ProximityEngine:
             })
         
         return pd.DataFrame(events_data)
+    
+    def get_events_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Convert proximity events to a dictionary of numpy column arrays
+        
+        The columnar form is cheap to hand to another process: every column
+        is a single contiguous buffer instead of one object per event.
+        
+        Returns:
+            Dictionary mapping column name to numpy array; timestamps are
+            int64 nanoseconds since the epoch
+        """
+        events = self.proximity_events
+        return {
+            'vulture1': np.array([e.vulture1 for e in events], dtype=str),
+            'vulture2': np.array([e.vulture2 for e in events], dtype=str),
+            'timestamp_ns': np.array(
+                [pd.Timestamp(e.timestamp).value for e in events], dtype=np.int64
+            ),
+            'distance_km': np.array([e.distance_km for e in events], dtype=np.float64),
+            'lat1': np.array([e.lat1 for e in events], dtype=np.float64),
+            'lon1': np.array([e.lon1 for e in events], dtype=np.float64),
+            'lat2': np.array([e.lat2 for e in events], dtype=np.float64),
+            'lon2': np.array([e.lon2 for e in events], dtype=np.float64),
+        }
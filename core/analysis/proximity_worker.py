@@ -0,0 +1,206 @@
+"""
+Proximity Worker Module
+
+Runs the complete proximity analysis pipeline in a separate process so the
+Tk GUI keeps its own interpreter (and GIL) free for drawing.
+
+The worker communicates with the GUI exclusively through a message queue.
+Every message is a ``(kind, payload)`` tuple:
+
+- ``('log', str)``: a log line for the GUI log panel
+- ``('progress', ProximityProgress)``: engine progress snapshot
+- ``('result', dict)``: summary statistics, result files and the events as
+  numpy column arrays (see ``ProximityEngine.get_events_columns``)
+- ``('cancelled', str)``: the analysis was stopped via the cancel event
+- ``('error', str)``: the analysis failed; payload is the formatted traceback
+- ``('done', None)``: always the last message sent by the worker
+"""
+
+import os
+import time
+import multiprocessing
+import traceback
+from typing import Optional
+
+
+# Minimum seconds between two progress messages sent to the GUI
+PROGRESS_MESSAGE_INTERVAL = 0.1
+
+
+def start_proximity_worker(params: dict):
+    """
+    Start the proximity analysis in a new process
+
+    Uses the ``spawn`` start method on every platform, so the child never
+    inherits the Tk state of the GUI process.
+
+    Args:
+        params: Analysis parameters as returned by
+            ``ProximityGUIConfig.get_analysis_parameters()``
+
+    Returns:
+        Tuple of (process, message_queue, cancel_event)
+    """
+    context = multiprocessing.get_context('spawn')
+    message_queue = context.Queue()
+    cancel_event = context.Event()
+    process = context.Process(
+        target=run_proximity_worker,
+        args=(params, message_queue, cancel_event),
+        daemon=True,
+        name='proximity-analysis'
+    )
+    process.start()
+    return process, message_queue, cancel_event
+
+
+def run_proximity_worker(params: dict, message_queue, cancel_event) -> None:
+    """
+    Process entry point: load data, analyze proximity, export results
+
+    Args:
+        params: Analysis parameters dictionary
+        message_queue: Queue for ``(kind, payload)`` messages to the GUI
+        cancel_event: Event set by the GUI to request cancellation
+    """
+    def log(message: str) -> None:
+        message_queue.put(('log', message))
+
+    last_progress_time = [0.0]
+
+    def on_progress(progress) -> None:
+        # Throttle progress so a fast analysis does not flood the GUI queue
+        now = time.monotonic()
+        if progress.fraction >= 1.0 or now - last_progress_time[0] >= PROGRESS_MESSAGE_INTERVAL:
+            last_progress_time[0] = now
+            message_queue.put(('progress', progress))
+
+    try:
+        from core.gps_utils import DataLoader, get_numbered_output_path
+        from core.analysis.proximity_engine import ProximityEngine, AnalysisCancelledError
+
+        log("Starting proximity analysis...")
+
+        # Load GPS data
+        log("Loading GPS data...")
+        data_loader = DataLoader(params['data_folder'])
+        dataframes = data_loader.load_all_csv_files()
+
+        if not dataframes:
+            log("❌ No valid GPS data found")
+            return
+
+        log(f"✅ Loaded {len(dataframes)} vulture datasets")
+
+        # Initialize and configure proximity engine
+        log("Configuring proximity engine...")
+        engine = ProximityEngine()
+        engine.load_dataframes(dataframes)
+        engine.proximity_threshold_km = float(params['proximity_threshold'])
+        engine.min_duration_minutes = float(params['time_threshold'])
+
+        log(f"⚙️ Proximity threshold: {engine.proximity_threshold_km} km")
+        log(f"⚙️ Time threshold: {engine.min_duration_minutes} minutes")
+
+        # Run proximity analysis
+        log("Analyzing proximity events...")
+        try:
+            events = engine.analyze_proximity(
+                progress_callback=on_progress,
+                cancel_token=cancel_event
+            )
+        except AnalysisCancelledError as ce:
+            message_queue.put(('cancelled', str(ce)))
+            return
+
+        if not events:
+            log("⚠️ No proximity events found with current parameters")
+            message_queue.put(('result', {
+                'results': {
+                    'total_events': 0,
+                    'unique_pairs': 0,
+                    'avg_distance_km': 0.0,
+                    'closest_distance_km': 0.0,
+                },
+                'result_files': {},
+                'events': engine.get_events_columns(),
+            }))
+            return
+
+        log(f"✅ Found {len(events)} proximity events!")
+
+        # Calculate statistics
+        log("Calculating statistics...")
+        stats = engine.calculate_statistics()
+
+        result_files = {}
+        output_dir = params['output_folder']
+        if output_dir:
+            # Helpers resolve the output folder through OUTPUT_DIR
+            os.environ['OUTPUT_DIR'] = output_dir
+
+        # Export events dataframe to CSV in the selected output folder
+        try:
+            events_df = engine.get_events_dataframe()
+            csv_path = get_numbered_output_path('proximity_events', 'analysis').replace('.html', '.csv')
+            events_df.to_csv(csv_path, index=False)
+            log(f"📄 Events CSV saved to: {csv_path}")
+            result_files['events_csv'] = csv_path
+        except Exception as e:
+            log(f"⚠️ Failed to export events CSV: {e}")
+
+        # Create the HTML visualizations (timeline, map, dashboard)
+        if not cancel_event.is_set():
+            try:
+                from utils.proximity_plots import ProximityVisualizer
+                log("📈 Creating visualizations (timeline, map, dashboard)...")
+                viz = ProximityVisualizer()
+                viz.create_all_visualizations(events, stats)
+                log("✨ Visualizations created.")
+            except Exception as ve:
+                log(f"⚠️ Visualization creation failed: {ve}")
+
+        message_queue.put(('result', {
+            'results': {
+                'total_events': stats.total_events,
+                'unique_pairs': stats.unique_pairs,
+                'avg_distance_km': float(getattr(stats, 'average_distance_km', 0.0)),
+                'closest_distance_km': float(getattr(stats, 'closest_distance_km', 0.0)),
+            },
+            'result_files': result_files,
+            'events': engine.get_events_columns(),
+        }))
+        log("✅ Analysis completed successfully!")
+
+    except Exception as e:
+        message_queue.put(('error', f"{e}\n{traceback.format_exc()}"))
+    finally:
+        message_queue.put(('done', None))
+
+
+def build_timeline_from_columns(columns: Optional[dict]) -> list:
+    """
+    Build the GUI timeline list from columnar event arrays
+
+    Args:
+        columns: Dictionary from ``ProximityEngine.get_events_columns()``
+
+    Returns:
+        List of timeline dictionaries (id, start, end, pair)
+    """
+    if not columns or len(columns.get('timestamp_ns', [])) == 0:
+        return []
+
+    import pandas as pd
+
+    timestamps = pd.to_datetime(columns['timestamp_ns'], unit='ns')
+    timeline = []
+    for idx, (ts, v1, v2) in enumerate(zip(timestamps, columns['vulture1'], columns['vulture2']), start=1):
+        # Use a nominal end equal to start (engine doesn't group durations here)
+        timeline.append({
+            'id': idx,
+            'start': ts.to_pydatetime(),
+            'end': ts.to_pydatetime(),
+            'pair': (str(v1), str(v2)),
+        })
+    return timeline
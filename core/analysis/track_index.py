@@ -0,0 +1,116 @@
+"""
+Track Time Index Module
+
+Per-vulture sorted time index over the combined GPS dataset.
+
+The combined data is sorted once by (vulture, time). Each vulture then owns a
+contiguous row range, and a time window is located with two binary searches
+on its int64 timestamp array. The returned window is a positional slice of
+the sorted frame, so extraction cost depends on the window size only, not on
+the total number of GPS points.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.animation_timeline import to_epoch_ns
+
+
+# Column names expected by the LiveMapAnimator / encounter renderer
+ANIMATION_COLUMN_MAPPING = {
+    'timestamp': 'Timestamp [UTC]',
+    'latitude': 'Latitude',
+    'longitude': 'Longitude',
+}
+
+
+class TrackTimeIndex:
+    """Sorted per-vulture time index for fast time window extraction"""
+
+    def __init__(self, gps_data: pd.DataFrame, vulture_col: str = 'vulture_id',
+                 time_col: str = 'timestamp', animation_columns: bool = True):
+        """
+        Build the index (one sort of the combined data)
+
+        Args:
+            gps_data: Combined GPS data of all vultures
+            vulture_col: Column holding the vulture ID
+            time_col: Column holding the fix timestamps
+            animation_columns: Rename columns to the LiveMapAnimator format
+                ('Timestamp [UTC]', 'Latitude', 'Longitude') and add the
+                'Height' and 'source_file' columns once for all windows
+        """
+        data = gps_data.sort_values([vulture_col, time_col], kind='mergesort').reset_index(drop=True)
+        times = to_epoch_ns(data[time_col])
+
+        if animation_columns:
+            data = data.rename(columns=ANIMATION_COLUMN_MAPPING)
+            time_col = ANIMATION_COLUMN_MAPPING.get(time_col, time_col)
+            if 'Height' not in data.columns:
+                data['Height'] = data['altitude'] if 'altitude' in data.columns else None
+            data['source_file'] = 'encounter_' + data[vulture_col].astype(str) + '.csv'
+
+        self.data = data
+        self.vulture_col = vulture_col
+        self.time_col = time_col
+        self._times = times
+
+        # Contiguous row range of each vulture in the sorted frame
+        ids = data[vulture_col].to_numpy()
+        self._ranges: Dict[str, Tuple[int, int]] = {}
+        if len(ids):
+            boundaries = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(ids)]))
+            for start, end in zip(starts, ends):
+                self._ranges[ids[start]] = (int(start), int(end))
+
+    @property
+    def vultures(self) -> List[str]:
+        """Vulture IDs present in the index"""
+        return list(self._ranges.keys())
+
+    def window_bounds(self, vulture_id: str, start_time, end_time) -> Tuple[int, int]:
+        """
+        Row range [start, end) of a vulture's fixes within a closed time window
+
+        Returns:
+            Positional bounds into ``self.data``; empty range if the vulture is unknown
+        """
+        if vulture_id not in self._ranges:
+            return 0, 0
+        lo, hi = self._ranges[vulture_id]
+        times = self._times[lo:hi]
+        start_ns = to_epoch_ns(start_time)[0]
+        end_ns = to_epoch_ns(end_time)[0]
+        first = lo + int(np.searchsorted(times, start_ns, side='left'))
+        last = lo + int(np.searchsorted(times, end_ns, side='right'))
+        return first, max(first, last)
+
+    def window(self, vulture_id: str, start_time, end_time) -> pd.DataFrame:
+        """
+        Fixes of one vulture within [start_time, end_time], sorted by time
+
+        The result is a positional slice of the indexed data; treat it as
+        read-only or copy it before modifying.
+        """
+        first, last = self.window_bounds(vulture_id, start_time, end_time)
+        return self.data.iloc[first:last]
+
+    def windows(self, vulture_ids, start_time, end_time) -> Dict[str, pd.DataFrame]:
+        """Non-empty time windows for several vultures"""
+        result = {}
+        for vulture_id in vulture_ids:
+            window = self.window(vulture_id, start_time, end_time)
+            if not window.empty:
+                result[vulture_id] = window
+        return result
+
+    def time_range(self, vulture_id: str) -> Optional[Tuple[int, int]]:
+        """First and last fix of a vulture as epoch nanoseconds"""
+        if vulture_id not in self._ranges:
+            return None
+        lo, hi = self._ranges[vulture_id]
+        return int(self._times[lo]), int(self._times[hi - 1])
@@ -189,14 +189,15 @@ def main():
         elevation_manager.list_available_regions()
         
         # Get region selection - use default for GUI mode
+        # ('auto': terrain bounds from the GPS data plus padding)
         if os.environ.get('OUTPUT_DIR'):  # GUI mode
-            region_choice = "berchtesgaden_full"  # Default recommended region for GUI
+            region_choice = "auto"  # Default for GUI: terrain around the flights
             ui.print_success(f"Using default region for GUI mode: {region_choice}")
         else:
             # Get region selection from user
             region_choice = ui.get_user_input(
-                "Select region (berchtesgaden_full recommended)", 
-                "berchtesgaden_full", 
+                "Select region ('auto' = around the GPS data, recommended)", 
+                "auto", 
                 str
             )
         
@@ -222,11 +223,20 @@ def main():
             resolution_choice = 100
         
         # Setup terrain data
-        terrain_success = animation_engine.setup_terrain(
-            region_name=region_choice,
-            resolution=resolution_choice,
-            force_download=False
-        )
+        if region_choice == "auto":
+            # Same vertex budget as the fixed-region grid; small flight areas get fewer vertices
+            all_fixes = pd.concat([df[['Latitude', 'Longitude']] for df in dataframes], ignore_index=True)
+            terrain_success = animation_engine.setup_terrain_for_data(
+                all_fixes['Latitude'].to_numpy(), all_fixes['Longitude'].to_numpy(),
+                vertex_budget=resolution_choice ** 2,
+                force_download=False
+            )
+        else:
+            terrain_success = animation_engine.setup_terrain(
+                region_name=region_choice,
+                resolution=resolution_choice,
+                force_download=False
+            )
         
         if not terrain_success:
             ui.print_error("Failed to setup terrain data")
@@ -5,17 +5,152 @@ Core 3D visualization system for GPS flight paths with real terrain data.
 Provides high-quality 3D animations with downloadable elevation models.
 """
 
+import os
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import numpy as np
-from typing import Optional, Dict, Any
-from gps_utils import VisualizationHelper, format_height_display, get_numbered_output_path
+from typing import Optional, Dict, Any, List
+from gps_utils import VisualizationHelper, format_height_display_array, get_numbered_output_path
 from utils.user_interface import UserInterface
 from utils.enhanced_timeline_labels import create_enhanced_slider_config
 from utils.animation_state_manager import create_reliable_animation_controls
-from core.data.elevation_data_manager import ElevationDataManager, ElevationData
-from utils.html_injection import inject_fullscreen
+from core.data.elevation_data_manager import (
+    ElevationDataManager, ElevationData, add_height_above_ground, HEIGHT_AGL_COLUMN
+)
+from utils.animation_timeline import AnimationTimeline, add_timeline_columns, frame_keys
+from utils.parallel_frames import build_frames
+from utils.animation_builders import raw_frame, raw_trace, write_animation_html
+from utils.figure_encoding import quantize_elevations
+from utils.lod import LODConfig, apply_lod
+from utils.terrain_mesh import DEFAULT_MIN_SPACING_M, decimate_terrain_grid, resolution_for_budget
+
+
+def _path_hovertemplate(vulture_id: str) -> str:
+    """Hover template of a 3D flight path point (customdata: time, height and AGL labels)"""
+    return (
+        f"<b>{vulture_id}</b><br>"
+        "Time: %{customdata[0]}<br>"
+        "Lat: %{y:.4f}°<br>"
+        "Lon: %{x:.4f}°<br>"
+        "Alt: %{customdata[1]}<br>"
+        "AGL: %{customdata[2]}"
+        "<extra></extra>"
+    )
+
+
+def _path_customdata(vulture_data: pd.DataFrame) -> List[list]:
+    """Per-point hover data for _path_hovertemplate"""
+    return [
+        list(labels) for labels in zip(
+            vulture_data['timestamp_short'].tolist(),
+            format_height_display_array(vulture_data['Height']),
+            format_height_display_array(vulture_data.get(HEIGHT_AGL_COLUMN, np.full(len(vulture_data), np.nan))),
+        )
+    ]
+
+
+def _3d_frame_range(shared: Dict[str, Any], start: int, end: int) -> List[dict]:
+    """Frames [start, end) of Animation3DEngine._add_3d_animation_frames (range builder of utils.parallel_frames)"""
+    timeline = shared['timeline']
+    tracks = shared['tracks']
+    color_map = shared['color_map']
+    trail_mode = shared['trail_mode']
+    line_width = shared['line_width']
+    marker_size = shared['marker_size']
+    performance_mode = shared['performance_mode']
+    trace_indices = shared['trace_indices']
+    frames = []
+
+    for time_str, frame_ns in zip(timeline.labels[start:end], timeline.times_ns[start:end].tolist()):
+        frame_data = []
+        
+        # Add cumulative flight paths for each vulture with visual fading
+        for vulture_id in shared['vulture_ids']:
+            track = tracks.get(vulture_id)
+            track_end = int(np.searchsorted(track['keys'], frame_ns, side='right')) if track else 0
+            
+            if performance_mode:
+                # 'line_head' strategy: simplified cumulative line (no markers, no hover) + one head marker
+                if track_end > 0:
+                    head = track_end - 1
+                    line_rows = track['line_rows']
+                    line_rows = np.append(line_rows[:np.searchsorted(line_rows, head)], head)
+                    frame_data.append(
+                        raw_trace(
+                            'scatter3d',
+                            x=track['x'][line_rows],
+                            y=track['y'][line_rows],
+                            z=track['z'][line_rows],
+                            mode='lines',
+                            name=vulture_id,
+                            line=dict(color=color_map[vulture_id], width=line_width),
+                            hoverinfo='skip'
+                        )
+                    )
+                    frame_data.append(
+                        raw_trace(
+                            'scatter3d',
+                            x=track['x'][head:track_end],
+                            y=track['y'][head:track_end],
+                            z=track['z'][head:track_end],
+                            mode='markers',
+                            name=f"{vulture_id} (current)",
+                            marker=dict(color=color_map[vulture_id], size=marker_size,
+                                        line=dict(color='white', width=1)),
+                            customdata=track['customdata'][head:track_end],
+                            hovertemplate=_path_hovertemplate(vulture_id)
+                        )
+                    )
+                else:
+                    frame_data.append(raw_trace('scatter3d', x=[], y=[], z=[], mode='lines', name=vulture_id))
+                    frame_data.append(
+                        raw_trace('scatter3d', x=[], y=[], z=[], mode='markers', name=f"{vulture_id} (current)",
+                                  marker=dict(color=color_map[vulture_id], size=marker_size))
+                    )
+            else:
+                if track_end > 0:
+                    # Full trail with markers; hover data is precomputed per track
+                    customdata = track['customdata'][:track_end]
+                    marker = dict(
+                        color=color_map[vulture_id], 
+                        size=8,  # Fixed size for 3D markers
+                        opacity=0.8,  # Fixed opacity
+                    )
+                    if track_end > 1:
+                        marker['line'] = dict(color='white', width=1)  # White outline for better visibility
+
+                    frame_data.append(
+                        raw_trace(
+                            'scatter3d',
+                            x=track['x'][:track_end],
+                            y=track['y'][:track_end],
+                            z=track['z'][:track_end],
+                            mode=trail_mode,
+                            name=vulture_id,
+                            line=dict(color=color_map[vulture_id], width=line_width),
+                            marker=marker,
+                            customdata=customdata,
+                            hovertemplate=_path_hovertemplate(vulture_id)
+                        )
+                    )
+                else:
+                    # Empty trace for vultures with no data at this time
+                    frame_data.append(
+                        raw_trace(
+                            'scatter3d',
+                            x=[], y=[], z=[],
+                            mode=trail_mode,
+                            name=vulture_id,
+                            line=dict(color=color_map[vulture_id], width=line_width),
+                            marker=dict(color=color_map[vulture_id], size=marker_size)
+                        )
+                    )
+        
+        # Only the flight paths change; the terrain surface stays the figure's static trace
+        frames.append(raw_frame(frame_data, time_str, traces=trace_indices))
+    
+    return frames
 
 
 class Animation3DEngine:
@@ -37,15 +172,38 @@ class Animation3DEngine:
         
         # Animation data
         self.combined_data: Optional[pd.DataFrame] = None
+        # Terrain the height above ground columns of combined_data were sampled from
+        self._agl_terrain: Optional[ElevationData] = None
         
         # 3D visualization settings
         self.terrain_opacity = 0.7
         self.terrain_colorscale = 'earth'
+        # Finest terrain vertex spacing worth downloading, and the vertical error
+        # allowed when dropping grid lines in flat areas (0 keeps the full grid)
+        self.terrain_min_spacing_m = DEFAULT_MIN_SPACING_M
+        self.terrain_tolerance_m = 5.0
         self.base_animation_speed = 800  # ms per frame at 1x speed
         self.playback_speed = 1.0  # Default playback speed multiplier
         self.trail_mode = 'lines+markers'
         self.marker_size = 8
         self.line_width = 3
+        # Frame worker processes (None: FRAME_WORKERS environment variable or CPU count)
+        self.frame_workers: Optional[int] = None
+        # Performance mode: 'line_head' strategy (line trail + one head marker per bird) on LOD-reduced tracks
+        self.performance_mode = os.environ.get('PERFORMANCE_MODE', '0') == '1'
+        # Point budget of the animated fixes (frames) and of the drawn trail line
+        self.lod_config = LODConfig(
+            max_points_per_track=3000,
+            target_points_per_min=120,
+            rdp_epsilon_meters=10.0,
+            use_rdp=True,
+        )
+        self.line_lod_config = LODConfig(
+            max_points_per_track=1000,
+            target_points_per_min=0,
+            rdp_epsilon_meters=25.0,
+            use_rdp=True,
+        )
     
     def load_processed_data(self, combined_data: pd.DataFrame) -> None:
         """
@@ -55,8 +213,19 @@ class Animation3DEngine:
             combined_data: Combined and filtered GPS dataframe
         """
         self.combined_data = combined_data.copy()
+        self._agl_terrain = None
         print(f"🎬 Loaded {len(self.combined_data):,} GPS points for 3D animation")
     
+    def _ensure_height_above_ground(self) -> None:
+        """Sample the terrain under every fix once per loaded data and terrain"""
+        terrain = self.current_elevation_data
+        if terrain is None or self._agl_terrain is terrain:
+            return
+        add_height_above_ground(self.combined_data, terrain)
+        self._agl_terrain = terrain
+        agl = self.combined_data[HEIGHT_AGL_COLUMN]
+        print(f"🗻 Height above ground for {agl.notna().sum():,} of {len(agl):,} GPS points")
+    
     def set_playback_speed(self, speed_multiplier: float) -> None:
         """
         Set the playback speed multiplier
@@ -115,6 +284,34 @@ class Animation3DEngine:
             self.ui.print_error("Failed to load terrain data")
             return False
     
+    def setup_terrain_for_data(self, lats, lons, vertex_budget: int = 10_000,
+                               padding_km: float = 2.0, force_download: bool = False) -> bool:
+        """
+        Set up terrain covering the GPS fixes plus padding
+        
+        The grid resolution follows from the vertex budget, capped by
+        terrain_min_spacing_m, so small flight areas get small grids.
+        
+        Args:
+            lats, lons: GPS fix coordinates
+            vertex_budget: Maximum number of terrain grid vertices
+            padding_km: Margin around the fixes
+            force_download: Force re-download of elevation data
+            
+        Returns:
+            True if terrain setup successful, False otherwise
+        """
+        try:
+            bounds = self.elevation_manager.create_region_from_data(lats, lons, padding_km)
+        except ValueError as e:
+            self.ui.print_error(f"Cannot derive terrain bounds: {e}")
+            return False
+        height_km, width_km = self.elevation_manager.region_extent_km(bounds)
+        resolution = resolution_for_budget(height_km, width_km, vertex_budget, self.terrain_min_spacing_m)
+        print(f"🗺️ Terrain from data: {bounds.description}, {resolution}x{resolution} grid "
+              f"(budget {vertex_budget:,} vertices)")
+        return self.setup_terrain(bounds.name, resolution, force_download)
+    
     def create_3d_visualization(self, animation_type: str = 'full') -> Optional[str]:
         """
         Create 3D visualization with real terrain
@@ -140,10 +337,14 @@ class Animation3DEngine:
             # Prepare 3D data
             df = self._prepare_3d_data()
             
+            # Optionally reduce each track to the LOD point budget for performance mode
+            if self.performance_mode:
+                df = self._apply_performance_lod(df)
+            
             # Validate data is within terrain bounds
             if not self._validate_data_bounds(df):
                 self.ui.print_warning("GPS data extends beyond terrain bounds")
-                print("Consider using a larger terrain region or different data")
+                print("Consider the 'auto' region (terrain bounds from the data) or a larger region")
             
             # Create 3D figure
             fig = self._create_3d_figure(df, animation_type)
@@ -172,16 +373,8 @@ class Animation3DEngine:
             filename = f'{base_filename}_{birds_filename}'
             output_path = get_numbered_output_path(filename)
             
-            # Generate HTML with fullscreen support
-            html_string = fig.to_html()
-            try:
-                html_string = inject_fullscreen(html_string)
-            except Exception as e:
-                print(f"Warning: Could not inject fullscreen functionality: {e}")
-            
-            # Write the HTML file
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_string)
+            # Write the HTML with fullscreen support (compact arrays)
+            write_animation_html(fig, output_path)
             
             self.ui.print_success(f"🏔️ 3D visualization saved: {output_path}")
             return output_path
@@ -192,16 +385,18 @@ class Animation3DEngine:
     
     def _prepare_3d_data(self) -> pd.DataFrame:
         """Prepare data for 3D visualization"""
-        df = self.combined_data.copy()
-        
         # Ensure required columns exist
         required_columns = ['Timestamp [UTC]', 'Latitude', 'Longitude', 'Height', 'vulture_id']
         for col in required_columns:
-            if col not in df.columns:
+            if col not in self.combined_data.columns:
                 raise ValueError(f"Required column '{col}' not found in data")
         
+        # Terrain height under each fix, cached on the loaded data
+        self._ensure_height_above_ground()
+        df = self.combined_data.copy()
+        
         # Create formatted timestamps for display
-        df['timestamp_str'] = df['Timestamp [UTC]'].dt.strftime('%d.%m.%Y %H:%M:%S')
+        add_timeline_columns(df)
         df['timestamp_short'] = df['Timestamp [UTC]'].dt.strftime('%H:%M')
         
         # Sort by timestamp for proper animation
@@ -213,6 +408,23 @@ class Animation3DEngine:
         
         return df
     
+    def _apply_performance_lod(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Reduce tracks above the LOD point budget (temporal decimation, RDP, hard cap)"""
+        self.ui.print_section("⚡ 3D PERFORMANCE MODE")
+        try:
+            per_vulture = []
+            for _, seg in df.groupby('vulture_id', sort=False):
+                if len(seg) > self.lod_config.max_points_per_track:
+                    seg = apply_lod(seg, 'Timestamp [UTC]', 'Latitude', 'Longitude', self.lod_config)
+                per_vulture.append(seg)
+            reduced = pd.concat(per_vulture, ignore_index=True)
+            reduced = reduced.sort_values('Timestamp [UTC]', kind='mergesort').reset_index(drop=True)
+            print(f"⚡ 3D performance mode: applied LOD, points {len(df):,} -> {len(reduced):,}")
+            return reduced
+        except Exception as e:
+            self.ui.print_warning(f"Failed to apply 3D LOD: {e}")
+            return df
+    
     def _validate_data_bounds(self, df: pd.DataFrame) -> bool:
         """Check if GPS data fits within terrain bounds"""
         terrain = self.current_elevation_data
@@ -241,24 +453,40 @@ class Animation3DEngine:
         colors = px.colors.qualitative.Set1[:len(vulture_ids)]
         
         for i, vulture_id in enumerate(vulture_ids):
-            fig.add_trace(
-                go.Scatter3d(
-                    x=[], y=[], z=[],
-                    mode=self.trail_mode,
-                    name=vulture_id,
-                    line=dict(color=colors[i], width=self.line_width),
-                    marker=dict(color=colors[i], size=self.marker_size),
-                    showlegend=True,  # Ensure all birds always show in legend
-                    hovertemplate=(
-                        f"<b>{vulture_id}</b><br>"
-                        "Time: %{customdata[0]}<br>"
-                        "Lat: %{y:.4f}°<br>"
-                        "Lon: %{x:.4f}°<br>"
-                        "Alt: %{customdata[1]}m"
-                        "<extra></extra>"
+            if self.performance_mode:
+                # Line + head: trail as a line (no markers, no hover) + a separate head marker trace
+                fig.add_trace(
+                    go.Scatter3d(
+                        x=[], y=[], z=[],
+                        mode='lines',
+                        name=vulture_id,
+                        line=dict(color=colors[i], width=self.line_width),
+                        hoverinfo='skip',
+                        showlegend=True,
+                    )
+                )
+                fig.add_trace(
+                    go.Scatter3d(
+                        x=[], y=[], z=[],
+                        mode='markers',
+                        name=f"{vulture_id} (current)",
+                        marker=dict(color=colors[i], size=self.marker_size),
+                        showlegend=False,
+                        hovertemplate=_path_hovertemplate(vulture_id)
+                    )
+                )
+            else:
+                fig.add_trace(
+                    go.Scatter3d(
+                        x=[], y=[], z=[],
+                        mode=self.trail_mode,
+                        name=vulture_id,
+                        line=dict(color=colors[i], width=self.line_width),
+                        marker=dict(color=colors[i], size=self.marker_size),
+                        showlegend=True,  # Ensure all birds always show in legend
+                        hovertemplate=_path_hovertemplate(vulture_id)
                     )
                 )
-            )
         
         return fig
     
@@ -268,15 +496,18 @@ class Animation3DEngine:
         
         print("   🏔️ Adding terrain surface...")
         
-        # Create meshgrid for terrain
-        X, Y = np.meshgrid(terrain.lons, terrain.lats)
+        # Drop grid lines in flat areas (non-uniform axes are fine for a surface)
+        lons, lats, elevations = decimate_terrain_grid(
+            terrain.lons, terrain.lats, terrain.elevations, self.terrain_tolerance_m
+        )
         
-        # Add terrain surface
+        # Add terrain surface (1-D axes: plotly spans the grid, no meshgrid copies;
+        # heights as int16 whole meters)
         fig.add_trace(
             go.Surface(
-                x=X,
-                y=Y,
-                z=terrain.elevations,
+                x=lons,
+                y=lats,
+                z=quantize_elevations(elevations),
                 colorscale=self.terrain_colorscale,
                 opacity=self.terrain_opacity,
                 showscale=False,
@@ -302,7 +533,8 @@ class Animation3DEngine:
             )
         )
         
-        print(f"   ✅ Terrain surface added ({terrain.resolution}x{terrain.resolution} grid)")
+        print(f"   ✅ Terrain surface added ({len(lats)}x{len(lons)} of "
+              f"{terrain.resolution}x{terrain.resolution} grid lines)")
     
     def _add_3d_animation_frames(self, fig: go.Figure, df: pd.DataFrame) -> None:
         """Add animation frames for 3D visualization"""
@@ -311,80 +543,44 @@ class Animation3DEngine:
         color_map = dict(zip(vulture_ids, colors))
         
         # Get unique timestamps for frames
-        unique_times = df['timestamp_str'].unique()
-        
-        print(f"   🎬 Creating {len(unique_times)} animation frames...")
-        
-        frames = []
-        for time_str in unique_times:
-            frame_data = []
-            
-            # Re-add terrain surface for each frame
-            terrain = self.current_elevation_data
-            X, Y = np.meshgrid(terrain.lons, terrain.lats)
-            frame_data.append(
-                go.Surface(
-                    x=X, y=Y, z=terrain.elevations,
-                    colorscale=self.terrain_colorscale,
-                    opacity=self.terrain_opacity,
-                    showscale=False,
-                    name=f'Terrain ({terrain.region_name})'
-                )
-            )
-            
-            # Add cumulative flight paths for each vulture with visual fading
-            for vulture_id in vulture_ids:
-                vulture_data = df[df['vulture_id'] == vulture_id]
-                cumulative_data = vulture_data[vulture_data['timestamp_str'] <= time_str].sort_values('Timestamp [UTC]')
-                
-                if len(cumulative_data) > 0:
-                    # Prepare custom data for hover
-                    customdata = []
-                    for i, (_, row) in enumerate(cumulative_data.iterrows()):
-                        height_display = format_height_display(row['Height'])
-                        customdata.append([row['timestamp_short'], height_display])
-                    
-                    frame_data.append(
-                        go.Scatter3d(
-                            x=cumulative_data['Longitude'].tolist(),
-                            y=cumulative_data['Latitude'].tolist(),
-                            z=cumulative_data['Height'].tolist(),
-                            mode=self.trail_mode,
-                            name=vulture_id,
-                            line=dict(color=color_map[vulture_id], width=self.line_width),
-                            marker=dict(
-                                color=color_map[vulture_id], 
-                                size=8,  # Fixed size for 3D markers
-                                opacity=0.8,  # Fixed opacity
-                                line=dict(
-                                    color='white',
-                                    width=1
-                                ) if len(cumulative_data) > 1 else None  # White outline for better visibility
-                            ),
-                            customdata=customdata,
-                            hovertemplate=(
-                                f"<b>{vulture_id}</b><br>"
-                                "Time: %{customdata[0]}<br>"
-                                "Lat: %{y:.4f}°<br>"
-                                "Lon: %{x:.4f}°<br>"
-                                "Alt: %{customdata[1]}"
-                                "<extra></extra>"
-                            )
-                        )
-                    )
-                else:
-                    # Empty trace for vultures with no data at this time
-                    frame_data.append(
-                        go.Scatter3d(
-                            x=[], y=[], z=[],
-                            mode=self.trail_mode,
-                            name=vulture_id,
-                            line=dict(color=color_map[vulture_id], width=self.line_width),
-                            marker=dict(color=color_map[vulture_id], size=self.marker_size)
-                        )
-                    )
-            
-            frames.append(go.Frame(data=frame_data, name=time_str))
+        timeline = AnimationTimeline.from_dataframe(df)
+        
+        print(f"   🎬 Creating {len(timeline)} animation frames...")
+        
+        # Sort each track once and precompute per-point hover data; every frame
+        # then shows a prefix of the track
+        tracks = {}
+        for vulture_id, vulture_data in df.groupby('vulture_id', sort=False):
+            vulture_data = vulture_data.sort_values('Timestamp [UTC]', kind='mergesort')
+            tracks[vulture_id] = {
+                'keys': frame_keys(vulture_data['timestamp_ns'].to_numpy(dtype='int64')),
+                'x': vulture_data['Longitude'].to_numpy(dtype=np.float64),
+                'y': vulture_data['Latitude'].to_numpy(dtype=np.float64),
+                'z': vulture_data['Height'].to_numpy(dtype=np.float64),
+                'customdata': _path_customdata(vulture_data),
+            }
+            if self.performance_mode:
+                # Row positions of the simplified trail line; each frame draws the kept
+                # vertices before its head, then the head itself
+                rows = vulture_data[['Timestamp [UTC]', 'Latitude', 'Longitude']].assign(
+                    row=np.arange(len(vulture_data)))
+                tracks[vulture_id]['line_rows'] = apply_lod(
+                    rows, 'Timestamp [UTC]', 'Latitude', 'Longitude', self.line_lod_config
+                )['row'].to_numpy(dtype=np.int64)
+        
+        shared = {
+            'timeline': timeline,
+            'tracks': tracks,
+            'vulture_ids': list(vulture_ids),
+            'color_map': color_map,
+            # Vulture traces come first in _create_3d_figure, the terrain surface after them
+            'trace_indices': list(range(self._traces_per_vulture() * len(vulture_ids))),
+            'performance_mode': self.performance_mode,
+            'trail_mode': self.trail_mode,
+            'line_width': self.line_width,
+            'marker_size': self.marker_size,
+        }
+        frames = build_frames(_3d_frame_range, shared, len(timeline), max_workers=self.frame_workers)
         
         fig.frames = frames
         print(f"   ✅ Added {len(frames)} 3D animation frames")
@@ -400,21 +596,25 @@ class Animation3DEngine:
             
             if len(vulture_data) > 0:
                 # Prepare custom data for hover
-                customdata = []
-                for _, row in vulture_data.iterrows():
-                    height_display = format_height_display(row['Height'])
-                    customdata.append([row['timestamp_short'], height_display])
+                customdata = _path_customdata(vulture_data)
                 
                 # Update the existing trace
-                fig.data[i].update(
-                    x=vulture_data['Longitude'].tolist(),
-                    y=vulture_data['Latitude'].tolist(),
-                    z=vulture_data['Height'].tolist(),
-                    customdata=customdata
-                )
+                x = vulture_data['Longitude'].to_numpy(dtype=np.float64)
+                y = vulture_data['Latitude'].to_numpy(dtype=np.float64)
+                z = vulture_data['Height'].to_numpy(dtype=np.float64)
+                if self.performance_mode:
+                    # Full line without hover, head marker at the last fix
+                    fig.data[2 * i].update(x=x, y=y, z=z)
+                    fig.data[2 * i + 1].update(x=x[-1:], y=y[-1:], z=z[-1:], customdata=customdata[-1:])
+                else:
+                    fig.data[i].update(x=x, y=y, z=z, customdata=customdata)
         
         print(f"   ✅ Added static paths for {len(vulture_ids)} vultures")
     
+    def _traces_per_vulture(self) -> int:
+        """Flight path traces per vulture at the start of fig.data (line + head in performance mode)"""
+        return 2 if self.performance_mode else 1
+    
     def _apply_3d_layout(self, fig: go.Figure, df: pd.DataFrame, animation_type: str) -> None:
         """Apply 3D layout settings"""
         terrain = self.current_elevation_data
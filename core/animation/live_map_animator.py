@@ -9,13 +9,17 @@ import plotly.express as px
 
 from utils.user_interface import UserInterface
 from utils.performance_optimizer import PerformanceOptimizer
-from utils.html_injection import inject_fullscreen
 from utils.animation_builders import (
+    OUTPUT_MODES,
     build_color_map,
     create_base_figure,
     apply_standard_layout,
     apply_controls_and_slider,
     attach_frames,
+    attach_animation,
+    write_animation_html,
+    CLIENT_PLAYBACK_MODES,
+    DEFAULT_CHUNK_FRAMES,
 )
 from core.animation.data_processor import DataProcessor
 from core.animation.precipitation_manager import PrecipitationManager
@@ -31,6 +35,7 @@ from core.gps_utils import (
 from core.export.video_export import export_animation_video
 from core.export.browser_video_export import export_animation_video_browser
 from utils.lod import LODConfig, apply_lod
+from utils.animation_timeline import AnimationTimeline, add_timeline_columns
 from utils.offline_tiles import ensure_offline_style_for_bounds
 
 
@@ -66,6 +71,18 @@ class LiveMapAnimator:
         self.performance_mode = os.environ.get('PERFORMANCE_MODE', '0') == '1'
         self.export_mp4 = os.environ.get('EXPORT_MP4', '0') == '1'
         self.export_mp4_browser = os.environ.get('EXPORT_MP4_BROWSER', '0') == '1'
+        # 'frames' embeds every frame in the HTML, 'indexed' ships tracks once plus per-frame ranges,
+        # 'player' ships tracks once and plays them back client-side, 'chunked' loads the tracks
+        # from time-chunk files of ANIMATION_CHUNK_FRAMES frames (see utils.animation_builders)
+        self.output_mode = os.environ.get('ANIMATION_OUTPUT_MODE', 'frames').strip().lower()
+        if self.output_mode not in OUTPUT_MODES:
+            print(f"⚠️ Unknown ANIMATION_OUTPUT_MODE: {self.output_mode}, using 'frames'")
+            self.output_mode = 'frames'
+        try:
+            self.chunk_frames = max(1, int(os.environ.get('ANIMATION_CHUNK_FRAMES', DEFAULT_CHUNK_FRAMES)))
+        except ValueError:
+            print(f"⚠️ Invalid ANIMATION_CHUNK_FRAMES, using {DEFAULT_CHUNK_FRAMES}")
+            self.chunk_frames = DEFAULT_CHUNK_FRAMES
         # Check GUI online map mode setting first (takes precedence)
         online_gui = os.environ.get('ONLINE_MAP_MODE')
         if online_gui:
@@ -200,7 +217,9 @@ class LiveMapAnimator:
                 performance_mode=self.performance_mode,
                 export_mp4=self.export_mp4,
                 export_mp4_browser=self.export_mp4_browser,
-                base_name='live_map_animation'
+                base_name='live_map_animation',
+                output_mode=self.output_mode,
+                chunk_frames=self.chunk_frames,
             ):
                 return False
 
@@ -350,8 +369,7 @@ class LiveMapAnimator:
         print("Creating interactive live map animation...")
         try:
             df = combined_data.copy()
-            df['timestamp_str'] = df['Timestamp [UTC]'].dt.strftime('%d.%m.%Y %H:%M:%S')
-            df['timestamp_display'] = df['Timestamp [UTC]'].dt.strftime('%d.%m %H:%M')
+            add_timeline_columns(df)
             df = df.sort_values('Timestamp [UTC]')
             vulture_ids = df['vulture_id'].unique()
             color_map = build_color_map(vulture_ids)
@@ -363,7 +381,7 @@ class LiveMapAnimator:
             lon_min, lon_max = df['Longitude'].min(), df['Longitude'].max()
             strategy = "line_head" if self.performance_mode else "markers_fade"
             fig = create_base_figure(vulture_ids, color_map, strategy=strategy)
-            unique_times = sorted(df['timestamp_str'].unique())
+            unique_times = AnimationTimeline.from_dataframe(df)
             full_df_for_video = df.copy()
             if self.performance_mode:
                 lod_cfg = LODConfig(
@@ -377,13 +395,16 @@ class LiveMapAnimator:
                     seg = df[df['vulture_id'] == vid].copy()
                     if len(seg) > lod_cfg.max_points_per_track:
                         seg = apply_lod(seg, 'Timestamp [UTC]', 'Latitude', 'Longitude', lod_cfg)
-                        seg['timestamp_str'] = seg['Timestamp [UTC]'].dt.strftime('%d.%m.%Y %H:%M:%S')
-                        seg['timestamp_display'] = seg['Timestamp [UTC]'].dt.strftime('%d.%m %H:%M')
+                        add_timeline_columns(seg)
                     per_vulture.append(seg)
                 df = pd.concat(per_vulture, ignore_index=True)
-                unique_times = sorted(df['timestamp_str'].unique())
-            attach_frames(
+                unique_times = AnimationTimeline.from_dataframe(df)
+            client_output = attach_animation(
                 fig,
+                output_mode=self.output_mode,
+                frame_duration_ms=self.get_frame_duration(),
+                chunk_frames=self.chunk_frames,
+                validate_frames=False,  # only written to HTML
                 trail_system=self.trail_system,
                 df=df,
                 vulture_ids=vulture_ids,
@@ -421,6 +442,9 @@ class LiveMapAnimator:
                 center_lon=center_lon,
                 zoom_level=zoom_level,
                 include_speed_controls=True,
+                client_playback=self.output_mode in CLIENT_PLAYBACK_MODES,
+                trail_options=self.trail_system.trail_length_choices(),
+                trail_minutes=self.trail_system.trail_length_minutes,
             )
             # Precipitation / rain radar feature removed per user request.
             filename = self.trail_system.get_output_filename(base_name=base_name, bird_names=list(vulture_ids))
@@ -437,10 +461,7 @@ class LiveMapAnimator:
                 'doubleClick': 'reset',
                 'showTips': True,
             }
-            html_string = fig.to_html(config=config)
-            html_string = inject_fullscreen(html_string)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_string)
+            write_animation_html(fig, output_path, config, client_output)
             if self.offline_map:
                 try:
                     html_dir = os.path.dirname(output_path)
@@ -480,7 +501,7 @@ class LiveMapAnimator:
                         except Exception as be:
                             self.ui.print_warning(f"Browser video export failed, falling back to offline export: {be}")
                             fig_full = create_base_figure(vulture_ids, color_map, strategy="markers_fade")
-                            full_times = sorted(full_df_for_video['timestamp_str'].unique())
+                            full_times = AnimationTimeline.from_dataframe(full_df_for_video)
                             attach_frames(
                                 fig_full,
                                 trail_system=self.trail_system,
@@ -504,7 +525,7 @@ class LiveMapAnimator:
                     else:
                         self.ui.print_info("Video export: Using offline rendering (no map tiles)")
                         fig_full = create_base_figure(vulture_ids, color_map, strategy="markers_fade")
-                        full_times = sorted(full_df_for_video['timestamp_str'].unique())
+                        full_times = AnimationTimeline.from_dataframe(full_df_for_video)
                         attach_frames(
                             fig_full,
                             trail_system=self.trail_system,
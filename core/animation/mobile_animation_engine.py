@@ -6,17 +6,116 @@ Provides touch-friendly interfaces and performance-optimized rendering.
 """
 
 import os
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from typing import Optional, Dict, Any
-from gps_utils import VisualizationHelper, format_height_display, get_numbered_output_path
+from typing import Optional, Dict, Any, List
+from gps_utils import VisualizationHelper, format_height_display_array, get_numbered_output_path
 from utils.enhanced_timeline_labels import create_enhanced_slider_config
 from utils.animation_state_manager import create_reliable_animation_controls
 from utils.user_interface import UserInterface
 from utils.offline_tiles import ensure_offline_style_for_bounds
-from utils.html_injection import inject_fullscreen
 from utils.lod import LODConfig, apply_lod
+from utils.animation_timeline import AnimationTimeline, add_timeline_columns, frame_keys
+from utils.animation_builders import fade_marker_styles, raw_frame, raw_trace, write_animation_html
+from utils.parallel_frames import build_frames
+
+
+def _mobile_frame_range(shared: Dict[str, Any], start: int, end: int) -> List[dict]:
+    """Frames [start, end) of MobileAnimationEngine._add_mobile_frames (range builder of utils.parallel_frames)"""
+    timeline = shared['timeline']
+    tracks = shared['tracks']
+    color_map = shared['color_map']
+    performance_mode = shared['performance_mode']
+    marker_size = shared['marker_size']
+    frames = []
+
+    for time_str, frame_ns in zip(timeline.labels[start:end], timeline.times_ns[start:end].tolist()):
+        frame_data = []
+        for vulture_id in shared['vulture_ids']:
+            track = tracks.get(vulture_id)
+            track_end = int(np.searchsorted(track['keys'], frame_ns, side='right')) if track else 0
+
+            if performance_mode:
+                # For performance 'line_head' strategy, add two traces per vulture:
+                # 1) cumulative line trace (trail)
+                # 2) head marker trace (current position)
+                if track_end > 0:
+                    # cumulative line
+                    frame_data.append(
+                        raw_trace(
+                            'scattermap',
+                            lat=track['lat'][:track_end],
+                            lon=track['lon'][:track_end],
+                            mode='lines',
+                            name=vulture_id,
+                            line=dict(color=color_map[vulture_id], width=3),
+                            hoverinfo='skip'
+                        )
+                    )
+                    # current head marker
+                    customdata = [track['customdata'][track_end - 1]]
+                    frame_data.append(
+                        raw_trace(
+                            'scattermap',
+                            lat=[track['lat'][track_end - 1]],
+                            lon=[track['lon'][track_end - 1]],
+                            mode='markers',
+                            name=f"{vulture_id} (current)",
+                            marker=dict(color=color_map[vulture_id], size=marker_size + 4, opacity=1.0),
+                            customdata=customdata,
+                            hovertemplate=(
+                                f"<b>{vulture_id}</b><br>"
+                                "Time: %{customdata[0]}<br>"
+                                "Lat: %{lat:.4f}°<br>"
+                                "Lon: %{lon:.4f}°<br>"
+                                "Alt: %{customdata[1]}"
+                                "<extra></extra>"
+                            )
+                        )
+                    )
+                else:
+                    # empty line + empty head
+                    frame_data.append(raw_trace('scattermap', lat=[], lon=[], mode='lines', name=vulture_id))
+                    frame_data.append(raw_trace('scattermap', lat=[], lon=[], mode='markers', name=f"{vulture_id} (current)", marker=dict(size=marker_size)))
+            else:
+                if track_end > 0:
+                    # full trail + markers (same as before)
+                    marker_sizes, marker_opacities = fade_marker_styles(
+                        track_end, min_size=max(6, marker_size - 4), size_range=4,
+                        head_size=marker_size + 4, min_opacity=0.4, opacity_range=0.4,
+                    )
+                    customdata = track['customdata'][:track_end]
+
+                    frame_data.append(
+                        raw_trace(
+                            'scattermap',
+                            lat=track['lat'][:track_end],
+                            lon=track['lon'][:track_end],
+                            mode='lines+markers',
+                            name=vulture_id,
+                            line=dict(color=color_map[vulture_id], width=4),
+                            marker=dict(color=color_map[vulture_id], size=marker_sizes, opacity=marker_opacities),
+                            customdata=customdata,
+                            hovertemplate=(
+                                f"<b>{vulture_id}</b><br>"
+                                "Time: %{customdata[0]}<br>"
+                                "Lat: %{lat:.4f}°<br>"
+                                "Lon: %{lon:.4f}°<br>"
+                                "Alt: %{customdata[1]}"
+                                "<extra></extra>"
+                            )
+                        )
+                    )
+                else:
+                    frame_data.append(
+                        raw_trace('scattermap', lat=[], lon=[], mode='lines+markers', name=vulture_id, marker=dict(size=marker_size))
+                    )
+
+        frames.append(raw_frame(frame_data, time_str))
+    
+    return frames
 
 
 class MobileAnimationEngine:
@@ -45,6 +144,8 @@ class MobileAnimationEngine:
         except Exception:
             self.playback_speed = 1.0
         self.performance_mode = os.environ.get('PERFORMANCE_MODE', '0') == '1'
+        # Frame worker processes (None: FRAME_WORKERS environment variable or CPU count)
+        self.frame_workers: Optional[int] = None
         
         # Animation data
         self.combined_data: Optional[pd.DataFrame] = None
@@ -94,8 +195,8 @@ class MobileAnimationEngine:
                         seg = df[df['vulture_id'] == vid].copy()
                         if len(seg) > lod_cfg.max_points_per_track:
                             seg = apply_lod(seg, 'Timestamp [UTC]', 'Latitude', 'Longitude', lod_cfg)
-                            seg['timestamp_str'] = seg['Timestamp [UTC]'].dt.strftime('%d.%m.%Y %H:%M:%S')
-                            seg['timestamp_mobile'] = seg['Timestamp [UTC]'].dt.strftime('%d.%m %H:%M')
+                            add_timeline_columns(seg)
+                            seg['timestamp_mobile'] = seg['timestamp_display']
                         per_vulture.append(seg)
                     df = pd.concat(per_vulture, ignore_index=True)
                     df = df.sort_values('Timestamp [UTC]')
@@ -170,15 +271,8 @@ class MobileAnimationEngine:
                 'showTips': True,
             }
 
-            html_string = fig.to_html(config=config)
-            try:
-                html_string = inject_fullscreen(html_string)
-            except Exception:
-                pass
-
-            # Write out the HTML
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_string)
+            # Write out the HTML (compact arrays, fullscreen support)
+            write_animation_html(fig, output_path, config)
 
             # If offline tiles were used and tiles dir is absolute, copy tiles next to HTML for portability
             try:
@@ -203,8 +297,8 @@ class MobileAnimationEngine:
         df = self.combined_data.copy()
         
         # Create mobile-friendly timestamp formats
-        df['timestamp_str'] = df['Timestamp [UTC]'].dt.strftime('%d.%m.%Y %H:%M:%S')
-        df['timestamp_mobile'] = df['Timestamp [UTC]'].dt.strftime('%d.%m %H:%M')
+        add_timeline_columns(df)
+        df['timestamp_mobile'] = df['timestamp_display']
         
         # Sort for proper animation
         df = df.sort_values('Timestamp [UTC]')
@@ -284,104 +378,36 @@ class MobileAnimationEngine:
         colors = px.colors.qualitative.Set1[:len(vulture_ids)]
         color_map = dict(zip(vulture_ids, colors))
         
-        frames = []
-        unique_times = df['timestamp_str'].unique()
+        timeline = AnimationTimeline.from_dataframe(df)
         
-        print(f"   📊 Creating {len(unique_times)} animation frames...")
+        print(f"   📊 Creating {len(timeline)} animation frames...")
         
-        for time_str in unique_times:
-            frame_data = []
-            for vulture_id in vulture_ids:
-                vulture_data = df[df['vulture_id'] == vulture_id]
-                cumulative_data = vulture_data[vulture_data['timestamp_str'] <= time_str].sort_values('Timestamp [UTC]')
-
-                if self.performance_mode:
-                    # For performance 'line_head' strategy, add two traces per vulture:
-                    # 1) cumulative line trace (trail)
-                    # 2) head marker trace (current position)
-                    if len(cumulative_data) > 0:
-                        # cumulative line
-                        frame_data.append(
-                            go.Scattermap(
-                                lat=cumulative_data['Latitude'].tolist(),
-                                lon=cumulative_data['Longitude'].tolist(),
-                                mode='lines',
-                                name=vulture_id,
-                                line=dict(color=color_map[vulture_id], width=3),
-                                hoverinfo='skip'
-                            )
-                        )
-                        # current head marker
-                        last = cumulative_data.iloc[-1]
-                        customdata = [[last['timestamp_mobile'], format_height_display(last['Height'])]]
-                        frame_data.append(
-                            go.Scattermap(
-                                lat=[last['Latitude']],
-                                lon=[last['Longitude']],
-                                mode='markers',
-                                name=f"{vulture_id} (current)",
-                                marker=dict(color=color_map[vulture_id], size=self.mobile_marker_size + 4, opacity=1.0),
-                                customdata=customdata,
-                                hovertemplate=(
-                                    f"<b>{vulture_id}</b><br>"
-                                    "Time: %{customdata[0]}<br>"
-                                    "Lat: %{lat:.4f}°<br>"
-                                    "Lon: %{lon:.4f}°<br>"
-                                    "Alt: %{customdata[1]}"
-                                    "<extra></extra>"
-                                )
-                            )
-                        )
-                    else:
-                        # empty line + empty head
-                        frame_data.append(go.Scattermap(lat=[], lon=[], mode='lines', name=vulture_id))
-                        frame_data.append(go.Scattermap(lat=[], lon=[], mode='markers', name=f"{vulture_id} (current)", marker=dict(size=self.mobile_marker_size)))
-                else:
-                    if len(cumulative_data) > 0:
-                        # full trail + markers (same as before)
-                        trail_points = len(cumulative_data)
-                        marker_sizes = []
-                        marker_opacities = []
-                        customdata = []
-                        for i, (_, row) in enumerate(cumulative_data.iterrows()):
-                            height_display = format_height_display(row['Height'])
-                            customdata.append([row['timestamp_mobile'], height_display])
-                            age_factor = i / max(1, trail_points - 1) if trail_points > 1 else 1.0
-                            if i == trail_points - 1:
-                                marker_sizes.append(self.mobile_marker_size + 4)
-                                marker_opacities.append(1.0)
-                            else:
-                                base_size = max(6, self.mobile_marker_size - 4)
-                                fade_size = base_size + (4 * age_factor)
-                                marker_sizes.append(fade_size)
-                                fade_opacity = 0.4 + (0.4 * age_factor)
-                                marker_opacities.append(fade_opacity)
-
-                        frame_data.append(
-                            go.Scattermap(
-                                lat=cumulative_data['Latitude'].tolist(),
-                                lon=cumulative_data['Longitude'].tolist(),
-                                mode='lines+markers',
-                                name=vulture_id,
-                                line=dict(color=color_map[vulture_id], width=4),
-                                marker=dict(color=color_map[vulture_id], size=marker_sizes, opacity=marker_opacities),
-                                customdata=customdata,
-                                hovertemplate=(
-                                    f"<b>{vulture_id}</b><br>"
-                                    "Time: %{customdata[0]}<br>"
-                                    "Lat: %{lat:.4f}°<br>"
-                                    "Lon: %{lon:.4f}°<br>"
-                                    "Alt: %{customdata[1]}"
-                                    "<extra></extra>"
-                                )
-                            )
-                        )
-                    else:
-                        frame_data.append(
-                            go.Scattermap(lat=[], lon=[], mode='lines+markers', name=vulture_id, marker=dict(size=self.mobile_marker_size))
-                        )
-
-            frames.append(go.Frame(data=frame_data, name=time_str))
+        # Sort each track once and precompute per-point hover data; every frame
+        # then shows a prefix of the track
+        tracks = {}
+        for vulture_id, vulture_data in df.groupby('vulture_id', sort=False):
+            vulture_data = vulture_data.sort_values('Timestamp [UTC]', kind='mergesort')
+            tracks[vulture_id] = {
+                'keys': frame_keys(vulture_data['timestamp_ns'].to_numpy(dtype='int64')),
+                'lat': vulture_data['Latitude'].to_numpy(dtype=np.float64),
+                'lon': vulture_data['Longitude'].to_numpy(dtype=np.float64),
+                'customdata': [
+                    [time_label, height_label] for time_label, height_label in zip(
+                        vulture_data['timestamp_mobile'].tolist(),
+                        format_height_display_array(vulture_data['Height']),
+                    )
+                ],
+            }
+        
+        shared = {
+            'timeline': timeline,
+            'tracks': tracks,
+            'vulture_ids': list(vulture_ids),
+            'color_map': color_map,
+            'performance_mode': self.performance_mode,
+            'marker_size': self.mobile_marker_size,
+        }
+        frames = build_frames(_mobile_frame_range, shared, len(timeline), max_workers=self.frame_workers)
         
         fig.frames = frames
         print(f"   ✅ Added {len(frames)} mobile-optimized frames")
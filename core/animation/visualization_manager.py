@@ -8,13 +8,16 @@ from pathlib import Path
 import pandas as pd
 
 from utils.user_interface import UserInterface
-from utils.html_injection import inject_fullscreen
 from utils.animation_builders import (
     build_color_map,
     create_base_figure,
     apply_standard_layout,
     apply_controls_and_slider,
     attach_frames,
+    attach_animation,
+    write_animation_html,
+    CLIENT_PLAYBACK_MODES,
+    DEFAULT_CHUNK_FRAMES,
 )
 from core.data.trail_system import TrailSystem
 from core.gps_utils import (
@@ -24,6 +27,7 @@ from core.gps_utils import (
 from core.export.video_export import export_animation_video
 from core.export.browser_video_export import export_animation_video_browser
 from utils.lod import LODConfig, apply_lod
+from utils.animation_timeline import AnimationTimeline, add_timeline_columns
 from utils.offline_tiles import ensure_offline_style_for_bounds
 
 
@@ -40,7 +44,20 @@ class VisualizationManager:
                            offline_map_download: bool, base_animation_speed: float,
                            playback_speed: float, performance_mode: bool,
                            export_mp4: bool, export_mp4_browser: bool,
-                           base_name: str = 'live_map_animation') -> bool:
+                           base_name: str = 'live_map_animation',
+                           output_mode: str = 'frames',
+                           chunk_frames: int = DEFAULT_CHUNK_FRAMES) -> bool:
+        """
+        Build and save the interactive live map animation
+
+        output_mode 'frames' embeds every Plotly frame in the HTML; 'indexed'
+        embeds each track once plus per-frame row ranges and lets the browser
+        rebuild the frames (much smaller files for long trails); 'player'
+        embeds each track once and plays it back client-side with smoothly
+        interpolated heads at any speed; 'chunked' plays back the same way
+        from track files of chunk_frames frames each, written next to the
+        HTML and loaded around the playhead.
+        """
 
         if combined_data is None or len(combined_data) == 0:
             return False
@@ -50,8 +67,7 @@ class VisualizationManager:
 
         try:
             df = combined_data.copy()
-            df['timestamp_str'] = df['Timestamp [UTC]'].dt.strftime('%d.%m.%Y %H:%M:%S')
-            df['timestamp_display'] = df['Timestamp [UTC]'].dt.strftime('%d.%m %H:%M')
+            add_timeline_columns(df)
             df = df.sort_values('Timestamp [UTC]')
 
             vulture_ids = df['vulture_id'].unique()
@@ -66,7 +82,7 @@ class VisualizationManager:
 
             strategy = "line_head" if performance_mode else "markers_fade"
             fig = create_base_figure(vulture_ids, color_map, strategy=strategy)
-            unique_times = sorted(df['timestamp_str'].unique())
+            unique_times = AnimationTimeline.from_dataframe(df)
             full_df_for_video = df.copy()
 
             if performance_mode:
@@ -81,14 +97,18 @@ class VisualizationManager:
                     seg = df[df['vulture_id'] == vid].copy()
                     if len(seg) > lod_cfg.max_points_per_track:
                         seg = apply_lod(seg, 'Timestamp [UTC]', 'Latitude', 'Longitude', lod_cfg)
-                        seg['timestamp_str'] = seg['Timestamp [UTC]'].dt.strftime('%d.%m.%Y %H:%M:%S')
-                        seg['timestamp_display'] = seg['Timestamp [UTC]'].dt.strftime('%d.%m %H:%M')
+                        add_timeline_columns(seg)
                     per_vulture.append(seg)
                 df = pd.concat(per_vulture, ignore_index=True)
-                unique_times = sorted(df['timestamp_str'].unique())
+                unique_times = AnimationTimeline.from_dataframe(df)
 
-            attach_frames(
+            frame_duration_ms = max(50, int(base_animation_speed / playback_speed))
+            client_output = attach_animation(
                 fig,
+                output_mode=output_mode,
+                frame_duration_ms=frame_duration_ms,
+                chunk_frames=chunk_frames,
+                validate_frames=False,  # only written to HTML
                 trail_system=trail_system,
                 df=df,
                 vulture_ids=vulture_ids,
@@ -122,7 +142,6 @@ class VisualizationManager:
             apply_standard_layout(fig, center_lat=center_lat, center_lon=center_lon,
                                 zoom_level=zoom_level, map_style=map_style)
 
-            frame_duration_ms = max(50, int(base_animation_speed / playback_speed))
             apply_controls_and_slider(
                 fig,
                 unique_times=unique_times,
@@ -131,6 +150,9 @@ class VisualizationManager:
                 center_lon=center_lon,
                 zoom_level=zoom_level,
                 include_speed_controls=True,
+                client_playback=output_mode in CLIENT_PLAYBACK_MODES,
+                trail_options=trail_system.trail_length_choices(),
+                trail_minutes=trail_system.trail_length_minutes,
             )
 
             filename = trail_system.get_output_filename(base_name=base_name, bird_names=list(vulture_ids))
@@ -149,11 +171,7 @@ class VisualizationManager:
                 'showTips': True,
             }
 
-            html_string = fig.to_html(config=config)
-            html_string = inject_fullscreen(html_string)
-
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_string)
+            write_animation_html(fig, output_path, config, client_output)
 
             if offline_map:
                 try:
@@ -222,7 +240,7 @@ class VisualizationManager:
                               trail_system, enable_precipitation, output_path):
         """Fallback video export using offline rendering"""
         fig_full = create_base_figure(vulture_ids, color_map, strategy="markers_fade")
-        full_times = sorted(full_df_for_video['timestamp_str'].unique())
+        full_times = AnimationTimeline.from_dataframe(full_df_for_video)
         attach_frames(
             fig_full,
             trail_system=trail_system,
@@ -0,0 +1,306 @@
+"""
+Local DEM Tiles
+
+Elevation provider reading digital elevation model tiles from disk, as an
+offline alternative to the Open Elevation API.
+
+Supported tiles:
+- SRTM ``.hgt`` (1 or 3 arc-second, e.g. ``N47E012.hgt``): big-endian int16,
+  the tile's position is taken from its file name.
+- Uncompressed, strip-organized single-band GeoTIFF (e.g. Copernicus DEM
+  converted with ``gdal_translate -co COMPRESS=NONE -co TILED=NO``), in
+  geographic lat/lon coordinates. The position is read from the
+  ModelTiepoint / ModelPixelScale tags.
+
+Tiles are opened as read-only numpy memory maps, so sampling only reads the
+pages holding the requested pixels. Points are sampled with vectorized
+bilinear interpolation; void pixels (nodata) are left out of the weights,
+and points outside every tile (or with four void neighbours) come back NaN.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+DEM_EXTENSIONS = ('.hgt', '.tif', '.tiff')
+SRTM_VOID = -32768
+
+_HGT_NAME = re.compile(r'^([NS])(\d{1,2})([EW])(\d{1,3})', re.IGNORECASE)
+
+# TIFF tags
+_TAG_WIDTH = 256
+_TAG_HEIGHT = 257
+_TAG_BITS_PER_SAMPLE = 258
+_TAG_COMPRESSION = 259
+_TAG_STRIP_OFFSETS = 273
+_TAG_SAMPLES_PER_PIXEL = 277
+_TAG_STRIP_BYTE_COUNTS = 279
+_TAG_TILE_WIDTH = 322
+_TAG_SAMPLE_FORMAT = 339
+_TAG_PIXEL_SCALE = 33550
+_TAG_TIEPOINT = 33922
+_TAG_GEOKEY_DIRECTORY = 34735
+_TAG_GDAL_NODATA = 42113
+_GEOKEY_RASTER_TYPE = 1025
+_RASTER_PIXEL_IS_POINT = 2
+
+# TIFF field type -> struct format
+_TIFF_TYPES = {1: 'B', 2: 's', 3: 'H', 4: 'I', 5: 'II', 6: 'b', 8: 'h', 9: 'i', 11: 'f', 12: 'd', 16: 'Q'}
+
+# (SampleFormat, BitsPerSample) -> numpy dtype kind and size
+_TIFF_DTYPES = {
+    (1, 8): 'u1', (1, 16): 'u2', (1, 32): 'u4',
+    (2, 8): 'i1', (2, 16): 'i2', (2, 32): 'i4',
+    (3, 32): 'f4', (3, 64): 'f8',
+}
+
+
+@dataclass
+class DEMTile:
+    """One memory-mapped DEM tile; pixel (0, 0) is the north-west pixel center"""
+    path: str
+    data: np.ndarray
+    lat_north: float
+    lon_west: float
+    lat_step: float
+    lon_step: float
+    nodata: Optional[float]
+
+    @property
+    def lat_south(self) -> float:
+        return self.lat_north - (self.data.shape[0] - 1) * self.lat_step
+
+    @property
+    def lon_east(self) -> float:
+        return self.lon_west + (self.data.shape[1] - 1) * self.lon_step
+
+    def contains(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        return ((lats >= self.lat_south) & (lats <= self.lat_north) &
+                (lons >= self.lon_west) & (lons <= self.lon_east))
+
+    def sample(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Bilinear elevations at points inside the tile (NaN where all four neighbours are void)"""
+        rows_max, cols_max = self.data.shape[0] - 1, self.data.shape[1] - 1
+        row = np.clip((self.lat_north - lats) / self.lat_step, 0, rows_max)
+        col = np.clip((lons - self.lon_west) / self.lon_step, 0, cols_max)
+        r0 = np.minimum(np.floor(row).astype(np.intp), max(rows_max - 1, 0))
+        c0 = np.minimum(np.floor(col).astype(np.intp), max(cols_max - 1, 0))
+        r1 = np.minimum(r0 + 1, rows_max)
+        c1 = np.minimum(c0 + 1, cols_max)
+        fr = row - r0
+        fc = col - c0
+
+        corners = np.stack([self.data[r0, c0], self.data[r0, c1], self.data[r1, c0], self.data[r1, c1]])
+        corners = corners.astype(np.float64)
+        weights = np.stack([(1 - fr) * (1 - fc), (1 - fr) * fc, fr * (1 - fc), fr * fc])
+        valid = np.isfinite(corners)
+        if self.nodata is not None:
+            valid &= corners != self.nodata
+        weights = np.where(valid, weights, 0.0)
+        # Exactly on a void pixel all the weight is void: use the valid neighbours' mean
+        on_void = weights.sum(axis=0) <= 0
+        weights[:, on_void] = valid[:, on_void]
+        total = weights.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = (np.where(valid, corners, 0.0) * weights).sum(axis=0) / total
+        values[total <= 0] = np.nan
+        return values
+
+
+def open_hgt_tile(path: Union[str, Path]) -> DEMTile:
+    """Memory-map an SRTM .hgt tile named after its south-west corner (e.g. N47E012.hgt)"""
+    path = Path(path)
+    match = _HGT_NAME.match(path.stem)
+    if match is None:
+        raise ValueError(f"Not an SRTM tile name: {path.name}")
+    lat = int(match.group(2)) * (1 if match.group(1).upper() == 'N' else -1)
+    lon = int(match.group(4)) * (1 if match.group(3).upper() == 'E' else -1)
+    size = int(round((path.stat().st_size // 2) ** 0.5))
+    if size * size * 2 != path.stat().st_size or size < 2:
+        raise ValueError(f"Unexpected .hgt file size: {path}")
+    data = np.memmap(path, dtype='>i2', mode='r', shape=(size, size))
+    step = 1.0 / (size - 1)
+    return DEMTile(str(path), data, lat + 1.0, float(lon), step, step, SRTM_VOID)
+
+
+def _read_tiff_tags(f, byte_order: str, ifd_offset: int) -> dict:
+    f.seek(ifd_offset)
+    (count,) = struct.unpack(byte_order + 'H', f.read(2))
+    tags = {}
+    entries = f.read(12 * count)
+    for i in range(count):
+        tag, field_type, n, value = struct.unpack(byte_order + 'HHI4s', entries[12 * i:12 * i + 12])
+        fmt = _TIFF_TYPES.get(field_type)
+        if fmt is None:
+            continue
+        if fmt == 's':
+            size = n
+        else:
+            size = struct.calcsize(byte_order + fmt) * n
+        if size > 4:
+            (offset,) = struct.unpack(byte_order + 'I', value)
+            position = f.tell()
+            f.seek(offset)
+            raw = f.read(size)
+            f.seek(position)
+        else:
+            raw = value[:size]
+        if fmt == 's':
+            tags[tag] = raw.rstrip(b'\0').decode('ascii', 'replace')
+        else:
+            values = struct.unpack(byte_order + fmt * n, raw)
+            if field_type == 5:  # RATIONAL: pairs of numerator, denominator
+                values = tuple(values[j] / values[j + 1] for j in range(0, len(values), 2))
+            tags[tag] = values
+    return tags
+
+
+def open_geotiff_tile(path: Union[str, Path]) -> DEMTile:
+    """
+    Memory-map an uncompressed, strip-organized single-band GeoTIFF
+
+    Raises:
+        ValueError: For compressed, tiled, multi-band, BigTIFF or non-contiguous files
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        header = f.read(8)
+        if header[:2] == b'II':
+            byte_order = '<'
+        elif header[:2] == b'MM':
+            byte_order = '>'
+        else:
+            raise ValueError(f"Not a TIFF file: {path}")
+        magic, ifd_offset = struct.unpack(byte_order + 'HI', header[2:8])
+        if magic != 42:
+            raise ValueError(f"BigTIFF / unsupported TIFF variant: {path}")
+        tags = _read_tiff_tags(f, byte_order, ifd_offset)
+
+    if tags.get(_TAG_COMPRESSION, (1,))[0] != 1:
+        raise ValueError(f"Compressed GeoTIFF not supported (use COMPRESS=NONE): {path}")
+    if _TAG_TILE_WIDTH in tags:
+        raise ValueError(f"Tiled GeoTIFF not supported (use TILED=NO): {path}")
+    if tags.get(_TAG_SAMPLES_PER_PIXEL, (1,))[0] != 1:
+        raise ValueError(f"Multi-band GeoTIFF not supported: {path}")
+    if _TAG_PIXEL_SCALE not in tags or _TAG_TIEPOINT not in tags:
+        raise ValueError(f"GeoTIFF without georeferencing tags: {path}")
+
+    width, height = tags[_TAG_WIDTH][0], tags[_TAG_HEIGHT][0]
+    kind = _TIFF_DTYPES.get((tags.get(_TAG_SAMPLE_FORMAT, (1,))[0], tags[_TAG_BITS_PER_SAMPLE][0]))
+    if kind is None:
+        raise ValueError(f"Unsupported GeoTIFF sample type: {path}")
+    dtype = np.dtype(byte_order + kind)
+
+    offsets, counts = tags[_TAG_STRIP_OFFSETS], tags[_TAG_STRIP_BYTE_COUNTS]
+    if any(offsets[i] + counts[i] != offsets[i + 1] for i in range(len(offsets) - 1)):
+        raise ValueError(f"GeoTIFF strips are not contiguous: {path}")
+    data = np.memmap(path, dtype=dtype, mode='r', offset=offsets[0], shape=(height, width))
+
+    lon_step, lat_step = tags[_TAG_PIXEL_SCALE][0], tags[_TAG_PIXEL_SCALE][1]
+    tie_i, tie_j, _, tie_lon, tie_lat, _ = tags[_TAG_TIEPOINT][:6]
+    lon_west = tie_lon - tie_i * lon_step
+    lat_north = tie_lat + tie_j * lat_step
+    geokeys = tags.get(_TAG_GEOKEY_DIRECTORY, ())
+    pixel_is_point = any(
+        geokeys[k] == _GEOKEY_RASTER_TYPE and geokeys[k + 3] == _RASTER_PIXEL_IS_POINT
+        for k in range(4, len(geokeys) - 3, 4)
+    )
+    if not pixel_is_point:
+        # PixelIsArea: the tiepoint is the pixel's corner, sample at pixel centers
+        lon_west += lon_step / 2
+        lat_north -= lat_step / 2
+
+    nodata = None
+    if _TAG_GDAL_NODATA in tags:
+        try:
+            nodata = float(tags[_TAG_GDAL_NODATA])
+        except ValueError:
+            nodata = None
+    return DEMTile(str(path), data, lat_north, lon_west, lat_step, lon_step, nodata)
+
+
+def open_dem_tile(path: Union[str, Path]) -> DEMTile:
+    """Open a .hgt or GeoTIFF tile"""
+    if Path(path).suffix.lower() == '.hgt':
+        return open_hgt_tile(path)
+    return open_geotiff_tile(path)
+
+
+class LocalDEM:
+    """
+    Elevation provider over the DEM tiles found in one or more directories
+
+    Files that cannot be opened are skipped with a warning. Where tiles
+    overlap, the first tile in sorted path order wins.
+    """
+
+    name = 'local DEM'
+
+    def __init__(self, directories: Iterable[Union[str, Path]]):
+        self.tiles: List[DEMTile] = []
+        for directory in directories:
+            directory = Path(directory)
+            if not directory.is_dir():
+                continue
+            for path in sorted(directory.rglob('*')):
+                if path.suffix.lower() not in DEM_EXTENSIONS:
+                    continue
+                try:
+                    self.tiles.append(open_dem_tile(path))
+                except (ValueError, OSError, struct.error) as e:
+                    print(f"⚠️ Skipping DEM tile {path.name}: {e}")
+
+    @classmethod
+    def from_environment(cls, variable: str = 'DEM_DIR') -> Optional['LocalDEM']:
+        """LocalDEM over the directories in ``variable`` (os.pathsep separated), None if unset or empty"""
+        value = os.environ.get(variable)
+        if not value:
+            return None
+        dem = cls([part for part in value.split(os.pathsep) if part])
+        return dem if dem.tiles else None
+
+    def __bool__(self) -> bool:
+        return bool(self.tiles)
+
+    def sample(self, lats: Sequence[float], lons: Sequence[float]) -> np.ndarray:
+        """Elevations (meters) at the given points, NaN where no tile has data"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        flat_lats, flat_lons = lats.ravel(), lons.ravel()
+        values = np.full(flat_lats.shape, np.nan)
+        pending = np.ones(flat_lats.shape, dtype=bool)
+        for tile in self.tiles:
+            inside = pending & tile.contains(flat_lats, flat_lons)
+            if not inside.any():
+                continue
+            idx = np.flatnonzero(inside)
+            sampled = tile.sample(flat_lats[idx], flat_lons[idx])
+            values[idx] = sampled
+            pending[idx[np.isfinite(sampled)]] = False
+            if not pending.any():
+                break
+        return values.reshape(lats.shape)
+
+    def sample_grid(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                    resolution: int) -> Optional[np.ndarray]:
+        """
+        Elevation grid over the bounds, rows by latitude (south to north)
+
+        Returns:
+            (resolution, resolution) array, or None if the tiles do not cover the bounds
+        """
+        lats = np.linspace(lat_min, lat_max, resolution)
+        lons = np.linspace(lon_min, lon_max, resolution)
+        grid_lats, grid_lons = np.meshgrid(lats, lons, indexing='ij')
+        elevations = self.sample(grid_lats, grid_lons)
+        if np.isnan(elevations).any():
+            return None
+        return elevations
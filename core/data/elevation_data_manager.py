@@ -3,16 +3,26 @@ Elevation Data Manager
 
 Handles downloading, caching, and managing elevation models for 3D terrain visualization.
 Supports multiple data sources and regional datasets with persistent caching.
+
+Downloaded elevations are cached as fixed geographic tiles
+(core.data.elevation_tiles), so overlapping and custom regions reuse them and
+only missing tiles are downloaded.
+
+Elevation providers (objects with ``name`` and ``sample_grid(lat_min, lat_max,
+lon_min, lon_max, resolution)``, e.g. core.data.dem_tiles.LocalDEM over the
+DEM_DIR tiles) are tried in order before the Open Elevation API download.
 """
 
-import pickle
 import numpy as np
-import requests
-import time
+import pandas as pd
+from datetime import datetime
 from typing import Dict, Tuple, Optional, List
 from dataclasses import dataclass
 from pathlib import Path
 from utils.user_interface import UserInterface
+from core.data.dem_tiles import LocalDEM
+from core.data.elevation_tiles import ElevationTileCache
+from core.data.elevation_fetcher import ElevationFetcher
 
 
 @dataclass
@@ -26,6 +36,11 @@ class RegionBounds:
     description: str
 
 
+# Columns added by add_height_above_ground
+GROUND_ELEVATION_COLUMN = 'Ground Elevation'
+HEIGHT_AGL_COLUMN = 'Height AGL'
+
+
 @dataclass
 class ElevationData:
     """Contains elevation data for a region"""
@@ -36,6 +51,58 @@ class ElevationData:
     resolution: int
     bounds: RegionBounds
     download_date: str
+    
+    def sample(self, lats, lons) -> np.ndarray:
+        """
+        Terrain elevation at (lat, lon) points by bilinear interpolation
+        
+        Vectorized over any number of points (one pass of numpy operations,
+        no Python loop per point).
+        
+        Args:
+            lats, lons: Point coordinates (array-likes of equal length)
+            
+        Returns:
+            Elevations in meters; NaN for points outside the grid
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        grid_lats = np.asarray(self.lats, dtype=np.float64)
+        grid_lons = np.asarray(self.lons, dtype=np.float64)
+        elevations = np.asarray(self.elevations, dtype=np.float64)
+        
+        # Cell of each point (grid axes ascending; rows are latitudes)
+        r0 = np.clip(np.searchsorted(grid_lats, lats, side='right') - 1, 0, len(grid_lats) - 2)
+        c0 = np.clip(np.searchsorted(grid_lons, lons, side='right') - 1, 0, len(grid_lons) - 2)
+        fr = (lats - grid_lats[r0]) / (grid_lats[r0 + 1] - grid_lats[r0])
+        fc = (lons - grid_lons[c0]) / (grid_lons[c0 + 1] - grid_lons[c0])
+        
+        top = elevations[r0, c0] * (1 - fc) + elevations[r0, c0 + 1] * fc
+        bottom = elevations[r0 + 1, c0] * (1 - fc) + elevations[r0 + 1, c0 + 1] * fc
+        result = top * (1 - fr) + bottom * fr
+        
+        outside = ((lats < grid_lats[0]) | (lats > grid_lats[-1]) |
+                   (lons < grid_lons[0]) | (lons > grid_lons[-1]))
+        result[outside | np.isnan(lats) | np.isnan(lons)] = np.nan
+        return result
+
+
+def add_height_above_ground(df, elevation_data: ElevationData, height_col: str = 'Height') -> None:
+    """
+    Add ground elevation and height above ground (AGL) columns in place
+    
+    Args:
+        df: GPS fixes with 'Latitude', 'Longitude' and height_col columns
+        elevation_data: Terrain grid to sample
+        height_col: Column with the GPS height above sea level
+    
+    Adds GROUND_ELEVATION_COLUMN and HEIGHT_AGL_COLUMN (meters, NaN outside the terrain grid)
+    """
+    ground = elevation_data.sample(df['Latitude'].to_numpy(dtype=np.float64),
+                                   df['Longitude'].to_numpy(dtype=np.float64))
+    heights = pd.to_numeric(df[height_col], errors='coerce').to_numpy(dtype=np.float64)
+    df[GROUND_ELEVATION_COLUMN] = ground
+    df[HEIGHT_AGL_COLUMN] = heights - ground
 
 
 class ElevationDataManager:
@@ -77,12 +144,13 @@ class ElevationDataManager:
         )
     }
     
-    def __init__(self, cache_dir: str = None):
+    def __init__(self, cache_dir: str = None, dem_dirs: Optional[List[str]] = None):
         """
         Initialize elevation data manager
         
         Args:
             cache_dir: Directory for caching elevation data (default: project/elevation_cache)
+            dem_dirs: Directories with local DEM tiles (.hgt / GeoTIFF, default: DEM_DIR environment variable)
         """
         self.ui = UserInterface()
         
@@ -94,10 +162,19 @@ class ElevationDataManager:
             self.cache_dir = Path(cache_dir)
         
         self.cache_dir.mkdir(exist_ok=True)
+        self.tile_cache = ElevationTileCache(self.cache_dir / 'tiles')
+        self.fetcher: Optional[ElevationFetcher] = None  # created on the first download
         
         # Cache for loaded elevation data
         self.loaded_regions: Dict[str, ElevationData] = {}
         
+        # Elevation providers tried before the API download
+        self.providers: List = []
+        local_dem = LocalDEM(dem_dirs) if dem_dirs else LocalDEM.from_environment()
+        if local_dem:
+            self.providers.append(local_dem)
+            print(f"🗻 Local DEM: {len(local_dem.tiles)} tiles")
+        
         print(f"📁 Elevation cache directory: {self.cache_dir}")
     
     def list_available_regions(self) -> None:
@@ -105,7 +182,7 @@ class ElevationDataManager:
         self.ui.print_section("🏔️ AVAILABLE REGIONS")
         
         for region_id, bounds in self.PREDEFINED_REGIONS.items():
-            cache_status = "✅ Cached" if self._is_region_cached(region_id) else "📥 Not cached"
+            cache_status = "✅ Cached" if self._is_region_cached(bounds) else "📥 Not cached"
             print(f"  {region_id}:")
             print(f"    📝 {bounds.description}")
             print(f"    🗺️  Lat: {bounds.lat_min:.3f} to {bounds.lat_max:.3f}")
@@ -116,12 +193,12 @@ class ElevationDataManager:
     def get_elevation_data(self, region_name: str, resolution: int = 100, 
                           force_download: bool = False) -> Optional[ElevationData]:
         """
-        Get elevation data for a region (from cache or download)
+        Get elevation data for a region (from a local provider, cache or download)
         
         Args:
             region_name: Name of predefined region or 'custom'
             resolution: Grid resolution for elevation data
-            force_download: Force re-download even if cached
+            force_download: Force re-download of the region's tiles even if cached
             
         Returns:
             ElevationData object or None if failed
@@ -140,23 +217,21 @@ class ElevationDataManager:
         
         bounds = self.PREDEFINED_REGIONS[region_name]
         
-        # Try to load from disk cache
-        if not force_download:
-            cached_data = self._load_from_cache(region_name, resolution)
-            if cached_data:
-                self.loaded_regions[cache_key] = cached_data
-                return cached_data
+        # Sample a local provider first (no disk cache needed, reads are fast)
+        elevation_data = self._load_from_providers(bounds, resolution)
+        if elevation_data:
+            self.loaded_regions[cache_key] = elevation_data
+            return elevation_data
         
-        # Download elevation data
-        self.ui.print_section(f"🏔️ DOWNLOADING ELEVATION DATA: {region_name.upper()}")
-        print(f"📊 Resolution: {resolution}x{resolution} grid")
-        print(f"🗺️  Area: {bounds.description}")
-        print("⚠️  This may take several minutes...")
+        # Assemble from cached tiles, downloading the missing ones
+        if force_download or not self._is_region_cached(bounds, resolution):
+            self.ui.print_section(f"🏔️ DOWNLOADING ELEVATION DATA: {region_name.upper()}")
+            print(f"📊 Resolution: {resolution}x{resolution} grid")
+            print(f"🗺️  Area: {bounds.description}")
+            print("⚠️  This may take several minutes...")
         
-        elevation_data = self._download_elevation_data(bounds, resolution)
+        elevation_data = self._download_elevation_data(bounds, resolution, force_download)
         if elevation_data:
-            # Save to cache
-            self._save_to_cache(elevation_data)
             self.loaded_regions[cache_key] = elevation_data
             self.ui.print_success(f"✅ Elevation data for {region_name} ready!")
             return elevation_data
@@ -164,66 +239,53 @@ class ElevationDataManager:
             self.ui.print_error(f"Failed to download elevation data for {region_name}")
             return None
     
-    def _is_region_cached(self, region_name: str, resolution: int = 100) -> bool:
-        """Check if region is cached on disk"""
-        cache_file = self.cache_dir / f"{region_name}_{resolution}.pkl"
-        return cache_file.exists()
+    def _is_region_cached(self, bounds: RegionBounds, resolution: int = 100) -> bool:
+        """Check if all tiles of a region are cached on disk"""
+        return self.tile_cache.is_cached(bounds.lat_min, bounds.lat_max,
+                                         bounds.lon_min, bounds.lon_max, resolution)
     
-    def _load_from_cache(self, region_name: str, resolution: int) -> Optional[ElevationData]:
-        """Load elevation data from disk cache"""
-        cache_file = self.cache_dir / f"{region_name}_{resolution}.pkl"
-        
-        if cache_file.exists():
+    def _load_from_providers(self, bounds: RegionBounds, resolution: int) -> Optional[ElevationData]:
+        """Elevation grid from the first provider covering the bounds"""
+        for provider in self.providers:
             try:
-                print(f"📂 Loading cached elevation data for {region_name}...")
-                with open(cache_file, 'rb') as f:
-                    elevation_data = pickle.load(f)
-                print(f"✅ Loaded {elevation_data.resolution}x{elevation_data.resolution} elevation grid from cache")
-                return elevation_data
+                elevations = provider.sample_grid(bounds.lat_min, bounds.lat_max,
+                                                  bounds.lon_min, bounds.lon_max, resolution)
             except Exception as e:
-                self.ui.print_warning(f"Failed to load cache: {e}")
-                return None
-        
+                self.ui.print_warning(f"{provider.name} failed: {e}")
+                continue
+            if elevations is None:
+                print(f"   ⚠️ {provider.name} does not cover {bounds.name}")
+                continue
+            print(f"✅ Sampled {resolution}x{resolution} elevation grid from {provider.name}")
+            print(f"🏔️  Elevation range: {elevations.min():.0f}m to {elevations.max():.0f}m")
+            return ElevationData(
+                region_name=bounds.name,
+                lons=np.linspace(bounds.lon_min, bounds.lon_max, resolution),
+                lats=np.linspace(bounds.lat_min, bounds.lat_max, resolution),
+                elevations=elevations,
+                resolution=resolution,
+                bounds=bounds,
+                download_date=datetime.now().isoformat()
+            )
         return None
     
-    def _save_to_cache(self, elevation_data: ElevationData) -> None:
-        """Save elevation data to disk cache"""
-        cache_file = self.cache_dir / f"{elevation_data.region_name}_{elevation_data.resolution}.pkl"
-        
-        try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(elevation_data, f)
-            print(f"💾 Cached elevation data to: {cache_file}")
-        except Exception as e:
-            self.ui.print_warning(f"Failed to save cache: {e}")
-    
-    def _download_elevation_data(self, bounds: RegionBounds, resolution: int) -> Optional[ElevationData]:
-        """Download elevation data from Open Elevation API with optimized batching"""
+    def _download_elevation_data(self, bounds: RegionBounds, resolution: int,
+                                 force_download: bool = False) -> Optional[ElevationData]:
+        """Elevation grid assembled from the tile cache, downloading missing tiles from Open Elevation API"""
         try:
-            # Create coordinate grid
             lats = np.linspace(bounds.lat_min, bounds.lat_max, resolution)
             lons = np.linspace(bounds.lon_min, bounds.lon_max, resolution)
             
-            # Create all coordinate pairs
-            locations = []
-            for lat in lats:
-                for lon in lons:
-                    locations.append((lat, lon))
-            
-            print(f"📡 Downloading elevation for {len(locations):,} points...")
-            
-            # Download in optimized batches
-            elevations_flat = self._download_elevation_batch(locations)
+            elevations = self.tile_cache.get_grid(bounds.lat_min, bounds.lat_max,
+                                                  bounds.lon_min, bounds.lon_max, resolution,
+                                                  self._fetch_elevations, force_download)
             
-            if len(elevations_flat) != len(locations):
-                self.ui.print_error("Incomplete elevation data received")
-                return None
-            
-            # Reshape to 2D array
-            elevations = np.array(elevations_flat).reshape((resolution, resolution))
+            missing = ~np.isfinite(elevations)
+            if missing.any():
+                self.ui.print_warning(f"{missing.sum():,} points without elevation data, using defaults")
+                elevations[missing] = 1000  # Alpine default
             
             # Create ElevationData object
-            from datetime import datetime
             elevation_data = ElevationData(
                 region_name=bounds.name,
                 lons=lons,
@@ -234,7 +296,7 @@ class ElevationDataManager:
                 download_date=datetime.now().isoformat()
             )
             
-            print(f"✅ Downloaded {resolution}x{resolution} elevation grid")
+            print(f"✅ Assembled {resolution}x{resolution} elevation grid")
             print(f"🏔️  Elevation range: {elevations.min():.0f}m to {elevations.max():.0f}m")
             
             return elevation_data
@@ -243,56 +305,12 @@ class ElevationDataManager:
             self.ui.print_error(f"Elevation download failed: {e}")
             return None
     
-    def _download_elevation_batch(self, locations: List[Tuple[float, float]], 
-                                 max_batch_size: int = 50) -> List[float]:
-        """Download elevation data in optimized batches"""
-        elevations = []
-        total_batches = len(locations) // max_batch_size + (1 if len(locations) % max_batch_size > 0 else 0)
-        
-        for i, batch_start in enumerate(range(0, len(locations), max_batch_size)):
-            batch = locations[batch_start:batch_start + max_batch_size]
-            
-            # Show progress
-            print(f"   📊 Batch {i+1}/{total_batches} ({len(batch)} points)...")
-            
-            # Create location string for API
-            location_string = "|".join([f"{lat},{lon}" for lat, lon in batch])
-            
-            retry_count = 0
-            max_retries = 3
-            
-            while retry_count < max_retries:
-                try:
-                    url = f"https://api.open-elevation.com/api/v1/lookup?locations={location_string}"
-                    response = requests.get(url, timeout=30)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if 'results' in data and len(data['results']) == len(batch):
-                            batch_elevations = [result['elevation'] for result in data['results']]
-                            elevations.extend(batch_elevations)
-                            break
-                        else:
-                            self.ui.print_warning("Incomplete batch data, using defaults")
-                            elevations.extend([1000] * len(batch))  # Alpine default
-                            break
-                    else:
-                        raise Exception(f"API returned status {response.status_code}")
-                        
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        print(f"      ⚠️ Retry {retry_count}/{max_retries} after error: {e}")
-                        time.sleep(2 ** retry_count)  # Exponential backoff
-                    else:
-                        self.ui.print_warning(f"Batch failed after {max_retries} retries, using defaults")
-                        elevations.extend([1000] * len(batch))  # Alpine default
-            
-            # Rate limiting between batches
-            if i < total_batches - 1:  # Don't wait after the last batch
-                time.sleep(1)  # 1 second between batches
-        
-        return elevations
+    def _fetch_elevations(self, lats: np.ndarray, lons: np.ndarray, on_batch=None) -> np.ndarray:
+        """Tile cache fetcher: elevations from the Open Elevation API, NaN where a batch failed"""
+        print(f"📡 Downloading elevation for {len(lats):,} points...")
+        if self.fetcher is None:
+            self.fetcher = ElevationFetcher()
+        return self.fetcher.fetch(lats, lons, on_batch)
     
     def create_custom_region(self, name: str, lat_min: float, lat_max: float, 
                            lon_min: float, lon_max: float, description: str) -> RegionBounds:
@@ -317,11 +335,55 @@ class ElevationDataManager:
             description=description
         )
         
-        # Add to predefined regions for this session
+        # Add to predefined regions for this session (replacing data loaded for an older definition)
         self.PREDEFINED_REGIONS[name] = custom_region
+        for cache_key in [key for key, data in self.loaded_regions.items() if data.region_name == name]:
+            del self.loaded_regions[cache_key]
         
         return custom_region
     
+    def create_region_from_data(self, lats, lons, padding_km: float = 2.0,
+                                min_extent_km: float = 2.0, name: str = 'flight_area') -> RegionBounds:
+        """
+        Create a custom region around GPS fixes
+        
+        Args:
+            lats, lons: Fix coordinates
+            padding_km: Margin added on every side of the fixes
+            min_extent_km: Minimum height and width of the region
+            name: Region identifier
+            
+        Returns:
+            RegionBounds (also registered like create_custom_region)
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        if not valid.any():
+            raise ValueError("No valid coordinates to derive terrain bounds from")
+        lats, lons = lats[valid], lons[valid]
+        
+        center_lat = (lats.min() + lats.max()) / 2
+        km_per_deg_lon = 111 * np.cos(np.radians(center_lat))
+        half_lat = max((lats.max() - lats.min()) / 2 + padding_km / 111, min_extent_km / 2 / 111)
+        half_lon = max((lons.max() - lons.min()) / 2 + padding_km / km_per_deg_lon,
+                       min_extent_km / 2 / km_per_deg_lon)
+        center_lon = (lons.min() + lons.max()) / 2
+        
+        return self.create_custom_region(
+            name,
+            round(float(center_lat - half_lat), 4), round(float(center_lat + half_lat), 4),
+            round(float(center_lon - half_lon), 4), round(float(center_lon + half_lon), 4),
+            f"Flight area (~{2 * half_lon * km_per_deg_lon:.0f}x{2 * half_lat * 111:.0f}km)"
+        )
+    
+    def region_extent_km(self, bounds: RegionBounds) -> Tuple[float, float]:
+        """Rough (height, width) of a region in km"""
+        avg_lat = (bounds.lat_min + bounds.lat_max) / 2
+        height_km = (bounds.lat_max - bounds.lat_min) * 111
+        width_km = (bounds.lon_max - bounds.lon_min) * 111 * np.cos(np.radians(avg_lat))
+        return height_km, width_km
+    
     def get_region_info(self, elevation_data: ElevationData) -> Dict:
         """Get summary information about elevation data"""
         return {
@@ -339,7 +401,5 @@ class ElevationDataManager:
     def _calculate_area_km2(self, bounds: RegionBounds) -> float:
         """Rough calculation of area in km²"""
         # Rough conversion: 1 degree lat ≈ 111 km, 1 degree lon ≈ 111 * cos(lat) km
-        lat_km = (bounds.lat_max - bounds.lat_min) * 111
-        avg_lat = (bounds.lat_min + bounds.lat_max) / 2
-        lon_km = (bounds.lon_max - bounds.lon_min) * 111 * np.cos(np.radians(avg_lat))
+        lat_km, lon_km = self.region_extent_km(bounds)
         return lat_km * lon_km
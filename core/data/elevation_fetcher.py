@@ -0,0 +1,224 @@
+"""
+Elevation Fetcher
+
+Concurrent client for the Open Elevation lookup API (or any server speaking
+its JSON protocol, e.g. a self-hosted instance):
+
+- bulk ``POST /api/v1/lookup`` requests with ``batch_size`` points each,
+  over one pooled ``requests.Session``
+- at most ``max_workers`` requests in flight, started no faster than a
+  token bucket of ``rate`` requests per second (bursts of ``burst``)
+- retries with exponential backoff and full jitter on connection errors,
+  429 and 5xx responses
+- a batch that is rejected as too large (413 / 414) or keeps timing out is
+  split in half and retried, down to ``min_batch_size`` points, and the
+  remaining batches shrink to the same size, so the batch size adapts to
+  what the server accepts
+- points that could not be fetched come back as NaN
+- each completed batch is reported through ``on_batch`` as soon as it
+  arrives, so callers (the elevation tile cache) can persist partial
+  results and resume an interrupted download
+
+Defaults can be set with the ELEVATION_API_URL, ELEVATION_BATCH_SIZE,
+ELEVATION_WORKERS and ELEVATION_RATE environment variables.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_API_URL = "https://api.open-elevation.com/api/v1/lookup"
+
+# on_batch(start, values): values for points start..start + len(values)
+BatchCallback = Callable[[int, np.ndarray], None]
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a token is available"""
+
+    def __init__(self, rate: float, burst: int = 1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            self._sleep(wait_time)
+
+
+class _BatchFailed(Exception):
+    """A batch could not be fetched (after its retries)"""
+
+    def __init__(self, message: str, too_large: bool = False):
+        super().__init__(message)
+        self.too_large = too_large
+
+
+class ElevationFetcher:
+    """Pooled, rate limited, concurrent elevation lookups"""
+
+    def __init__(self, url: Optional[str] = None, batch_size: Optional[int] = None,
+                 max_workers: Optional[int] = None, rate: Optional[float] = None,
+                 burst: Optional[int] = None, max_retries: int = 3, min_batch_size: int = 25,
+                 timeout: float = 60.0, backoff: float = 1.0,
+                 session: Optional[requests.Session] = None):
+        """
+        Args:
+            url: Lookup endpoint (default: ELEVATION_API_URL or the public Open Elevation API)
+            batch_size: Points per request (default: ELEVATION_BATCH_SIZE or 1000)
+            max_workers: Concurrent requests (default: ELEVATION_WORKERS or 4)
+            rate: Requests started per second, 0 = unlimited (default: ELEVATION_RATE or 2)
+            burst: Token bucket size (default: max_workers)
+            max_retries: Attempts per batch
+            min_batch_size: Batches this small are not split further
+            timeout: Request timeout in seconds
+            backoff: Base delay of the exponential backoff in seconds
+            session: requests.Session to use (default: a pooled session)
+        """
+        self.url = url or os.environ.get('ELEVATION_API_URL', DEFAULT_API_URL)
+        self.batch_size = batch_size or int(os.environ.get('ELEVATION_BATCH_SIZE', '1000'))
+        self.max_workers = max_workers or int(os.environ.get('ELEVATION_WORKERS', '4'))
+        if rate is None:
+            rate = float(os.environ.get('ELEVATION_RATE', '2'))
+        self.limiter = TokenBucket(rate, burst or self.max_workers)
+        self.max_retries = max_retries
+        self.min_batch_size = min_batch_size
+        self.timeout = timeout
+        self.backoff = backoff
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+        self.requests_made = 0
+        self.failed_points = 0
+        self._stats_lock = threading.Lock()
+
+    def __call__(self, lats: np.ndarray, lons: np.ndarray,
+                 on_batch: Optional[BatchCallback] = None) -> np.ndarray:
+        return self.fetch(lats, lons, on_batch)
+
+    def fetch(self, lats: np.ndarray, lons: np.ndarray,
+              on_batch: Optional[BatchCallback] = None) -> np.ndarray:
+        """
+        Elevations of the points (NaN where they could not be fetched)
+
+        on_batch is called from the calling thread for every finished batch.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        elevations = np.full(len(lats), np.nan)
+        if len(lats) == 0:
+            return elevations
+
+        pending: List[Tuple[int, int]] = [
+            (start, min(start + self.batch_size, len(lats)))
+            for start in range(0, len(lats), self.batch_size)
+        ]
+        total_batches = len(pending)
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                while pending and len(running) < self.max_workers:
+                    start, stop = pending.pop(0)
+                    future = executor.submit(self._request_batch, lats[start:stop], lons[start:stop])
+                    running[future] = (start, stop)
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    start, stop = running.pop(future)
+                    try:
+                        values = future.result()
+                    except _BatchFailed as e:
+                        if e.too_large and stop - start > self.min_batch_size:
+                            # Adapt: retry the halves and shrink the remaining batches
+                            self.batch_size = max(self.min_batch_size, (stop - start) // 2)
+                            pending = self._split(pending, self.batch_size)
+                            pending[:0] = self._split([(start, stop)], self.batch_size)
+                            total_batches = done + len(running) + len(pending)
+                            print(f"      ⚠️ Batch of {stop - start} points too large ({e}), "
+                                  f"using {self.batch_size} points per batch")
+                            continue
+                        print(f"      ⚠️ Batch of {stop - start} points failed: {e}")
+                        values = np.full(stop - start, np.nan)
+                        with self._stats_lock:
+                            self.failed_points += stop - start
+                    elevations[start:stop] = values
+                    done += 1
+                    print(f"   📊 Batch {done}/{total_batches} ({stop - start} points)")
+                    if on_batch is not None:
+                        on_batch(start, values)
+        return elevations
+
+    @staticmethod
+    def _split(ranges: List[Tuple[int, int]], size: int) -> List[Tuple[int, int]]:
+        return [(start, min(start + size, stop))
+                for range_start, stop in ranges for start in range(range_start, stop, size)]
+
+    def _request_batch(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        One batch with retries on timeouts, connection errors, 429 and 5xx
+
+        Raises:
+            _BatchFailed: When the retries are used up or the batch is rejected
+        """
+        payload = {'locations': [{'latitude': float(lat), 'longitude': float(lon)}
+                                 for lat, lon in zip(lats, lons)]}
+        error = "no attempt made"
+        for attempt in range(self.max_retries):
+            timed_out = False
+            if attempt:
+                # Exponential backoff with full jitter
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            self.limiter.acquire()
+            with self._stats_lock:
+                self.requests_made += 1
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = str(e)
+                timed_out = isinstance(e, requests.Timeout)
+                continue
+            if response.status_code != 200:
+                error = f"API returned status {response.status_code}"
+                if response.status_code == 429 or response.status_code >= 500:
+                    continue
+                raise _BatchFailed(error, too_large=response.status_code in (413, 414))
+            try:
+                results = response.json()['results']
+            except (ValueError, KeyError, TypeError) as e:
+                error = f"Malformed response: {e}"
+                continue
+            if len(results) != len(lats):
+                error = f"Incomplete batch data ({len(results)}/{len(lats)} points)"
+                continue
+            return np.array([np.nan if result.get('elevation') is None else result['elevation']
+                             for result in results], dtype=np.float64)
+        raise _BatchFailed(error, too_large=timed_out)
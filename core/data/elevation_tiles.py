@@ -0,0 +1,192 @@
+"""
+Elevation Tile Cache
+
+Disk cache of downloaded elevations on a fixed geographic tile grid, so any
+region can be assembled from the tiles already downloaded for overlapping
+regions and only the missing tiles are fetched.
+
+At zoom level ``z`` a tile spans ``1 / 2**z`` degrees in latitude and
+longitude and holds ``TILE_SAMPLES x TILE_SAMPLES`` elevations (rows south to
+north, edges shared with the neighbouring tiles). Tile ``(z, row, col)`` has
+its south-west corner at ``(row / 2**z - 90, col / 2**z - 180)`` and is
+stored as ``<cache_dir>/z<z>/<row>_<col>.npy``, loaded memory-mapped.
+
+A request picks the coarsest zoom whose sample spacing is at least as fine
+as the requested grid and resamples the tile mosaic bilinearly.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.data.dem_tiles import DEMTile
+
+
+TILE_SAMPLES = 33          # 32 intervals: sample spacing is 2**-(zoom + 5) degrees
+MAX_ZOOM = 9               # ~7 m sample spacing
+
+TileId = Tuple[int, int, int]  # (zoom, row, col)
+
+# fetch(lats, lons, on_batch) -> elevations; NaN marks points that could not
+# be fetched. on_batch(start, values) reports partial results as they arrive
+# (see core.data.elevation_fetcher.ElevationFetcher)
+FetchFunction = Callable[..., np.ndarray]
+
+
+def tile_degrees(zoom: int) -> float:
+    return 1.0 / (1 << zoom)
+
+
+def zoom_for_spacing(spacing: float) -> int:
+    """Coarsest zoom whose sample spacing is at most spacing degrees"""
+    if spacing <= 0:
+        return MAX_ZOOM
+    intervals = TILE_SAMPLES - 1
+    zoom = math.ceil(math.log2(1.0 / (spacing * intervals)))
+    return min(max(zoom, 0), MAX_ZOOM)
+
+
+def tiles_for_bounds(lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                     zoom: int) -> Tuple[range, range]:
+    """Tile rows and columns covering the bounds"""
+    scale = 1 << zoom
+    row_min = math.floor((lat_min + 90) * scale)
+    col_min = math.floor((lon_min + 180) * scale)
+    row_max = max(math.ceil((lat_max + 90) * scale), row_min + 1)
+    col_max = max(math.ceil((lon_max + 180) * scale), col_min + 1)
+    return range(row_min, row_max), range(col_min, col_max)
+
+
+def tile_points(tile: TileId) -> Tuple[np.ndarray, np.ndarray]:
+    """Sample latitudes (south to north) and longitudes (west to east) of a tile"""
+    zoom, row, col = tile
+    size = tile_degrees(zoom)
+    offsets = np.linspace(0.0, size, TILE_SAMPLES)
+    return row * size - 90 + offsets, col * size - 180 + offsets
+
+
+class ElevationTileCache:
+    """Fixed-grid elevation tiles stored as .npy files"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+
+    def path(self, tile: TileId) -> Path:
+        zoom, row, col = tile
+        return self.cache_dir / f"z{zoom}" / f"{row}_{col}.npy"
+
+    def has(self, tile: TileId) -> bool:
+        return self.path(tile).exists()
+
+    def load(self, tile: TileId) -> Optional[np.ndarray]:
+        """Memory-mapped tile, or None if not cached (or unreadable)"""
+        path = self.path(tile)
+        if not path.exists():
+            return None
+        try:
+            data = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if data.shape != (TILE_SAMPLES, TILE_SAMPLES):
+            return None
+        return data
+
+    def save(self, tile: TileId, elevations: np.ndarray) -> None:
+        """Write a tile atomically, as parallel runs may fetch the same tile"""
+        path = self.path(tile)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp_', suffix='.npy')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.asarray(elevations, dtype=np.float32))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def tiles(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+              resolution: int) -> Tuple[int, List[TileId]]:
+        """Zoom and tiles needed for a resolution x resolution grid over the bounds"""
+        spacing = min(lat_max - lat_min, lon_max - lon_min) / max(resolution - 1, 1)
+        zoom = zoom_for_spacing(spacing)
+        rows, cols = tiles_for_bounds(lat_min, lat_max, lon_min, lon_max, zoom)
+        return zoom, [(zoom, row, col) for row in rows for col in cols]
+
+    def is_cached(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                  resolution: int) -> bool:
+        return all(self.has(tile) for tile in self.tiles(lat_min, lat_max, lon_min, lon_max, resolution)[1])
+
+    def fetch_tiles(self, tiles: Iterable[TileId], fetch: FetchFunction) -> dict:
+        """
+        Fetch tiles in one call to fetch, caching each tile as soon as all
+        its points have arrived (an interrupted download resumes from there)
+
+        Returns:
+            Dict tile -> elevations; tiles with unfetched (NaN) points are
+            returned but not cached, so they are retried next time
+        """
+        tiles = list(tiles)
+        if not tiles:
+            return {}
+        count = TILE_SAMPLES * TILE_SAMPLES
+        points = [np.meshgrid(*tile_points(tile)[::-1]) for tile in tiles]
+        lats = np.concatenate([lat_grid.ravel() for _, lat_grid in points])
+        lons = np.concatenate([lon_grid.ravel() for lon_grid, _ in points])
+        elevations = np.full(len(lats), np.nan)
+        remaining = [count] * len(tiles)
+
+        def on_batch(start: int, values: np.ndarray) -> None:
+            stop = start + len(values)
+            elevations[start:stop] = values
+            for i in range(start // count, (stop - 1) // count + 1):
+                remaining[i] -= min(stop, (i + 1) * count) - max(start, i * count)
+                data = elevations[i * count:(i + 1) * count]
+                if remaining[i] == 0 and np.isfinite(data).all():
+                    self.save(tiles[i], data.reshape(TILE_SAMPLES, TILE_SAMPLES))
+
+        elevations[:] = fetch(lats, lons, on_batch)
+        return {tile: elevations[i * count:(i + 1) * count].reshape(TILE_SAMPLES, TILE_SAMPLES)
+                for i, tile in enumerate(tiles)}
+
+    def get_grid(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                 resolution: int, fetch: FetchFunction,
+                 force_download: bool = False) -> np.ndarray:
+        """
+        resolution x resolution elevation grid (rows south to north) over the bounds
+
+        Cached tiles are reused; the missing ones (all of them with
+        force_download) are fetched and cached. Points that could not be
+        fetched are NaN.
+        """
+        zoom, tiles = self.tiles(lat_min, lat_max, lon_min, lon_max, resolution)
+        loaded = {} if force_download else {tile: self.load(tile) for tile in tiles}
+        missing = [tile for tile in tiles if loaded.get(tile) is None]
+        if missing:
+            print(f"📡 Fetching {len(missing)}/{len(tiles)} elevation tiles (zoom {zoom})...")
+            loaded.update(self.fetch_tiles(missing, fetch))
+        else:
+            print(f"📂 All {len(tiles)} elevation tiles cached (zoom {zoom})")
+
+        rows, cols = tiles_for_bounds(lat_min, lat_max, lon_min, lon_max, zoom)
+        intervals = TILE_SAMPLES - 1
+        mosaic = np.empty((len(rows) * intervals + 1, len(cols) * intervals + 1), dtype=np.float64)
+        for i, row in enumerate(rows):
+            for j, col in enumerate(cols):
+                mosaic[i * intervals:(i + 1) * intervals + 1,
+                       j * intervals:(j + 1) * intervals + 1] = loaded[(zoom, row, col)]
+
+        size = tile_degrees(zoom)
+        step = size / intervals
+        # DEMTile expects rows north to south
+        tile = DEMTile('elevation tile cache', mosaic[::-1], (rows.stop * size) - 90,
+                       cols.start * size - 180, step, step, None)
+        lat_grid, lon_grid = np.meshgrid(np.linspace(lat_min, lat_max, resolution),
+                                         np.linspace(lon_min, lon_max, resolution), indexing='ij')
+        return tile.sample(lat_grid.ravel(), lon_grid.ravel()).reshape(resolution, resolution)
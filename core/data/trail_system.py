@@ -5,12 +5,339 @@ Handles trail length configuration and animation frame creation with trail effec
 """
 
 import os
+from bisect import bisect_left, bisect_right
 import pandas as pd
 import plotly.graph_objects as go
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Sequence, Tuple
+import numpy as np
 from utils.user_interface import UserInterface
-from core.gps_utils import format_height_display
-from utils.gps.calculations import format_velocity_display
+from core.gps_utils import format_height_display_array, format_velocity_display_array
+from utils.animation_builders import fade_marker_styles, raw_frame, raw_trace
+from utils.animation_timeline import NS_PER_SECOND, as_timeline, frame_keys, to_epoch_ns
+from utils.parallel_frames import build_frames
+
+
+# Per-row values read when building trail traces
+_ROW_COLUMNS = ('Latitude', 'Longitude', 'Height', 'Velocity', 'precipitation_mm', 'timestamp_display')
+_ARRAY_COLUMNS = ('Latitude', 'Longitude')
+
+
+class _TrailSlice:
+    """Rows of one vulture's time-sorted track that make up a frame's trail"""
+
+    __slots__ = ('_columns', '_positions')
+
+    def __init__(self, columns: Dict[str, list], positions: Sequence[int]):
+        self._columns = columns
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def column(self, name: str) -> list:
+        """Values of one column over the trail"""
+        values = self._columns[name]
+        if isinstance(self._positions, range):
+            return values[self._positions.start:self._positions.stop]
+        return [values[i] for i in self._positions]
+
+    def row(self, i: int) -> dict:
+        """One trail row as a dict (supports ``row[col]``, ``row.get`` and ``in``)"""
+        index = self._positions[i]
+        return {name: values[index] for name, values in self._columns.items()}
+
+
+_EMPTY_TRAIL = _TrailSlice({}, range(0))
+
+
+def precipitation_colors(precipitation_mm: np.ndarray) -> List[str]:
+    """Marker colors for an array of precipitation intensities (mm/h)"""
+    return np.select(
+        [
+            precipitation_mm <= 0,
+            precipitation_mm < 0.5,
+            precipitation_mm < 2.0,
+            precipitation_mm < 5.0,
+        ],
+        [
+            'rgba(255, 255, 255, 0.7)',  # Transparent white for no rain
+            'rgba(173, 216, 230, 0.8)',  # Light blue for light rain
+            'rgba(70, 130, 180, 0.9)',   # Medium blue for moderate rain
+            'rgba(25, 25, 112, 0.95)',   # Dark blue for heavy rain
+        ],
+        default='rgba(0, 0, 139, 1.0)',  # Very dark blue for very heavy rain
+    ).tolist()
+
+
+class _TrackCursor:
+    """
+    One vulture's rows sorted by time once, with start/end pointers that
+    advance as the frame time moves forward.
+
+    A frame's trail keeps the fixes up to the frame second and, with a trail
+    limit, from the trail start on. Both bounds are integer comparisons on
+    the sorted epoch times, so each trail is a contiguous slice.
+    """
+
+    def __init__(self, data: pd.DataFrame, base_color: Optional[str] = None,
+                 precipitation_overlay: bool = False):
+        data = data.sort_values('Timestamp [UTC]', kind='mergesort')
+        if 'timestamp_ns' in data.columns:
+            times = data['timestamp_ns'].to_numpy(dtype='int64')
+        else:
+            times = to_epoch_ns(data['Timestamp [UTC]'])
+        self._times = times.tolist()
+        self._keys = frame_keys(times).tolist()
+        self._columns = {name: data[name].tolist() for name in _ROW_COLUMNS if name in data.columns}
+        # Coordinates stay numpy arrays: trails are passed on as views, not copied lists
+        for name in _ARRAY_COLUMNS:
+            if name in data.columns:
+                self._columns[name] = data[name].to_numpy(dtype=np.float64)
+        self._columns.update(self._point_styles(data, base_color, precipitation_overlay))
+        self._start = 0
+        self._end = 0
+        self._last_start_ns: Optional[int] = None
+        self._last_frame_ns: Optional[int] = None
+
+    @staticmethod
+    def _point_styles(data: pd.DataFrame, base_color: Optional[str],
+                      precipitation_overlay: bool) -> Dict[str, list]:
+        """Hover customdata and marker colors of every fix, computed once per track"""
+        n = len(data)
+        velocity = data['Velocity'] if 'Velocity' in data.columns else [0] * n
+        precipitation = data['precipitation_mm'].tolist() if 'precipitation_mm' in data.columns else [0] * n
+        customdata = [
+            list(values) for values in zip(
+                data['timestamp_display'].tolist(),
+                format_height_display_array(data['Height']),
+                precipitation,
+                format_velocity_display_array(velocity),
+            )
+        ]
+
+        colors = np.full(n, base_color, dtype=object)
+        if precipitation_overlay and 'precipitation_mm' in data.columns:
+            precip_values = data['precipitation_mm'].to_numpy(dtype=float, na_value=np.nan)
+            raining = precip_values > 0
+            colors[raining] = precipitation_colors(precip_values[raining])
+        return {'customdata': customdata, 'marker_color': colors.tolist()}
+
+    def trail(self, frame_ns: int, trail_start_ns: Optional[int]) -> _TrailSlice:
+        """
+        Trail rows for a frame
+
+        Args:
+            frame_ns: Frame time as epoch nanoseconds (whole seconds)
+            trail_start_ns: Earliest fix to keep as epoch nanoseconds, None for the full path
+        """
+        return _TrailSlice(self._columns, range(*self.bounds(frame_ns, trail_start_ns)))
+
+    def column(self, name: str) -> list:
+        """Values of one column over the whole track"""
+        return self._columns[name]
+
+    def has_column(self, name: str) -> bool:
+        return name in self._columns
+
+    @property
+    def times(self) -> List[int]:
+        """Fix times of the whole track as epoch nanoseconds"""
+        return self._times
+
+    def bounds(self, frame_ns: int, trail_start_ns: Optional[int]) -> Tuple[int, int]:
+        """Row range [start, end) of the trail for a frame (see ``trail``)"""
+        n = len(self._keys)
+        if self._last_frame_ns is None or frame_ns < self._last_frame_ns:
+            self._end = bisect_right(self._keys, frame_ns)
+        else:
+            while self._end < n and self._keys[self._end] <= frame_ns:
+                self._end += 1
+        self._last_frame_ns = frame_ns
+
+        if trail_start_ns is None:
+            start = 0
+        else:
+            if self._last_start_ns is None or trail_start_ns < self._last_start_ns:
+                self._start = bisect_left(self._times, trail_start_ns)
+            else:
+                while self._start < n and self._times[self._start] < trail_start_ns:
+                    self._start += 1
+            self._last_start_ns = trail_start_ns
+            start = self._start
+        return start, max(start, self._end)
+
+
+def _trail_hovertemplate(vulture_id: str) -> str:
+    """Hover template of a markers_fade trail trace"""
+    return (
+        f"<b>{vulture_id}</b><br>"
+        "Time: %{customdata[0]}<br>"
+        "Lat: %{lat:.6f}°<br>"
+        "Lon: %{lon:.6f}°<br>"
+        "Alt: %{customdata[1]}<br>"
+        "� Velocity: %{customdata[3]}<br>"
+        "�🌧️ Rain: %{customdata[2]:.1f} mm/h"
+        "<extra></extra>"
+    )
+
+
+def _head_hovertemplate(vulture_id: str, precip_info: str = "") -> str:
+    """Hover template of a line_head head marker"""
+    return (
+        f"<b>{vulture_id}</b><br>"
+        "Time: %{customdata[0]}<br>"
+        "Lat: %{lat:.6f}°<br>"
+        "Lon: %{lon:.6f}°<br>"
+        "Alt: %{customdata[1]}<br>"
+        "🏃 Velocity: %{customdata[3]}"
+        f"{precip_info}"
+        "<extra></extra>"
+    )
+
+
+def _empty_trail_trace(vulture_id: str, color: str) -> dict:
+    """Trace for a vulture with no data in the trail window"""
+    return raw_trace(
+        'scattermap',
+        lat=[],
+        lon=[],
+        mode='lines+markers',
+        name=vulture_id,
+        line=dict(color=color, width=3),
+        marker=dict(color=color, size=6)
+    )
+
+
+def _frame_layout(time_str: str, enable_prominent_time_display: bool) -> dict:
+    """Frame layout update with the prominent current-time annotation"""
+    if not enable_prominent_time_display:
+        return {}
+    return {
+        'annotations': [
+            dict(
+                text=f"<b>📅 Current Time:</b><br><span style='font-size: 20px; color: #2E86AB; text-shadow: 1px 1px 3px rgba(0,0,0,0.3);'>{time_str}</span>",
+                x=0.98,
+                y=0.98,
+                xref='paper',
+                yref='paper',
+                xanchor='right',
+                yanchor='top',
+                showarrow=False,
+                bgcolor='rgba(255, 255, 255, 0.95)',
+                bordercolor='rgba(46, 134, 171, 0.8)',
+                borderwidth=2,
+                borderpad=10,
+                font=dict(
+                    size=16,
+                    color='#333',
+                    family='Arial, sans-serif'
+                )
+            )
+        ]
+    }
+
+
+# Fading trail marker styles of the markers_fade strategy
+_FADE_STYLE = dict(min_size=3, size_range=3, head_size=12, min_opacity=0.3, opacity_range=0.5)
+
+# Frame time placeholder in the frame layout template of a frame index
+FRAME_TIME_PLACEHOLDER = '__FRAME_TIME__'
+
+
+def _trail_frame_range(shared: dict, start: int, end: int) -> List[dict]:
+    """Frames [start, end) of TrailSystem.create_frames_with_trail (range builder of utils.parallel_frames)"""
+    timeline = shared['timeline']
+    trail_ns = shared['trail_ns']
+    tracks = shared['tracks']
+    vulture_ids = shared['vulture_ids']
+    color_map = shared['color_map']
+    strategy = shared['strategy']
+    enable_precipitation_overlay = shared['enable_precipitation_overlay']
+    enable_prominent_time_display = shared['enable_prominent_time_display']
+    frames = []
+
+    for time_str, frame_ns in zip(timeline.labels[start:end], timeline.times_ns[start:end].tolist()):
+        frame_data = []
+        # None shows the complete flight path (no trail limit)
+        trail_start_ns = None if trail_ns is None else frame_ns - trail_ns
+        
+        for vulture_id in vulture_ids:
+            track = tracks.get(vulture_id)
+            trail_data = track.trail(frame_ns, trail_start_ns) if track is not None else _EMPTY_TRAIL
+            
+            if len(trail_data) > 0:
+                if strategy == "line_head":
+                    # Performance: draw the trail once as a line (no per-point styling) and the current head as a single marker
+                    # Trail line
+                    frame_data.append(
+                        raw_trace(
+                            'scattermap',
+                            lat=trail_data.column('Latitude'),
+                            lon=trail_data.column('Longitude'),
+                            mode='lines',
+                            name=vulture_id,
+                            line=dict(color=color_map[vulture_id], width=3),
+                            hoverinfo='skip',
+                            showlegend=True,
+                        )
+                    )
+                    # Head marker (latest point only)
+                    head = trail_data.row(-1)
+                    
+                    # Precipitation-based coloring (precomputed per track): blue for rain,
+                    # original color for no rain
+                    marker_color = head['marker_color']
+                    raining = enable_precipitation_overlay and 'precipitation_mm' in head and pd.notna(head['precipitation_mm']) and head['precipitation_mm'] > 0
+                    marker_size = 15 if raining else 12  # Slightly larger for visibility
+                    
+                    precip_info = ""
+                    if raining:
+                        precip_info = f"<br>🌧️ Rain: {head['precipitation_mm']:.1f} mm/h"
+                    
+                    frame_data.append(
+                        raw_trace(
+                            'scattermap',
+                            lat=[head['Latitude']],
+                            lon=[head['Longitude']],
+                            mode='markers',
+                            name=f"{vulture_id} (current)",
+                            marker=dict(color=marker_color, size=marker_size),
+                            customdata=[head['customdata']],
+                            hovertemplate=_head_hovertemplate(vulture_id, precip_info),
+                            showlegend=False,
+                        )
+                    )
+                else:
+                    # Original: fading markers along the trail with precipitation coloring
+                    # (hover data and colors are precomputed per track; sizes and
+                    # opacities only depend on the trail length)
+                    marker_sizes, marker_opacities = fade_marker_styles(len(trail_data), **_FADE_STYLE)
+                    marker_colors = trail_data.column('marker_color')
+                    customdata = trail_data.column('customdata')
+
+                    frame_data.append(
+                        raw_trace(
+                            'scattermap',
+                            lat=trail_data.column('Latitude'),
+                            lon=trail_data.column('Longitude'),
+                            mode='lines+markers',
+                            name=vulture_id,
+                            line=dict(color=color_map[vulture_id], width=3),
+                            marker=dict(color=marker_colors, size=marker_sizes, opacity=marker_opacities),
+                            customdata=customdata,
+                            hovertemplate=_trail_hovertemplate(vulture_id),
+                        )
+                    )
+            else:
+                # Empty trace for vultures with no data in the trail window
+                frame_data.append(_empty_trail_trace(vulture_id, color_map[vulture_id]))
+        
+        # Create frame with data and layout updates for prominent time display
+        frame_layout = _frame_layout(time_str, enable_prominent_time_display)
+        
+        frames.append(raw_frame(frame_data, time_str, frame_layout))
+    
+    return frames
 
 
 class TrailSystem:
@@ -70,218 +397,198 @@ class TrailSystem:
             
             self.ui.print_error("Invalid choice. Please enter a valid option (e.g., '30m', '1h', 'all')")
     
+    def trail_length_choices(self) -> List[Optional[int]]:
+        """Trail lengths (minutes, None = complete path) offered by client-side trail switching"""
+        choices = [option["minutes"] for option in self.TRAIL_OPTIONS.values()]
+        if self.trail_length_minutes not in choices:
+            choices.append(self.trail_length_minutes)
+        return [None] + sorted(minutes for minutes in choices if minutes is not None)
+
     def create_frames_with_trail(self, df: pd.DataFrame, vulture_ids: List[str], 
-                                color_map: Dict[str, str], unique_times: List[str], 
+                                color_map: Dict[str, str], unique_times: Sequence[str], 
                                 enable_prominent_time_display: bool = True,
                                 strategy: str = "markers_fade",
-                                enable_precipitation_overlay: bool = False) -> List[go.Frame]:
+                                enable_precipitation_overlay: bool = False,
+                                max_workers: Optional[int] = 1,
+                                raw_frames: bool = False) -> List[go.Frame]:
         """Create animation frames with trail length support and visual effects.
 
         strategy:
             - "markers_fade": original behavior (lines+markers with fading trail)
             - "line_head": performance mode (single line trail + one head marker)
+
+        unique_times is an AnimationTimeline or a list of frame names
+        ('%d.%m.%Y %H:%M:%S'); frames are emitted in chronological order.
+
+        max_workers > 1 (None: FRAME_WORKERS / CPU count) builds long
+        timelines in worker processes (utils.parallel_frames).
+
+        Frames are assembled as plain dicts (utils.animation_builders.raw_trace)
+        with the track coordinates as numpy array views. With raw_frames they
+        are returned as such, to be validated once by ``fig.frames = frames``
+        or written unvalidated; otherwise they are wrapped in go.Frame.
         """
-        frames = []
-        
-        for time_str in unique_times:
-            frame_data = []
-            # Parse current frame time as timezone-aware UTC to match dataframes
-            current_time = pd.to_datetime(time_str, format='%d.%m.%Y %H:%M:%S', utc=True)
-            
-            for vulture_id in vulture_ids:
-                vulture_data = df[df['vulture_id'] == vulture_id]
-                
-                if self.trail_length_minutes is None:
-                    # Show complete flight path (no trail limit)
-                    trail_data = vulture_data[vulture_data['timestamp_str'] <= time_str]
-                else:
-                    # Apply trail length filter using tz-aware timestamps
-                    trail_start = current_time - pd.Timedelta(minutes=self.trail_length_minutes)
-                    # Ensure the 'Timestamp [UTC]' column is tz-aware; if not, try to localize to UTC
-                    ts_series = vulture_data['Timestamp [UTC]']
-                    try:
-                        if ts_series.dt.tz is None:
-                            # Localize naive timestamps to UTC (assume they are UTC)
-                            ts_series = ts_series.dt.tz_localize('UTC')
-                    except Exception:
-                        # If .dt accessor fails, fall back to original series
-                        pass
-                    mask_time = (ts_series >= trail_start)
-                    mask_until_frame = (vulture_data['timestamp_str'] <= time_str)
-                    trail_data = vulture_data[mask_time & mask_until_frame]
-                
-                if len(trail_data) > 0:
-                    # Sort by timestamp to ensure correct order
-                    trail_data = trail_data.sort_values('Timestamp [UTC]')
-
-                    if strategy == "line_head":
-                        # Performance: draw the trail once as a line (no per-point styling) and the current head as a single marker
-                        # Trail line
-                        frame_data.append(
-                            go.Scattermap(
-                                lat=trail_data['Latitude'].tolist(),
-                                lon=trail_data['Longitude'].tolist(),
-                                mode='lines',
-                                name=vulture_id,
-                                line=dict(color=color_map[vulture_id], width=3),
-                                hoverinfo='skip',
-                                showlegend=True,
-                            )
-                        )
-                        # Head marker (latest point only)
-                        head = trail_data.iloc[-1]
-                        height_display = format_height_display(head['Height'])
-                        velocity_display = format_velocity_display(head.get('Velocity', 0))
-                        
-                        # Precipitation-based coloring
-                        if enable_precipitation_overlay and 'precipitation_mm' in head:
-                            precip_value = head['precipitation_mm'] if pd.notna(head['precipitation_mm']) else 0
-                            # Color scale: blue for rain, original color for no rain
-                            if precip_value > 0:
-                                marker_color = self._get_precipitation_color(precip_value)
-                                marker_size = 15  # Slightly larger for visibility
-                            else:
-                                marker_color = color_map[vulture_id]
-                                marker_size = 12
-                        else:
-                            marker_color = color_map[vulture_id]
-                            marker_size = 12
-                        
-                        precip_info = ""
-                        if enable_precipitation_overlay and 'precipitation_mm' in head and pd.notna(head['precipitation_mm']) and head['precipitation_mm'] > 0:
-                            precip_info = f"<br>🌧️ Rain: {head['precipitation_mm']:.1f} mm/h"
-                        
-                        frame_data.append(
-                            go.Scattermap(
-                                lat=[head['Latitude']],
-                                lon=[head['Longitude']],
-                                mode='markers',
-                                name=f"{vulture_id} (current)",
-                                marker=dict(color=marker_color, size=marker_size),
-                                customdata=[[head['timestamp_display'], height_display, head.get('precipitation_mm', 0), velocity_display]],
-                                hovertemplate=(
-                                    f"<b>{vulture_id}</b><br>"
-                                    "Time: %{customdata[0]}<br>"
-                                    "Lat: %{lat:.6f}°<br>"
-                                    "Lon: %{lon:.6f}°<br>"
-                                    "Alt: %{customdata[1]}<br>"
-                                    "🏃 Velocity: %{customdata[3]}"
-                                    f"{precip_info}"
-                                    "<extra></extra>"
-                                ),
-                                showlegend=False,
-                            )
-                        )
-                    else:
-                        # Original: fading markers along the trail with precipitation coloring
-                        trail_points = len(trail_data)
-                        marker_sizes = []
-                        marker_opacities = []
-                        marker_colors = []
-                        customdata = []
-                        
-                        for i, (_, row) in enumerate(trail_data.iterrows()):
-                            height_display = format_height_display(row['Height'])
-                            velocity_display = format_velocity_display(row.get('Velocity', 0))
-                            customdata.append([row['timestamp_display'], height_display, row.get('precipitation_mm', 0), velocity_display])
-                            age_factor = i / max(1, trail_points - 1) if trail_points > 1 else 1.0
-                            
-                            # Precipitation-based coloring
-                            if enable_precipitation_overlay and 'precipitation_mm' in row:
-                                precip_value = row['precipitation_mm'] if pd.notna(row['precipitation_mm']) else 0
-                                if precip_value > 0:
-                                    marker_colors.append(self._get_precipitation_color(precip_value))
-                                else:
-                                    marker_colors.append(color_map[vulture_id])
-                            else:
-                                marker_colors.append(color_map[vulture_id])
-                            
-                            if i == trail_points - 1:
-                                marker_sizes.append(12)
-                                marker_opacities.append(1.0)
-                            else:
-                                fade_size = 3 + (3 * age_factor)
-                                marker_sizes.append(fade_size)
-                                fade_opacity = 0.3 + (0.5 * age_factor)
-                                marker_opacities.append(fade_opacity)
-
-                        frame_data.append(
-                            go.Scattermap(
-                                lat=trail_data['Latitude'].tolist(),
-                                lon=trail_data['Longitude'].tolist(),
-                                mode='lines+markers',
-                                name=vulture_id,
-                                line=dict(color=color_map[vulture_id], width=3),
-                                marker=dict(color=marker_colors, size=marker_sizes, opacity=marker_opacities),
-                                customdata=customdata,
-                                hovertemplate=(
-                                    f"<b>{vulture_id}</b><br>"
-                                    "Time: %{customdata[0]}<br>"
-                                    "Lat: %{lat:.6f}°<br>"
-                                    "Lon: %{lon:.6f}°<br>"
-                                    "Alt: %{customdata[1]}<br>"
-                                    "� Velocity: %{customdata[3]}<br>"
-                                    "�🌧️ Rain: %{customdata[2]:.1f} mm/h"
-                                    "<extra></extra>"
-                                ),
-                            )
-                        )
-                else:
-                    # Empty trace for vultures with no data in the trail window
-                    frame_data.append(
-                        go.Scattermap(
-                            lat=[],
-                            lon=[],
-                            mode='lines+markers',
-                            name=vulture_id,
-                            line=dict(color=color_map[vulture_id], width=3),
-                            marker=dict(color=color_map[vulture_id], size=6)
-                        )
-                    )
-            
-            # Create frame with data and layout updates for prominent time display
-            frame_layout = {}
-            if enable_prominent_time_display:
-                frame_layout = {
-                    'annotations': [
-                        dict(
-                            text=f"<b>📅 Current Time:</b><br><span style='font-size: 20px; color: #2E86AB; text-shadow: 1px 1px 3px rgba(0,0,0,0.3);'>{time_str}</span>",
-                            x=0.98,
-                            y=0.98,
-                            xref='paper',
-                            yref='paper',
-                            xanchor='right',
-                            yanchor='top',
-                            showarrow=False,
-                            bgcolor='rgba(255, 255, 255, 0.95)',
-                            bordercolor='rgba(46, 134, 171, 0.8)',
-                            borderwidth=2,
-                            borderpad=10,
-                            font=dict(
-                                size=16,
-                                color='#333',
-                                family='Arial, sans-serif'
-                            )
-                        )
-                    ]
-                }
-            
-            frames.append(go.Frame(data=frame_data, layout=frame_layout, name=time_str))
-        
-        return frames
+        timeline = as_timeline(unique_times)
+        shared = {
+            'timeline': timeline,
+            'trail_ns': self._trail_ns(),
+            'tracks': self._track_cursors(df, color_map, enable_precipitation_overlay),
+            'vulture_ids': list(vulture_ids),
+            'color_map': dict(color_map),
+            'strategy': strategy,
+            'enable_precipitation_overlay': enable_precipitation_overlay,
+            'enable_prominent_time_display': enable_prominent_time_display,
+        }
+        frames = build_frames(_trail_frame_range, shared, len(timeline), max_workers=max_workers)
+        return frames if raw_frames else [go.Frame(frame) for frame in frames]
     
+    def create_frame_index(self, df: pd.DataFrame, vulture_ids: List[str],
+                           color_map: Dict[str, str], unique_times: Sequence[str],
+                           enable_prominent_time_display: bool = True,
+                           strategy: str = "markers_fade",
+                           enable_precipitation_overlay: bool = False) -> Dict:
+        """Index-referenced equivalent of create_frames_with_trail.
+
+        Instead of materializing every frame, each track is shipped once and
+        every frame is described by a [start, end) row range per vulture. The
+        browser runtime added by utils.html_injection.inject_indexed_frames
+        rebuilds the same frames from this payload, so the HTML size scales
+        with the number of points rather than points x trail frames.
+
+        Returns:
+            JSON-serializable payload (numeric arrays as numpy arrays)
+        """
+        timeline = as_timeline(unique_times)
+        trail_ns = self._trail_ns()
+        cursors = self._track_cursors(df, color_map, enable_precipitation_overlay)
+
+        ranges = np.zeros((len(timeline), len(vulture_ids), 2), dtype=np.int32)
+        for f, frame_ns in enumerate(timeline.times_ns.tolist()):
+            trail_start_ns = None if trail_ns is None else frame_ns - trail_ns
+            for v, vulture_id in enumerate(vulture_ids):
+                cursor = cursors.get(vulture_id)
+                if cursor is not None:
+                    ranges[f, v] = cursor.bounds(frame_ns, trail_start_ns)
+
+        tracks = self._track_payloads(cursors, vulture_ids, color_map, strategy, enable_precipitation_overlay)
+
+        return {
+            'version': 1,
+            'strategy': strategy,
+            'frame_names': list(timeline.labels),
+            'ranges': ranges.reshape(-1),
+            'fade': dict(_FADE_STYLE),
+            'tracks': tracks,
+            'frame_layout': _frame_layout(FRAME_TIME_PLACEHOLDER, enable_prominent_time_display) or None,
+            'time_placeholder': FRAME_TIME_PLACEHOLDER,
+        }
+
+    def create_playback_payload(self, df: pd.DataFrame, vulture_ids: List[str],
+                                color_map: Dict[str, str], unique_times: Sequence[str],
+                                strategy: str = "markers_fade",
+                                enable_precipitation_overlay: bool = False,
+                                frame_duration_ms: int = 800,
+                                max_interpolation_gap_seconds: Optional[float] = 7200) -> Dict:
+        """Track payload for the client-side playback runtime.
+
+        No frames are built: the runtime added by
+        utils.html_injection.inject_client_playback advances a continuous
+        clock, cuts each trail from the fix times in the browser and moves
+        the heads between fixes. Fix times are seconds since the first frame.
+
+        Args:
+            frame_duration_ms: Wall time per frame step at 1x, sets the base playback rate
+            max_interpolation_gap_seconds: Fix gaps above this are not interpolated (None: always)
+
+        Returns:
+            JSON-serializable payload (numeric arrays as numpy arrays)
+        """
+        timeline = as_timeline(unique_times)
+        origin_ns = int(timeline.times_ns[0]) if len(timeline) else 0
+        cursors = self._track_cursors(df, color_map, enable_precipitation_overlay)
+        tracks = self._track_payloads(cursors, vulture_ids, color_map, strategy,
+                                      enable_precipitation_overlay, origin_ns=origin_ns)
+        trail_ns = self._trail_ns()
+        return {
+            'version': 1,
+            'strategy': strategy,
+            'frame_names': list(timeline.labels),
+            'frame_times': (timeline.times_ns - origin_ns) / NS_PER_SECOND,
+            'trail_seconds': None if trail_ns is None else trail_ns / NS_PER_SECOND,
+            'frame_duration_ms': int(frame_duration_ms),
+            'max_gap_seconds': max_interpolation_gap_seconds,
+            'fade': dict(_FADE_STYLE),
+            'tracks': tracks,
+        }
+
+    @staticmethod
+    def _track_payloads(cursors: Dict[str, _TrackCursor], vulture_ids: Sequence[str],
+                        color_map: Dict[str, str], strategy: str,
+                        enable_precipitation_overlay: bool,
+                        origin_ns: Optional[int] = None) -> List[Dict]:
+        """Per-vulture arrays and trace templates shared by the browser runtimes"""
+        tracks = []
+        for vulture_id in vulture_ids:
+            color = color_map[vulture_id]
+            cursor = cursors.get(vulture_id)
+            track = {
+                'vulture_id': str(vulture_id),
+                'color': color,
+                'lat': np.asarray(cursor.column('Latitude') if cursor else [], dtype=np.float64),
+                'lon': np.asarray(cursor.column('Longitude') if cursor else [], dtype=np.float64),
+                'customdata': cursor.column('customdata') if cursor else [],
+                'marker_color': None,
+                'head_size': None,
+                'precip_info': None,
+            }
+            if origin_ns is not None:
+                times = np.asarray(cursor.times if cursor else [], dtype=np.int64)
+                track['times'] = (times - origin_ns) / NS_PER_SECOND
+            if cursor is not None and enable_precipitation_overlay and cursor.has_column('precipitation_mm'):
+                precip = np.asarray(cursor.column('precipitation_mm'), dtype=float)
+                raining = precip > 0
+                track['marker_color'] = cursor.column('marker_color')
+                track['head_size'] = np.where(raining, 15, 12).astype(np.uint8)
+                track['precip_info'] = [
+                    f"<br>🌧️ Rain: {value:.1f} mm/h" if rain else ""
+                    for value, rain in zip(precip.tolist(), raining.tolist())
+                ]
+
+            if strategy == "line_head":
+                track['templates'] = {
+                    'trail': go.Scattermap(mode='lines', name=vulture_id, line=dict(color=color, width=3),
+                                           hoverinfo='skip', showlegend=True).to_plotly_json(),
+                    'head': go.Scattermap(mode='markers', name=f"{vulture_id} (current)",
+                                          hovertemplate=_head_hovertemplate(vulture_id),
+                                          showlegend=False).to_plotly_json(),
+                }
+            else:
+                track['templates'] = {
+                    'trail': go.Scattermap(mode='lines+markers', name=vulture_id, line=dict(color=color, width=3),
+                                           hovertemplate=_trail_hovertemplate(vulture_id)).to_plotly_json(),
+                }
+            track['templates']['empty'] = _empty_trail_trace(vulture_id, color)
+            tracks.append(track)
+        return tracks
+
+    def _trail_ns(self) -> Optional[int]:
+        """Trail length in nanoseconds, None for the complete flight path"""
+        if self.trail_length_minutes is None:
+            return None
+        return int(self.trail_length_minutes * 60 * NS_PER_SECOND)
+
+    @staticmethod
+    def _track_cursors(df: pd.DataFrame, color_map: Dict[str, str],
+                       enable_precipitation_overlay: bool) -> Dict[str, _TrackCursor]:
+        """Sort and precompute every vulture's track once"""
+        return {
+            vulture_id: _TrackCursor(vulture_data, color_map.get(vulture_id), enable_precipitation_overlay)
+            for vulture_id, vulture_data in df.groupby('vulture_id', sort=False)
+        }
+
     def _get_precipitation_color(self, precipitation_mm: float) -> str:
         """Get color based on precipitation intensity"""
-        if precipitation_mm <= 0:
-            return 'rgba(255, 255, 255, 0.7)'  # Transparent white for no rain
-        elif precipitation_mm < 0.5:
-            return 'rgba(173, 216, 230, 0.8)'  # Light blue for light rain
-        elif precipitation_mm < 2.0:
-            return 'rgba(70, 130, 180, 0.9)'   # Medium blue for moderate rain
-        elif precipitation_mm < 5.0:
-            return 'rgba(25, 25, 112, 0.95)'   # Dark blue for heavy rain
-        else:
-            return 'rgba(0, 0, 139, 1.0)'      # Very dark blue for very heavy rain
+        return precipitation_colors(np.array([precipitation_mm], dtype=float))[0]
     
     def get_output_filename(self, base_name: str = 'live_map_animation', bird_names: list = None) -> str:
         """Generate appropriate filename based on trail configuration and bird names"""
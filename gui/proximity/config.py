@@ -48,7 +48,11 @@ class ProximityGUIConfig:
         self.timeline = []
         self.result_files = {}
         self.analysis_running = False
-        self.analysis_thread = None
+        # Analysis worker process, its message queue and cancellation event
+        self.analysis_process = None
+        self.worker_queue = None
+        self.cancel_event = None
+        self.latest_progress = None
 
         # UI component references (will be set by UI builders)
         self.notebook = None
@@ -6,7 +6,6 @@ Handles user interactions like button clicks, file browsing, and validation.
 """
 
 import os
-import threading
 import queue
 import subprocess
 import platform
@@ -15,6 +14,14 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 
 
+# Poll interval for log and worker queues (about 60 updates per second)
+QUEUE_POLL_INTERVAL_MS = 16
+# Upper bound of worker messages handled per poll so a burst cannot block Tk
+WORKER_MESSAGES_PER_TICK = 50
+# Grace period for the worker to honour a cancel request before it is killed
+WORKER_TERMINATE_DELAY_MS = 3000
+
+
 class ProximityEventHandler:
     """Handles user events and interactions for the Proximity Analysis GUI"""
     
@@ -93,7 +100,7 @@ class ProximityEventHandler:
         pass
     
     def run_analysis(self):
-        """Start the proximity analysis in a background thread"""
+        """Start the proximity analysis in a separate worker process"""
         if self.config.analysis_running:
             return
         
@@ -131,136 +138,115 @@ class ProximityEventHandler:
         self.config.timeline = []
         self.config.result_files = {}
 
-        # Start analysis thread
-        self.config.analysis_thread = threading.Thread(target=self._run_analysis_worker, daemon=True)
-        self.config.analysis_thread.start()
+        # Reset progress state
+        self.config.latest_progress = None
+        self.config.progress_var.set(0)
+
+        # Start analysis process; results stream back over the worker queue
+        try:
+            from core.analysis.proximity_worker import start_proximity_worker
+            (self.config.analysis_process,
+             self.config.worker_queue,
+             self.config.cancel_event) = start_proximity_worker(self.config.get_analysis_parameters())
+        except Exception as e:
+            self.log(f"❌ Could not start analysis process: {e}")
+            self._analysis_finished()
     
     def stop_analysis(self):
         """Stop the running analysis"""
         if self.config.analysis_running:
+            # Ask the worker to stop at the next work block
+            if self.config.cancel_event is not None:
+                self.config.cancel_event.set()
+            self.log("⏹️ Stopping analysis...")
             self.config.analysis_running = False
             translator = self.config.translator
             status_text = "Analysis stopped" if not translator else translator.t("status_stopped")
             self.config.status_var.set(status_text)
             self._analysis_finished()
+            # Kill the worker if it does not reach a cancellation point in time
+            # (bound now: a new run may have started when the timer fires)
+            process = self.config.analysis_process
+            if self.config.root and process is not None:
+                self.config.root.after(WORKER_TERMINATE_DELAY_MS,
+                                       lambda p=process: self._terminate_worker(p))
     
-    def _run_analysis_worker(self):
-        """Worker function that runs the analysis in background"""
-        try:
-            # Import analysis functions
-            from core.gps_utils import DataLoader, get_numbered_output_path
-            from core.analysis.proximity_engine import ProximityEngine
-            
-            # Get parameters
-            params = self.config.get_analysis_parameters()
-            
-            # Log start
-            self.log("Starting proximity analysis...")
-            
-            # Load GPS data
-            self.log("Loading GPS data...")
-            data_loader = DataLoader(params['data_folder'])
-            dataframes = data_loader.load_all_csv_files()
-            
-            if not dataframes:
-                self.log("❌ No valid GPS data found")
-                return
-            
-            self.log(f"✅ Loaded {len(dataframes)} vulture datasets")
-            
-            # Initialize and configure proximity engine
-            self.log("Configuring proximity engine...")
-            engine = ProximityEngine()
-            engine.load_dataframes(dataframes)
-            engine.proximity_threshold_km = float(params['proximity_threshold'])
-            engine.min_duration_minutes = float(params['time_threshold'])
-
-            self.log(f"⚙️ Proximity threshold: {engine.proximity_threshold_km} km")
-            self.log(f"⚙️ Time threshold: {engine.min_duration_minutes} minutes")
-
-            # Run proximity analysis
-            self.log("Analyzing proximity events...")
-            events = engine.analyze_proximity()
-
-            if not events:
-                self.log("⚠️ No proximity events found with current parameters")
-                self.config.results = {
-                    'total_events': 0,
-                    'unique_pairs': 0,
-                    'avg_distance_km': 0.0,
-                    'closest_distance_km': 0.0,
-                }
-                self.config.timeline = []
-                self._update_results_display()
-                return
-
-            self.log(f"✅ Found {len(events)} proximity events!")
-
-            # Calculate statistics (without generating visualizations here)
-            self.log("Calculating statistics...")
-            stats = engine.calculate_statistics()
-
-            # Export events dataframe to CSV in the selected output folder
-            try:
-                # Respect the configured output folder using OUTPUT_DIR for helpers
-                output_dir = params['output_folder']
-                if output_dir:
-                    os.environ['OUTPUT_DIR'] = output_dir
-                events_df = engine.get_events_dataframe()
-                csv_path = get_numbered_output_path('proximity_events', 'analysis').replace('.html', '.csv')
-                events_df.to_csv(csv_path, index=False)
-                self.log(f"📄 Events CSV saved to: {csv_path}")
-                # Track result file
-                self.config.result_files = self.config.result_files or {}
-                self.config.result_files['events_csv'] = csv_path
-            except Exception as e:
-                self.log(f"⚠️ Failed to export events CSV: {e}")
-
-            # Populate results for display
-            self.config.results = {
-                'total_events': stats.total_events,
-                'unique_pairs': stats.unique_pairs,
-                'avg_distance_km': getattr(stats, 'average_distance_km', 0.0),
-                'closest_distance_km': getattr(stats, 'closest_distance_km', 0.0),
-            }
-
-            # Create the same HTML visualizations as before (timeline, map, dashboard)
-            try:
-                from utils.proximity_plots import ProximityVisualizer
-                if output_dir:
-                    os.environ['OUTPUT_DIR'] = output_dir  # ensure visualizer saves to chosen folder
-                self.log("📈 Creating visualizations (timeline, map, dashboard)...")
-                viz = ProximityVisualizer()
-                viz.create_all_visualizations(events, stats)
-                self.log("✨ Visualizations created.")
-            except Exception as ve:
-                self.log(f"⚠️ Visualization creation failed: {ve}")
-
-            # Build a simple timeline from events (start=end=timestamp)
-            self.config.timeline = []
-            for idx, ev in enumerate(events, start=1):
-                ts = ev.timestamp
-                # Use a nominal end equal to start (engine doesn't group durations here)
-                self.config.timeline.append({
-                    'id': idx,
-                    'start': ts,
-                    'end': ts,  # no duration info at this stage
-                    'pair': (ev.vulture1, ev.vulture2),
-                })
-
-            self.log("✅ Analysis completed successfully!")
-
-            # Update results display
+    def _terminate_worker(self, process):
+        """Terminate a stopped analysis process if it is still alive"""
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout=1)
+            self.log("⏹️ Analysis process terminated")
+        if self.config.analysis_process is process:
+            self.config.analysis_process = None
+            self.config.worker_queue = None
+    
+    def _handle_worker_message(self, kind, payload):
+        """Apply one message from the analysis process to the GUI state"""
+        if kind == 'log':
+            self.log(payload)
+        elif kind == 'progress':
+            self._on_analysis_progress(payload)
+        elif kind == 'result':
+            from core.analysis.proximity_worker import build_timeline_from_columns
+            self.config.results = payload['results']
+            self.config.result_files = payload['result_files']
+            self.config.timeline = build_timeline_from_columns(payload['events'])
             self._update_results_display()
-            
-        except Exception as e:
-            self.log(f"❌ Analysis failed: {e}")
-            import traceback
-            self.log(traceback.format_exc())
-        finally:
+        elif kind == 'cancelled':
+            self.log(f"⏹️ {payload}")
+        elif kind == 'error':
+            self.log(f"❌ Analysis failed: {payload}")
+        elif kind == 'done':
+            self.config.analysis_process = None
+            self.config.worker_queue = None
             if self.config.analysis_running:
                 self._analysis_finished()
     
+    def _drain_worker_queue(self):
+        """Process pending worker messages, bounded per tick to keep Tk responsive"""
+        worker_queue = self.config.worker_queue
+        if worker_queue is None:
+            return
+        for _ in range(WORKER_MESSAGES_PER_TICK):
+            try:
+                kind, payload = worker_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._handle_worker_message(kind, payload)
+            if self.config.worker_queue is None:
+                break
+        
+        # The process died without sending 'done' (e.g. terminated or crashed)
+        process = self.config.analysis_process
+        if process is not None and not process.is_alive() and worker_queue.empty():
+            self.config.analysis_process = None
+            self.config.worker_queue = None
+            if self.config.analysis_running:
+                self.log(f"❌ Analysis process exited unexpectedly (code {process.exitcode})")
+                self._analysis_finished()
+    
+    def _on_analysis_progress(self, progress):
+        """Store the latest engine progress; applied to the UI by the queue checker"""
+        self.config.latest_progress = progress
+
+    def _apply_progress(self):
+        """Update progress bar and status text from the latest engine progress"""
+        progress = self.config.latest_progress
+        if progress is None or not self.config.analysis_running:
+            return
+        self.config.progress_var.set(progress.fraction * 100)
+        translator = self.config.translator
+        status_text = "Running analysis..." if not translator else translator.t("status_running")
+        eta_text = ""
+        if progress.eta_seconds is not None:
+            minutes, seconds = divmod(int(progress.eta_seconds), 60)
+            eta_text = f", ETA {minutes}:{seconds:02d}"
+        self.config.status_var.set(
+            f"{status_text} {progress.fraction * 100:.0f}% "
+            f"(pair {min(progress.pairs_done + 1, progress.pairs_total)}/{progress.pairs_total}{eta_text})"
+        )
+
     def _update_results_display(self):
         """Update the results display with analysis results"""
         if not self.config.results_tree or not self.config.results:
@@ -489,9 +475,12 @@ For more detailed help, visit: https://github.com/YourRepo/GPS_make_BGs_fly
         except queue.Empty:
             pass
         
+        self._drain_worker_queue()
+        self._apply_progress()
+        
         # Schedule next check
         if self.config.root:
-            self.config.root.after(100, self.check_log_queue)
+            self.config.root.after(QUEUE_POLL_INTERVAL_MS, self.check_log_queue)
     
     def clear_log(self):
         """Clear the log display"""
@@ -122,7 +122,8 @@ class ProximityUIBuilder:
         self.config.progress_bar = ttk.Progressbar(
             status_frame,
             variable=self.config.progress_var,
-            mode='indeterminate'
+            mode='determinate',
+            maximum=100
         )
         self.config.progress_bar.pack(side='right', padx=(10, 5), fill='x', expand=True)
     
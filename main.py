@@ -13,6 +13,7 @@ Features:
 
 import sys
 import os
+import multiprocessing
 
 # Version information
 __version__ = "1.0.0"
@@ -116,4 +117,6 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    # Frozen builds re-run this entry point for spawned worker processes
+    multiprocessing.freeze_support()
     sys.exit(main())
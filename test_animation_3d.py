@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test script for the 3D animation frames of Animation3DEngine
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'core'))
+
+import base64
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from core.animation.animation_3d_engine import Animation3DEngine
+from core.data.elevation_data_manager import ElevationData, ElevationDataManager, HEIGHT_AGL_COLUMN
+
+
+def _make_engine(resolution=40):
+    """Engine with a synthetic terrain grid and two vultures inside it"""
+    bounds = ElevationDataManager.PREDEFINED_REGIONS['berchtesgaden_full']
+    lons = np.linspace(bounds.lon_min, bounds.lon_max, resolution)
+    lats = np.linspace(bounds.lat_min, bounds.lat_max, resolution)
+    elevations = 1000 + 500 * np.sin(lons[None, :] * 30) * np.cos(lats[:, None] * 30)
+    engine = Animation3DEngine()
+    engine.current_elevation_data = ElevationData('synthetic', lons, lats, elevations, resolution, bounds, 'test')
+    engine.frame_workers = 1
+
+    rng = np.random.default_rng(5)
+    frames = []
+    for vulture_id in ['A', 'B']:
+        times = pd.date_range('2024-06-01 08:00', periods=40, freq='1min', tz='UTC')
+        frames.append(pd.DataFrame({
+            'Timestamp [UTC]': times,
+            'Latitude': 47.5 + 0.1 * rng.random(len(times)),
+            'Longitude': 13.0 + 0.1 * rng.random(len(times)),
+            'Height': 1500 + 100 * rng.random(len(times)),
+            'vulture_id': vulture_id,
+        }))
+    engine.load_processed_data(pd.concat(frames, ignore_index=True))
+    return engine
+
+
+def test_frames_leave_terrain_static():
+    """Frames update the flight path traces by index and never repeat the terrain"""
+    print("Testing static terrain in 3D frames...")
+    engine = _make_engine()
+    df = engine._prepare_3d_data()
+    fig = engine._create_3d_figure(df, 'full')
+    engine._add_terrain_surface(fig)
+    engine._add_3d_animation_frames(fig, df)
+
+    assert [trace.type for trace in fig.data] == ['scatter3d', 'scatter3d', 'surface']
+    assert len(fig.frames) == 40
+    for frame in fig.frames:
+        assert list(frame.traces) == [0, 1]
+        assert [trace.type for trace in frame.data] == ['scatter3d', 'scatter3d']
+    last = fig.frames[-1]
+    assert [trace.name for trace in last.data] == ['A', 'B'] and len(last.data[0].x) == 40
+    print(f"✅ {len(fig.frames)} frames without terrain copies")
+
+
+def test_performance_mode_line_head():
+    """Performance mode draws a simplified line ending at the head plus one head marker per bird"""
+    from utils.lod import LODConfig
+    print("Testing 3D performance mode...")
+    engine = _make_engine()
+    engine.performance_mode = True
+    engine.line_lod_config = LODConfig(max_points_per_track=10, target_points_per_min=0, use_rdp=False)
+    df = engine._apply_performance_lod(engine._prepare_3d_data())
+    fig = engine._create_3d_figure(df, 'full')
+    engine._add_terrain_surface(fig)
+    engine._add_3d_animation_frames(fig, df)
+
+    assert [trace.mode for trace in fig.data[:4]] == ['lines', 'markers', 'lines', 'markers']
+    track = df[df['vulture_id'] == 'A'].sort_values('Timestamp [UTC]')
+    for frame_number, frame in enumerate(fig.frames):
+        assert list(frame.traces) == [0, 1, 2, 3]
+        line, head = frame.data[0], frame.data[1]
+        assert len(head.x) == 1 and head.x[0] == track['Longitude'].iloc[frame_number]
+        assert line.x[-1] == head.x[0] and len(line.x) <= 11
+        assert head.customdata[0][0] == track['timestamp_short'].iloc[frame_number]
+    print(f"✅ {len(fig.frames)} line-head frames")
+
+
+def test_height_above_ground():
+    """Terrain is sampled bilinearly under every fix, once per data and terrain"""
+    print("Testing height above ground...")
+    engine = _make_engine()
+    terrain = engine.current_elevation_data
+    plane = ElevationData('plane', terrain.lons, terrain.lats,
+                          100 * terrain.lats[:, None] + 10 * terrain.lons[None, :],
+                          terrain.resolution, terrain.bounds, 'test')
+    rng = np.random.default_rng(7)
+    lats = rng.uniform(47.3, 47.8, 1_000_000)
+    lons = rng.uniform(12.8, 13.25, 1_000_000)
+    ground = plane.sample(lats, lons)
+    inside = (lats >= terrain.bounds.lat_min) & (lats <= terrain.bounds.lat_max)
+    assert np.allclose(ground[inside], 100 * lats[inside] + 10 * lons[inside])
+    assert np.isnan(ground[~inside]).all()
+
+    df = engine._prepare_3d_data()
+    expected = df['Height'] - terrain.sample(df['Latitude'], df['Longitude'])
+    assert np.allclose(df[HEIGHT_AGL_COLUMN], expected)
+    engine.combined_data[HEIGHT_AGL_COLUMN] = -1.0  # cached: not sampled again
+    assert (engine._prepare_3d_data()[HEIGHT_AGL_COLUMN] == -1.0).all()
+
+    fig = engine._create_3d_figure(df, 'static')
+    engine._add_static_3d_paths(fig, df)
+    assert fig.data[0].customdata[0][2].endswith('m')
+    print("✅ 1,000,000 points sampled")
+
+
+def test_terrain_from_data_and_decimation():
+    """Terrain bounds follow the fixes, resolution the vertex budget, flat areas lose grid lines"""
+    import tempfile
+    from utils.terrain_mesh import decimate_terrain_grid
+    print("Testing data-driven terrain...")
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = ElevationDataManager(cache_dir=tmp, dem_dirs=[])
+
+        def fetch(lats, lons, on_batch):
+            # Flat valley floor with one ridge along the east side
+            elevations = 600 + np.maximum(0, lons - 13.02) * 40000
+            on_batch(0, elevations)
+            return elevations
+
+        manager._fetch_elevations = fetch
+        engine = Animation3DEngine(manager)
+        lats = np.array([47.55, 47.57, 47.58])
+        lons = np.array([13.00, 13.02, 13.04])
+        assert engine.setup_terrain_for_data(lats, lons, vertex_budget=10_000, padding_km=1.0)
+        terrain = engine.current_elevation_data
+        bounds = terrain.bounds
+        assert bounds.lat_min < 47.55 and bounds.lat_max > 47.58 and bounds.lat_max - bounds.lat_min < 0.06
+        assert bounds.lon_min < 13.00 and bounds.lon_max > 13.04 and bounds.lon_max - bounds.lon_min < 0.08
+        # ~5 km wide: 90 m spacing caps the grid below the 100x100 budget
+        assert 20 <= terrain.resolution < 100
+
+        lons_kept, lats_kept, elevations = decimate_terrain_grid(
+            terrain.lons, terrain.lats, terrain.elevations, tolerance_m=5.0)
+        assert len(lats_kept) == 2 and len(lons_kept) < terrain.resolution / 2
+        rebuilt = ElevationData('decimated', lons_kept, lats_kept, elevations, 0, bounds, '')
+        lat_grid, lon_grid = np.meshgrid(terrain.lats, terrain.lons, indexing='ij')
+        error = rebuilt.sample(lat_grid.ravel(), lon_grid.ravel()) - terrain.elevations.ravel()
+        assert np.abs(error).max() <= 5.0
+    print(f"✅ {terrain.resolution}x{terrain.resolution} grid, {len(lons_kept)} columns after decimation")
+
+
+def test_terrain_quantized_encoding():
+    """The terrain surface is written as 1-D axes and int16 whole-meter heights"""
+    from utils.figure_encoding import encode_trace, quantize_elevations
+    print("Testing terrain encoding...")
+    engine = _make_engine(resolution=60)
+    engine.terrain_tolerance_m = 0
+    terrain = engine.current_elevation_data
+    fig = go.Figure()
+    engine._add_terrain_surface(fig)
+    encoded = encode_trace(fig.data[0].to_plotly_json())
+
+    assert encoded['z']['dtype'] == 'i2' and encoded['z']['shape'] == '60, 60'
+    z = np.frombuffer(base64.b64decode(encoded['z']['bdata']), dtype='<i2').reshape(60, 60)
+    assert np.abs(z - terrain.elevations).max() <= 0.5
+    assert np.asarray(fig.data[0].x).ndim == 1 and np.asarray(fig.data[0].y).ndim == 1
+    assert quantize_elevations([[1.0, np.nan]]).dtype == np.float64
+    assert quantize_elevations([[1.0, 40000.0]]).dtype == np.float64
+    print(f"✅ {len(encoded['z']['bdata']):,} base64 characters for {z.size:,} heights")
+
+
+if __name__ == "__main__":
+    test_frames_leave_terrain_static()
+    test_performance_mode_line_head()
+    test_height_above_ground()
+    test_terrain_from_data_and_decimation()
+    test_terrain_quantized_encoding()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for local DEM tiles (SRTM .hgt / GeoTIFF) and the elevation provider
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import struct
+import tempfile
+import numpy as np
+from core.data.dem_tiles import LocalDEM, open_hgt_tile, open_geotiff_tile, SRTM_VOID
+from core.data.elevation_data_manager import ElevationDataManager
+
+
+def _plane(lats, lons):
+    """Elevation that bilinear interpolation reproduces exactly"""
+    return 1000.0 + 2000.0 * (lats - 47.0) + 500.0 * (lons - 12.0)
+
+
+def _write_hgt(directory, name, size=121):
+    lat0, lon0 = int(name[1:3]), int(name[4:7])
+    lats = lat0 + 1.0 - np.arange(size) / (size - 1)
+    lons = lon0 + np.arange(size) / (size - 1)
+    grid = np.round(_plane(lats[:, None], lons[None, :])).astype('>i2')
+    grid.tofile(os.path.join(directory, f"{name}.hgt"))
+    return grid
+
+
+def _write_geotiff(path, data, lon_west, lat_north, step):
+    """Minimal little-endian, single-strip float32 GeoTIFF (PixelIsArea)"""
+    data = np.ascontiguousarray(data, dtype='<f4')
+    height, width = data.shape
+    entries = [
+        (256, 3, 1, width), (257, 3, 1, height), (258, 3, 1, 32), (259, 3, 1, 1),
+        (273, 4, 1, None), (277, 3, 1, 1), (279, 4, 1, data.nbytes), (339, 3, 1, 3),
+        (33550, 12, 3, None), (33922, 12, 6, None), (42113, 2, 6, None),
+    ]
+    extra = {
+        33550: struct.pack('<3d', step, step, 0.0),
+        33922: struct.pack('<6d', 0.0, 0.0, 0.0, lon_west, lat_north, 0.0),
+        42113: b'-9999\0',
+    }
+    ifd_size = 2 + 12 * len(entries) + 4
+    extra_offset = 8 + ifd_size
+    blob, offsets = b'', {}
+    for tag, payload in extra.items():
+        offsets[tag] = extra_offset + len(blob)
+        blob += payload
+    data_offset = extra_offset + len(blob)
+    ifd = struct.pack('<H', len(entries))
+    for tag, field_type, count, value in entries:
+        if tag == 273:
+            value = data_offset
+        if tag in offsets:
+            ifd += struct.pack('<HHII', tag, field_type, count, offsets[tag])
+        elif field_type == 3:
+            ifd += struct.pack('<HHIHH', tag, field_type, count, value, 0)
+        else:
+            ifd += struct.pack('<HHII', tag, field_type, count, value)
+    ifd += struct.pack('<I', 0)
+    with open(path, 'wb') as f:
+        f.write(b'II' + struct.pack('<HI', 42, 8) + ifd + blob + data.tobytes())
+
+
+def test_hgt_bilinear_sampling():
+    """.hgt tiles sample a plane exactly, across tile edges, and skip voids"""
+    print("Testing .hgt sampling...")
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_hgt(tmp, 'N47E012')
+        _write_hgt(tmp, 'N47E013')
+        tile = open_hgt_tile(os.path.join(tmp, 'N47E012.hgt'))
+        assert (tile.lat_south, tile.lat_north, tile.lon_west, tile.lon_east) == (47.0, 48.0, 12.0, 13.0)
+
+        dem = LocalDEM([tmp])
+        rng = np.random.default_rng(1)
+        lats = 47 + rng.random(500)
+        lons = 12 + 2 * rng.random(500)
+        assert np.allclose(dem.sample(lats, lons), _plane(lats, lons), atol=1.0)
+        assert np.isnan(dem.sample([46.5], [12.5])[0])
+
+        grid = dem.sample_grid(47.4, 47.75, 12.8, 13.25, 30)
+        assert grid.shape == (30, 30) and grid[0, 0] < grid[-1, 0]
+        assert dem.sample_grid(47.4, 48.5, 12.8, 13.25, 30) is None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        grid = _write_hgt(tmp, 'N47E012', size=11)
+        grid[5, 5] = SRTM_VOID
+        grid.tofile(os.path.join(tmp, 'N47E012.hgt'))
+        values = LocalDEM([tmp]).sample([47.47, 47.5], [12.53, 12.5])
+        assert np.isfinite(values).all()
+        assert abs(values[0] - _plane(47.47, 12.53)) < 100
+        assert abs(values[1] - _plane(47.5, 12.5)) < 250
+    print("✅ .hgt tiles sampled")
+
+
+def test_geotiff_and_manager_provider():
+    """GeoTIFF tiles are georeferenced from their tags and feed get_elevation_data"""
+    print("Testing GeoTIFF provider...")
+    step = 0.01
+    with tempfile.TemporaryDirectory() as tmp:
+        # PixelIsArea: pixel centers at half a step inside the tiepoint corner
+        lats = 48.0 - (np.arange(100) + 0.5) * step
+        lons = 12.5 + (np.arange(100) + 0.5) * step
+        data = _plane(lats[:, None], lons[None, :])
+        data[0, 0] = -9999
+        dem_dir = os.path.join(tmp, 'dem')
+        os.makedirs(dem_dir)
+        _write_geotiff(os.path.join(dem_dir, 'copernicus.tif'), data, 12.5, 48.0, step)
+        tile = open_geotiff_tile(os.path.join(dem_dir, 'copernicus.tif'))
+        assert np.isclose(tile.lon_west, 12.505) and np.isclose(tile.lat_north, 47.995)
+        assert tile.nodata == -9999
+
+        manager = ElevationDataManager(cache_dir=os.path.join(tmp, 'cache'), dem_dirs=[dem_dir])
+        terrain = manager.get_elevation_data('berchtesgaden_core', resolution=20)
+        assert terrain is not None and terrain.elevations.shape == (20, 20)
+        expected = _plane(terrain.lats[:, None], terrain.lons[None, :])
+        assert np.allclose(terrain.elevations, expected, atol=1e-3)
+        assert not os.listdir(os.path.join(tmp, 'cache'))
+    print("✅ GeoTIFF tiles sampled through the manager")
+
+
+if __name__ == "__main__":
+    test_hgt_bilinear_sampling()
+    test_geotiff_and_manager_provider()
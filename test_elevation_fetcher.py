@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the concurrent elevation fetcher against a local stand-in
+of the Open Elevation API
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from core.data.elevation_fetcher import ElevationFetcher, TokenBucket
+from core.data.elevation_tiles import ElevationTileCache
+
+
+def _plane(lats, lons):
+    return 1000.0 + 2000.0 * (lats - 47.0) + 500.0 * (lons - 12.0)
+
+
+class _ElevationServer:
+    """POST /api/v1/lookup on localhost with injectable failures"""
+
+    def __init__(self, max_points=None, fail_first=0, always_fail_above_lat=None):
+        self.max_points = max_points
+        self.fail_first = fail_first
+        self.always_fail_above_lat = always_fail_above_lat
+        self.batch_sizes = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                locations = body['locations']
+                with server.lock:
+                    server.batch_sizes.append(len(locations))
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    fail = server.fail_first > 0
+                    server.fail_first -= 1
+                try:
+                    threading.Event().wait(0.01)
+                    if server.max_points and len(locations) > server.max_points:
+                        self.send_response(413)
+                        self.end_headers()
+                        return
+                    if fail or (server.always_fail_above_lat is not None and
+                                locations[0]['latitude'] > server.always_fail_above_lat):
+                        self.send_response(503)
+                        self.end_headers()
+                        return
+                    results = [{'latitude': p['latitude'], 'longitude': p['longitude'],
+                                'elevation': _plane(p['latitude'], p['longitude'])} for p in locations]
+                    data = json.dumps({'results': results}).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/api/v1/lookup"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def test_concurrent_fetch_adapts_batch_size():
+    """Bulk POSTs run concurrently, retry transient errors and split rejected batches"""
+    print("Testing concurrent elevation fetch...")
+    rng = np.random.default_rng(3)
+    lats = 47.0 + rng.random(2000)
+    lons = 12.0 + rng.random(2000)
+    with _ElevationServer(max_points=300, fail_first=2) as server:
+        fetcher = ElevationFetcher(server.url, batch_size=1000, max_workers=4, rate=0, backoff=0.01)
+        batches = []
+        elevations = fetcher.fetch(lats, lons, on_batch=lambda start, values: batches.append((start, len(values))))
+
+    assert np.allclose(elevations, _plane(lats, lons))
+    assert fetcher.batch_size == 250 and fetcher.failed_points == 0
+    assert sorted(batches) == [(start, 250) for start in range(0, 2000, 250)]
+    assert 1 < server.max_in_flight <= 4
+    print(f"✅ {len(server.batch_sizes)} requests, up to {server.max_in_flight} concurrent")
+
+
+def test_failed_batches_resume_from_tile_cache():
+    """Tiles of failed batches stay uncached and only they are fetched again"""
+    print("Testing resumable tile download...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ElevationTileCache(tmp)
+        total = len(cache.tiles(47.52, 47.65, 12.94, 13.10, 50)[1])
+        with _ElevationServer(always_fail_above_lat=47.6) as server:
+            fetcher = ElevationFetcher(server.url, batch_size=1089, max_workers=2, rate=0,
+                                       max_retries=2, backoff=0.01)
+            grid = cache.get_grid(47.52, 47.65, 12.94, 13.10, 50, fetcher)
+        assert np.isnan(grid[-1]).all() and np.isfinite(grid[0]).all()
+        cached = len(list(cache.cache_dir.rglob('*.npy')))
+        assert 0 < cached < total
+
+        with _ElevationServer() as server:
+            fetcher = ElevationFetcher(server.url, batch_size=1089, max_workers=2, rate=0)
+            grid = cache.get_grid(47.52, 47.65, 12.94, 13.10, 50, fetcher)
+        assert np.isfinite(grid).all()
+        assert sum(server.batch_sizes) == (total - cached) * 1089
+    print(f"✅ Resumed with {cached} cached tiles")
+
+
+def test_token_bucket_rate():
+    """The token bucket allows a burst, then one request per 1/rate seconds"""
+    print("Testing token bucket...")
+    now = [0.0]
+    bucket = TokenBucket(rate=2, burst=3, clock=lambda: now[0],
+                         sleep=lambda seconds: now.__setitem__(0, now[0] + seconds))
+    for _ in range(7):
+        bucket.acquire()
+    assert abs(now[0] - 2.0) < 1e-9
+    print("✅ 7 requests in 2 s")
+
+
+if __name__ == "__main__":
+    test_concurrent_fetch_adapts_batch_size()
+    test_failed_batches_resume_from_tile_cache()
+    test_token_bucket_rate()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the tile-keyed elevation cache
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+import numpy as np
+from core.data.elevation_tiles import ElevationTileCache, TILE_SAMPLES
+from core.data.elevation_data_manager import ElevationDataManager
+
+
+def _plane(lats, lons):
+    return 1000.0 + 2000.0 * (lats - 47.0) + 500.0 * (lons - 12.0)
+
+
+class _CountingFetcher:
+    def __init__(self, fail_above_lat=None):
+        self.points = 0
+        self.fail_above_lat = fail_above_lat
+
+    def __call__(self, lats, lons, on_batch):
+        self.points += len(lats)
+        elevations = _plane(lats, lons)
+        if self.fail_above_lat is not None:
+            elevations[lats > self.fail_above_lat] = np.nan
+        on_batch(0, elevations)
+        return elevations
+
+
+def test_tiles_reused_across_regions():
+    """Overlapping bounds only fetch the tiles not cached yet"""
+    print("Testing tile reuse...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ElevationTileCache(tmp)
+        fetch = _CountingFetcher()
+        grid = cache.get_grid(47.52, 47.65, 12.94, 13.10, 50, fetch)
+        assert grid.shape == (50, 50)
+        lat_grid, lon_grid = np.meshgrid(np.linspace(47.52, 47.65, 50), np.linspace(12.94, 13.10, 50), indexing='ij')
+        assert np.allclose(grid, _plane(lat_grid, lon_grid), atol=0.01)
+        first = fetch.points
+        assert first > 0 and first % (TILE_SAMPLES * TILE_SAMPLES) == 0
+
+        cache.get_grid(47.53, 47.64, 12.95, 13.09, 50, fetch)
+        assert fetch.points == first
+        cache.get_grid(47.52, 47.65, 12.94, 13.30, 50, fetch)
+        assert first < fetch.points < 3 * first
+        assert cache.is_cached(47.52, 47.65, 12.94, 13.30, 50)
+        assert all(np.load(path, mmap_mode='r').dtype == np.float32 for path in cache.cache_dir.rglob('*.npy'))
+    print(f"✅ {first} points fetched once")
+
+
+def test_failed_tiles_not_cached():
+    """Tiles with unfetched points are retried, and the manager fills the default"""
+    print("Testing failed tile fetches...")
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = ElevationDataManager(cache_dir=tmp, dem_dirs=[])
+        fetch = _CountingFetcher(fail_above_lat=47.63)
+        manager._fetch_elevations = fetch
+        data = manager.get_elevation_data('berchtesgaden_core', resolution=20)
+        assert data is not None and np.isfinite(data.elevations).all()
+        assert (data.elevations[-1] == 1000).all() and data.elevations[0, 0] != 1000
+        assert not manager._is_region_cached(manager.PREDEFINED_REGIONS['berchtesgaden_core'], 20)
+
+        manager.loaded_regions.clear()
+        first = fetch.points
+        manager.get_elevation_data('berchtesgaden_core', resolution=20)
+        assert 0 < fetch.points - first < first
+    print("✅ Failed tiles retried")
+
+
+if __name__ == "__main__":
+    test_tiles_reused_across_regions()
+    test_failed_tiles_not_cached()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact figure encoding of HTML output
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import numpy as np
+import io
+import re
+from utils.figure_encoding import (
+    encode_array, encode_figure, figure_html, figure_json, write_figure_html, _decode_typed_array,
+    plotlyjs_typed_arrays,
+)
+
+
+def _make_figure():
+    rng = np.random.default_rng(7)
+    lat = 47 + rng.random(200)
+    lon = 13 + rng.random(200)
+    trace = {
+        'type': 'scattermap', 'lat': lat, 'lon': lon, 'mode': 'markers',
+        'marker': {'size': np.full(200, 8.0), 'color': ['#ff0000'] * 200},
+        'customdata': [[f'{i}</script>', i] for i in range(200)],
+    }
+    frame = {'name': 'f0', 'data': [dict(trace, lat=lat[:50], lon=lon[:50],
+                                         marker={'size': np.arange(50)})]}
+    return {'data': [trace], 'layout': {'title': {'text': 'Test'}}, 'frames': [frame]}, lat
+
+
+def test_coordinates_rounded():
+    """Coordinates round to the requested decimals, short arrays stay lists"""
+    print("Testing coordinate rounding...")
+    _, lat = _make_figure()
+    encoded = encode_array(lat, 6)
+    decoded = _decode_typed_array(encoded) if isinstance(encoded, dict) else np.asarray(encoded)
+    assert np.max(np.abs(decoded - lat)) <= 0.5e-6 + 1e-12
+    assert encode_array([47.123456789, 13.1], 6) == [47.123457, 13.1]
+    assert encode_array(['a', 'b'], 6) == ['a', 'b']
+    print("✅ coordinates within 0.5e-6 degrees")
+
+
+def test_encoded_figure_roundtrip():
+    """Encoded figure keeps its values and embeds safely in the page"""
+    print("Testing figure encoding...")
+    figure, lat = _make_figure()
+    encoded = encode_figure(figure)
+    trace = encoded['data'][0]
+    assert trace['marker']['color'] == '#ff0000'
+    assert trace['customdata'] == figure['data'][0]['customdata']
+    if plotlyjs_typed_arrays():
+        assert trace['lat']['dtype'] in ('f4', 'f8')
+        assert encoded['frames'][0]['data'][0]['marker']['size']['dtype'] == 'i1'
+
+    text = figure_json(encoded['data'])
+    assert '</script>' not in text
+    assert json.loads(text)[0]['customdata'][0][0] == '0</script>'
+
+    html = figure_html(figure)
+    assert '__GPS_FIGURE' not in html
+    assert 'addFrames' in html
+    print(f"✅ {len(html)} bytes of HTML")
+
+
+def test_streamed_batches():
+    """Frame batch size does not change the page, assets land before </body>"""
+    print("Testing streamed HTML...")
+    figure, _ = _make_figure()
+    figure['frames'] = figure['frames'] * 7
+    pages = []
+    for batch in (1, 3, 50):
+        buffer = io.StringIO()
+        write_figure_html(buffer, figure['data'], figure['layout'], figure['frames'],
+                          body_assets='<script>/*assets*/</script>', frame_batch=batch)
+        pages.append(re.sub(r'[0-9a-f]{8}(-[0-9a-f]{4}){3}-[0-9a-f]{12}', 'ID', buffer.getvalue()))
+    assert pages[0] == pages[1] == pages[2]
+    assert pages[0].index('/*assets*/') < pages[0].rindex('</body>')
+    assert pages[0].count('/*assets*/') == 1
+    print("✅ identical pages for every frame batch size")
+
+
+if __name__ == "__main__":
+    test_coordinates_rounded()
+    test_encoded_figure_roundtrip()
+    test_streamed_batches()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for proximity analysis progress reporting and cancellation
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from core.analysis.proximity_engine import ProximityEngine, AnalysisCancelledError
+
+
+def _make_engine(points_per_vulture=120):
+    """Create an engine with three vultures flying close together"""
+    timestamps = pd.date_range('2025-09-05 10:00:00', periods=points_per_vulture, freq='1min')
+    dataframes = []
+    for i in range(3):
+        dataframes.append(pd.DataFrame({
+            'Timestamp [UTC]': timestamps,
+            'Latitude': 47.5 + 0.001 * i,
+            'Longitude': 13.0 + 0.001 * i,
+            'vulture_id': f'VULTURE_{i+1:02d}',
+        }))
+    engine = ProximityEngine(proximity_threshold_km=2.0)
+    engine.load_dataframes(dataframes)
+    return engine
+
+
+def test_progress_reporting():
+    """Progress callback reaches 1.0 and reports every block"""
+    print("Testing proximity progress reporting...")
+    engine = _make_engine()
+    updates = []
+    events = engine.analyze_proximity(progress_callback=updates.append, block_size=50)
+
+    # 3 pairs x ceil(120 / 50) blocks
+    assert len(updates) == 9
+    assert updates[-1].fraction == 1.0
+    assert updates[-1].blocks_done == updates[-1].blocks_total
+    assert all(a.fraction <= b.fraction for a, b in zip(updates, updates[1:]))
+    assert updates[-1].eta_seconds == 0
+    assert len(events) == 3 * 120
+    print(f"✅ {len(updates)} progress updates, {len(events)} events")
+
+
+def test_cancellation():
+    """Setting the cancel token stops the analysis at the next block"""
+    print("Testing proximity cancellation...")
+    engine = _make_engine()
+    cancel_event = threading.Event()
+    updates = []
+
+    def on_progress(progress):
+        updates.append(progress)
+        if progress.blocks_done == 2:
+            cancel_event.set()
+
+    try:
+        engine.analyze_proximity(progress_callback=on_progress, cancel_token=cancel_event, block_size=50)
+        raise AssertionError("Analysis was not cancelled")
+    except AnalysisCancelledError as e:
+        print(f"✅ Cancelled: {e}")
+
+    assert len(updates) == 2
+
+
+def test_events_columns_timeline():
+    """Columnar events round-trip into the GUI timeline"""
+    print("Testing columnar event export...")
+    from core.analysis.proximity_worker import build_timeline_from_columns
+
+    engine = _make_engine(points_per_vulture=10)
+    events = engine.analyze_proximity()
+    columns = engine.get_events_columns()
+    timeline = build_timeline_from_columns(columns)
+
+    assert len(columns['timestamp_ns']) == len(events) == len(timeline)
+    assert columns['timestamp_ns'].dtype.kind == 'i'
+    assert timeline[0]['start'] == events[0].timestamp.to_pydatetime()
+    assert timeline[0]['pair'] == (events[0].vulture1, events[0].vulture2)
+    print(f"✅ {len(timeline)} timeline entries from columns")
+
+
+def test_stop_terminates_only_the_stopped_worker():
+    """A run started during the stop grace period keeps its worker"""
+    from types import SimpleNamespace
+    from gui.proximity.event_handlers import ProximityEventHandler
+    print("Testing delayed worker termination...")
+
+    class FakeProcess:
+        def __init__(self):
+            self.alive = True
+            self.joined = False
+
+        def is_alive(self):
+            return self.alive
+
+        def terminate(self):
+            self.alive = False
+
+        def join(self, timeout=None):
+            self.joined = True
+
+    timers = []
+    config = SimpleNamespace(
+        analysis_running=True, analysis_process=FakeProcess(), worker_queue=object(),
+        cancel_event=threading.Event(), translator=None, results={},
+        run_button=None, stop_button=None, status_var=SimpleNamespace(set=lambda text: None),
+        root=SimpleNamespace(after=lambda delay, callback: timers.append(callback)),
+    )
+    handler = ProximityEventHandler.__new__(ProximityEventHandler)
+    handler.config = config
+    handler.log = lambda message: None
+
+    old_process = config.analysis_process
+    handler.stop_analysis()
+    new_process = FakeProcess()
+    config.analysis_process = new_process  # new run before the timer fires
+    timers[0]()
+
+    assert not old_process.is_alive() and old_process.joined
+    assert new_process.is_alive() and config.analysis_process is new_process
+    print("✅ Only the stopped worker terminated")
+
+
+if __name__ == "__main__":
+    test_progress_reporting()
+    test_cancellation()
+    test_events_columns_timeline()
+    test_stop_terminates_only_the_stopped_worker()
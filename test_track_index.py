@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-vulture time index used by encounter extraction
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from core.analysis.track_index import TrackTimeIndex
+
+
+def _make_gps_data():
+    """Two interleaved vultures with unsorted rows"""
+    times = pd.date_range('2025-09-05 10:00:00', periods=60, freq='1min', tz='UTC')
+    frames = []
+    for i, vulture_id in enumerate(['B', 'A']):
+        frames.append(pd.DataFrame({
+            'timestamp': times,
+            'latitude': 47.5 + 0.01 * i + 0.0001 * pd.Series(range(60)),
+            'longitude': 13.0,
+            'vulture_id': vulture_id,
+        }))
+    return pd.concat(frames, ignore_index=True).sample(frac=1.0, random_state=1)
+
+
+def test_window_matches_mask():
+    """Binary-search windows equal the boolean-mask filter"""
+    print("Testing time index windows...")
+    gps_data = _make_gps_data()
+    index = TrackTimeIndex(gps_data)
+    start = pd.Timestamp('2025-09-05 10:10:00', tz='UTC')
+    end = pd.Timestamp('2025-09-05 10:20:00', tz='UTC')
+
+    for vulture_id in ['A', 'B']:
+        window = index.window(vulture_id, start, end)
+        mask = (gps_data['vulture_id'] == vulture_id) & (gps_data['timestamp'] >= start) & (gps_data['timestamp'] <= end)
+        expected = gps_data[mask].sort_values('timestamp')
+        assert len(window) == len(expected) == 11
+        assert list(window['Latitude']) == list(expected['latitude'])
+        assert window['Timestamp [UTC]'].is_monotonic_increasing
+        print(f"✅ {vulture_id}: {len(window)} fixes")
+
+    assert index.window('unknown', start, end).empty
+    assert sorted(index.vultures) == ['A', 'B']
+
+
+if __name__ == "__main__":
+    test_window_matches_mask()
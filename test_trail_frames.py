@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental trail frame building in TrailSystem
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from utils.user_interface import UserInterface
+from core.data.trail_system import TrailSystem
+from utils.animation_timeline import AnimationTimeline, add_timeline_columns
+from utils.animation_builders import (
+    fade_marker_styles, create_base_figure, attach_frames, build_frame_index, render_animation_html,
+    attach_animation, apply_controls_and_slider, write_animation_html,
+)
+from utils.playback_chunks import split_playback_payload, read_chunk_file
+from utils.parallel_frames import build_frames, split_frame_ranges
+from core.gps_utils import (
+    format_height_display, format_height_display_array,
+    format_velocity_display, format_velocity_display_array,
+)
+
+
+def _make_df(start):
+    rng = np.random.default_rng(3)
+    frames = []
+    for vulture_id in ['A', 'B']:
+        times = pd.date_range(start, periods=120, freq='5min', tz='UTC')
+        times = times[rng.random(len(times)) < 0.8]
+        frames.append(pd.DataFrame({
+            'Timestamp [UTC]': times,
+            'Latitude': 47 + rng.random(len(times)),
+            'Longitude': 13 + rng.random(len(times)),
+            'Height': rng.integers(500, 2000, len(times)),
+            'vulture_id': vulture_id,
+        }))
+    df = pd.concat(frames, ignore_index=True).sample(frac=1.0, random_state=1)
+    df['timestamp_str'] = df['Timestamp [UTC]'].dt.strftime('%d.%m.%Y %H:%M:%S')
+    df['timestamp_display'] = df['Timestamp [UTC]'].dt.strftime('%d.%m %H:%M')
+    return df
+
+
+def _expected_trail(df, vulture_id, time_str, trail_minutes):
+    """Reference trail: full boolean-mask filter on datetimes"""
+    data = df[df['vulture_id'] == vulture_id]
+    current = pd.to_datetime(time_str, format='%d.%m.%Y %H:%M:%S', utc=True)
+    mask = data['Timestamp [UTC]'] <= current
+    if trail_minutes is not None:
+        mask &= data['Timestamp [UTC]'] >= current - pd.Timedelta(minutes=trail_minutes)
+    return data[mask].sort_values('Timestamp [UTC]')['Latitude'].tolist()
+
+
+def test_trail_frames_match_mask_filter():
+    """Pointer-based trails equal the mask-based trails, in time order across a month boundary"""
+    print("Testing incremental trail frames...")
+    for start in ['2024-06-10 08:00', '2024-06-30 20:00']:
+        df = _make_df(start)
+        # Lexicographic order of day-first strings is wrong across months;
+        # frames must still come out chronologically
+        unique_times = sorted(df['timestamp_str'].unique())
+        expected_times = df.sort_values('Timestamp [UTC]')['timestamp_str'].drop_duplicates().tolist()
+        for trail_minutes in [None, 45]:
+            for strategy in ['markers_fade', 'line_head']:
+                trail_system = TrailSystem(UserInterface())
+                trail_system.trail_length_minutes = trail_minutes
+                frames = trail_system.create_frames_with_trail(
+                    df, ['A', 'B'], {'A': 'red', 'B': 'blue'}, unique_times, strategy=strategy)
+                assert [frame.name for frame in frames] == expected_times
+                for frame, time_str in zip(frames, expected_times):
+                    traces = [t for t in frame.data if not (t.name or '').endswith('(current)')]
+                    for trace, vulture_id in zip(traces, ['A', 'B']):
+                        assert list(trace.lat) == _expected_trail(df, vulture_id, time_str, trail_minutes)
+                print(f"✅ {start} trail={trail_minutes} {strategy}: {len(frames)} frames match")
+
+
+def test_timeline_labels_and_order():
+    """Epoch timeline formats frame names once and sorts them by time"""
+    print("Testing animation timeline...")
+    df = _make_df('2024-06-30 22:00')
+    add_timeline_columns(df)
+    timeline = AnimationTimeline.from_dataframe(df)
+    assert list(timeline) == sorted(set(timeline), key=lambda s: pd.to_datetime(s, format='%d.%m.%Y %H:%M:%S'))
+    assert list(timeline) == df.sort_values('Timestamp [UTC]')['timestamp_str'].drop_duplicates().tolist()
+    assert list(AnimationTimeline.from_labels(sorted(timeline))) == list(timeline)
+    assert (df['timestamp_ns'] == df['Timestamp [UTC]'].astype('datetime64[ns, UTC]').astype('int64')).all()
+    print(f"✅ {len(timeline)} frames from {timeline[0]} to {timeline[-1]}")
+
+
+def test_display_arrays_match_scalar_formatters():
+    """Vectorized hover strings equal the per-value formatters"""
+    print("Testing vectorized display formatting...")
+    values = [1, 2.25, np.nan, None, '12.34', 'abc', -0.0, 1e6, 0.05]
+    assert format_height_display_array(values) == [format_height_display(v) for v in values]
+    assert format_velocity_display_array(values) == [format_velocity_display(v) for v in values]
+    sizes, opacities = fade_marker_styles(4, min_size=3, size_range=3, head_size=12,
+                                          min_opacity=0.3, opacity_range=0.5)
+    assert sizes == [3.0, 4.0, 5.0, 12] and opacities[-1] == 1.0
+    print("✅ Display arrays match")
+
+
+def test_frame_index_ranges_match_frames():
+    """Index-referenced frames carry the same trails as materialized frames, in less HTML"""
+    print("Testing index-referenced frames...")
+    df = _make_df('2024-06-30 20:00')
+    add_timeline_columns(df)
+    color_map = {'A': 'red', 'B': 'blue'}
+    unique_times = AnimationTimeline.from_dataframe(df)
+    for strategy in ['markers_fade', 'line_head']:
+        frame_args = dict(df=df, vulture_ids=['A', 'B'], color_map=color_map,
+                          unique_times=unique_times, strategy=strategy)
+        trail_system = TrailSystem(UserInterface())
+        trail_system.trail_length_minutes = 45
+        full_fig = create_base_figure(['A', 'B'], color_map, strategy=strategy)
+        attach_frames(full_fig, trail_system=trail_system, **frame_args)
+
+        trail_system = TrailSystem(UserInterface())
+        trail_system.trail_length_minutes = 45
+        index = build_frame_index(trail_system=trail_system, **frame_args)
+        assert index['frame_names'] == [frame.name for frame in full_fig.frames]
+        ranges = index['ranges'].reshape(len(unique_times), 2, 2)
+        for frame, frame_ranges in zip(full_fig.frames, ranges):
+            traces = [t for t in frame.data if not (t.name or '').endswith('(current)')]
+            for trace, track, (start, end) in zip(traces, index['tracks'], frame_ranges):
+                assert list(trace.lat) == track['lat'][start:end].tolist()
+
+        full_html = render_animation_html(full_fig)
+        indexed_html = render_animation_html(create_base_figure(['A', 'B'], color_map, strategy=strategy),
+                                             client_output={'mode': 'indexed', 'payload': index})
+        assert 'gps-frame-index' in indexed_html
+        payload_bytes = len(indexed_html) - len(render_animation_html(
+            create_base_figure(['A', 'B'], color_map, strategy=strategy)))
+        frames_bytes = len(full_html) - len(render_animation_html(
+            create_base_figure(['A', 'B'], color_map, strategy=strategy)))
+        assert payload_bytes < frames_bytes / 2
+        print(f"✅ {strategy}: frames {frames_bytes:,} bytes -> indexed {payload_bytes:,} bytes")
+
+
+def test_playback_payload_cuts_same_trails():
+    """Client playback payload: fix times cut the same trails, controls drive the runtime"""
+    print("Testing client playback payload...")
+    df = _make_df('2024-06-30 20:00')
+    add_timeline_columns(df)
+    color_map = {'A': 'red', 'B': 'blue'}
+    unique_times = AnimationTimeline.from_dataframe(df)
+    trail_system = TrailSystem(UserInterface())
+    trail_system.trail_length_minutes = 45
+    frames = trail_system.create_frames_with_trail(df, ['A', 'B'], color_map, unique_times)
+
+    fig = create_base_figure(['A', 'B'], color_map)
+    output = attach_animation(fig, output_mode='player', frame_duration_ms=400, trail_system=trail_system,
+                              df=df, vulture_ids=['A', 'B'], color_map=color_map, unique_times=unique_times)
+    assert not fig.frames and output['mode'] == 'player'
+    payload = output['payload']
+    assert payload['trail_seconds'] == 45 * 60 and payload['frame_duration_ms'] == 400
+    for frame, t in zip(frames, payload['frame_times']):
+        for trace, track in zip(frame.data, payload['tracks']):
+            # Same bounds as the runtime: fixes up to t, from t - trail on
+            end = np.searchsorted(track['times'], t, side='right')
+            start = min(end, np.searchsorted(track['times'], t - payload['trail_seconds'], side='left'))
+            assert list(trace.lat) == track['lat'][start:end].tolist()
+
+    apply_controls_and_slider(fig, unique_times=unique_times, frame_duration_ms=400, center_lat=47,
+                              center_lon=13, zoom_level=8, client_playback=True,
+                              trail_options=trail_system.trail_length_choices(), trail_minutes=45)
+    steps = fig.layout.sliders[0].steps
+    assert all(step.method == 'skip' for step in steps) and steps[5].args[0] == {'action': 'seek', 'frame': 5}
+    actions = [b.args[0].get('action') for menu in fig.layout.updatemenus for b in menu.buttons
+               if b.method == 'skip']
+    assert actions[:3] == ['play', 'pause', 'restart'] and 'speed' in actions
+    assert '__GPS_PLAYER' in render_animation_html(fig, client_output=output)
+
+    # Trail length is switched in the browser: 0 seconds is the complete path
+    trail_menu = fig.layout.updatemenus[-1]
+    assert trail_system.trail_length_choices() == [None, 30, 45, 60, 120, 240, 360, 720, 1440]
+    assert trail_menu.type == 'dropdown' and trail_menu.active == 2
+    assert [b.args[0]['seconds'] for b in trail_menu.buttons][:3] == [0, 1800, 2700]
+    print(f"✅ {len(frames)} frame trails reproduced from {len(payload['tracks'])} tracks")
+
+
+def test_chunked_playback_files():
+    """Chunked output splits the tracks at chunk start times and writes them next to the HTML"""
+    import tempfile
+    print("Testing chunked playback export...")
+    df = _make_df('2024-06-30 20:00')
+    add_timeline_columns(df)
+    color_map = {'A': 'red', 'B': 'blue'}
+    trail_system = TrailSystem(UserInterface())
+    fig = create_base_figure(['A', 'B'], color_map)
+    output = attach_animation(fig, output_mode='chunked', chunk_frames=25, trail_system=trail_system,
+                              df=df, vulture_ids=['A', 'B'], color_map=color_map,
+                              unique_times=AnimationTimeline.from_dataframe(df))
+    payload = output['payload']
+    manifest, chunks = split_playback_payload(payload, chunk_frames=25)
+    assert manifest['chunks']['count'] == len(chunks) == -(-len(payload['frame_times']) // 25)
+    assert 'lat' not in manifest['tracks'][0] and 'templates' in manifest['tracks'][0]
+    for v, track in enumerate(payload['tracks']):
+        times = np.concatenate([chunk['tracks'][v]['times'] for chunk in chunks])
+        assert times.tolist() == track['times'].tolist()
+        for chunk, start in zip(chunks[1:], manifest['chunks']['starts'][1:]):
+            assert (chunk['tracks'][v]['times'] >= start).all()
+        assert sum((chunk['tracks'][v]['customdata'] for chunk in chunks), []) == track['customdata']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        html_path = os.path.join(tmp, 'anim.html')
+        write_animation_html(fig, html_path, client_output=output)
+        names = sorted(os.listdir(os.path.join(tmp, 'anim_chunks')))
+        assert len(names) == len(chunks)
+        index, data = read_chunk_file(os.path.join(tmp, 'anim_chunks', names[1]))
+        assert index == 1 and len(data['tracks']) == 2
+        with open(html_path, encoding='utf-8') as f:
+            assert 'anim_chunks' in f.read()
+    print(f"✅ {len(chunks)} chunks written")
+
+
+def test_parallel_frames_match_serial():
+    """Frames built in worker processes give the same figure JSON as the serial build"""
+    print("Testing parallel frame building...")
+    assert split_frame_ranges(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert split_frame_ranges(2, 8) == [(0, 1), (1, 2)]
+    df = _make_df('2024-06-30 20:00')
+    add_timeline_columns(df)
+    color_map = {'A': 'red', 'B': 'blue'}
+    unique_times = AnimationTimeline.from_dataframe(df)
+    trail_system = TrailSystem(UserInterface())
+    trail_system.trail_length_minutes = 45
+    frames = trail_system.create_frames_with_trail(df, ['A', 'B'], color_map, unique_times, max_workers=1)
+
+    from core.data import trail_system as trail_module
+    shared = {
+        'timeline': unique_times,
+        'trail_ns': trail_system._trail_ns(),
+        'tracks': trail_system._track_cursors(df, color_map, False),
+        'vulture_ids': ['A', 'B'],
+        'color_map': color_map,
+        'strategy': 'markers_fade',
+        'enable_precipitation_overlay': False,
+        'enable_prominent_time_display': True,
+    }
+    parallel = build_frames(trail_module._trail_frame_range, shared, len(unique_times), max_workers=2, min_frames=20)
+    assert all(isinstance(frame, dict) for frame in parallel)
+
+    serial_fig = create_base_figure(['A', 'B'], color_map)
+    serial_fig.frames = frames
+    parallel_fig = create_base_figure(['A', 'B'], color_map)
+    parallel_fig.frames = parallel
+    assert parallel_fig.to_json() == serial_fig.to_json()
+    print(f"✅ {len(parallel)} frames identical")
+
+
+def test_raw_frames_match_validated():
+    """Unvalidated frame dicts carry the same traces as validated frames and render to HTML"""
+    print("Testing raw frame dicts...")
+    df = _make_df('2024-06-30 20:00')
+    add_timeline_columns(df)
+    color_map = {'A': 'red', 'B': 'blue'}
+    unique_times = AnimationTimeline.from_dataframe(df)
+    for strategy in ['markers_fade', 'line_head']:
+        frame_args = dict(df=df, vulture_ids=['A', 'B'], color_map=color_map,
+                          unique_times=unique_times, strategy=strategy)
+        trail_system = TrailSystem(UserInterface())
+        trail_system.trail_length_minutes = 45
+        fig = create_base_figure(['A', 'B'], color_map, strategy=strategy)
+        attach_frames(fig, trail_system=trail_system, **frame_args)
+
+        raw_fig = create_base_figure(['A', 'B'], color_map, strategy=strategy)
+        output = attach_animation(raw_fig, validate_frames=False, trail_system=trail_system, **frame_args)
+        assert not raw_fig.frames and output['mode'] == 'frames'
+        raw = output['frames']
+        assert [frame['name'] for frame in raw] == [frame.name for frame in fig.frames]
+        for raw_frame, frame in zip(raw, fig.frames):
+            for raw_trace, trace in zip(raw_frame['data'], frame.data):
+                assert raw_trace['type'] == trace.type and raw_trace['name'] == trace.name
+                assert list(raw_trace['lat']) == list(trace.lat)
+                assert raw_trace.get('marker', {}).get('size') == (
+                    list(trace.marker.size) if isinstance(trace.marker.size, tuple) else trace.marker.size)
+        html = render_animation_html(raw_fig, client_output=output)
+        assert 'addFrames' in html and raw[-1]['name'] in html
+    print("✅ Raw frames match")
+
+
+def test_shared_assets_written_once():
+    """Shared asset mode references one plotly.js / runtime bundle per output folder"""
+    import shutil
+    import subprocess
+    import tempfile
+    from utils.shared_assets import SHARED_ASSETS_DIR
+    print("Testing shared HTML assets...")
+    df = _make_df('2024-06-30 20:00')
+    add_timeline_columns(df)
+    color_map = {'A': 'red', 'B': 'blue'}
+    trail_system = TrailSystem(UserInterface())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sizes = {}
+        for mode in ('indexed', 'player'):
+            fig = create_base_figure(['A', 'B'], color_map)
+            output = attach_animation(fig, output_mode=mode, trail_system=trail_system, df=df,
+                                      vulture_ids=['A', 'B'], color_map=color_map,
+                                      unique_times=AnimationTimeline.from_dataframe(df))
+            embedded_path = os.path.join(tmp, 'embedded', f'{mode}.html')
+            os.makedirs(os.path.dirname(embedded_path), exist_ok=True)
+            write_animation_html(fig, embedded_path, client_output=output, asset_mode='embedded')
+            shared_path = os.path.join(tmp, f'{mode}.html')
+            write_animation_html(fig, shared_path, client_output=output, asset_mode='shared')
+            with open(shared_path, encoding='utf-8') as f:
+                html = f.read()
+            assert f'src="{SHARED_ASSETS_DIR}/plotly-' in html and f'src="{SHARED_ASSETS_DIR}/gps-runtime.' in html
+            assert html.index('id="gps-') < html.index(f'src="{SHARED_ASSETS_DIR}/gps-runtime.') < html.rindex('</body>')
+            sizes[mode] = (os.path.getsize(shared_path), os.path.getsize(embedded_path))
+
+        names = sorted(os.listdir(os.path.join(tmp, SHARED_ASSETS_DIR)))
+        assert len(names) == 3 and not os.path.exists(os.path.join(tmp, 'embedded', SHARED_ASSETS_DIR))
+        # One syntax error in the shared runtime would break every page using it
+        node = shutil.which('node')
+        for name in names:
+            if node and name.startswith('gps-runtime.') and name.endswith('.js'):
+                check = subprocess.run([node, '--check', os.path.join(tmp, SHARED_ASSETS_DIR, name)],
+                                       capture_output=True, text=True)
+                assert check.returncode == 0, check.stderr
+        for shared_bytes, embedded_bytes in sizes.values():
+            assert embedded_bytes - shared_bytes > 1_000_000
+    print(f"✅ {len(names)} shared asset files, {sizes}")
+
+
+if __name__ == "__main__":
+    test_trail_frames_match_mask_filter()
+    test_timeline_labels_and_order()
+    test_display_arrays_match_scalar_formatters()
+    test_frame_index_ranges_match_frames()
+    test_playback_payload_cuts_same_trails()
+    test_chunked_playback_files()
+    test_parallel_frames_match_serial()
+    test_raw_frames_match_validated()
+    test_shared_assets_written_once()
@@ -7,17 +7,41 @@ Functions:
 - apply_standard_layout: sets map, size, margins, title, legend
 - apply_controls_and_slider: wires updatemenus and slider
 - attach_frames: applies TrailSystem frames to the figure with precipitation overlay
+- build_frame_index: index-referenced frame payload (tracks shipped once, frames as ranges)
+- build_playback_payload: track payload for the client-side playback runtime
+- attach_animation: frames or browser payload, depending on the output mode
+- stream_animation_html: figure to HTML with fullscreen support and the output mode's runtime,
+  streamed to an open file
+- render_animation_html: the same as a string
+- write_animation_html: stream the HTML to a file (plus the chunk folder of the "chunked" mode)
+- fade_marker_styles: per-point sizes/opacities of a fading trail
+- raw_trace / raw_frame: plain trace and frame dicts for frame building without per-object validation
 """
 
 from __future__ import annotations
 
-from typing import Dict, Sequence
+import io
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
 
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
 from .enhanced_timeline_labels import create_enhanced_slider_config
 from .animation_state_manager import create_reliable_animation_controls
+from .html_injection import fullscreen_assets, indexed_frames_assets, client_playback_assets, shared_runtime_assets
+from .playback_chunks import DEFAULT_CHUNK_FRAMES, export_playback_chunks
+from .figure_encoding import DEFAULT_COORDINATE_DECIMALS, compact_track_coordinates, write_figure_html
+from .shared_assets import SharedAssets, ensure_shared_assets, html_asset_mode
+
+# frames:  every Plotly frame embedded in the HTML (default)
+# indexed: tracks embedded once, frames rebuilt in the browser from row ranges
+# player:  tracks embedded once, played back client-side with interpolated heads (no frames)
+# chunked: like player, with the tracks in time-chunk files loaded around the playhead
+OUTPUT_MODES = ("frames", "indexed", "player", "chunked")
+CLIENT_PLAYBACK_MODES = ("player", "chunked")
 
 
 def build_color_map(vulture_ids: Sequence[str]) -> Dict[str, str]:
@@ -116,8 +140,17 @@ def apply_controls_and_slider(
     center_lon: float,
     zoom_level: int,
     include_speed_controls: bool = True,
+    client_playback: bool = False,
+    trail_options: Optional[Sequence[Optional[int]]] = None,
+    trail_minutes: Optional[int] = None,
 ) -> None:
-    """Wire updatemenus (play/pause/restart/fullscreen/recenter) and the timeline slider."""
+    """Wire updatemenus (play/pause/restart/fullscreen/recenter) and the timeline slider.
+
+    With client_playback the playback buttons and slider steps drive the
+    client playback runtime ("player" output mode) instead of Plotly frames,
+    and trail_options (minutes, None = complete path) adds a dropdown that
+    switches the trail length in the browser, starting at trail_minutes.
+    """
     fig.update_layout(
         **create_reliable_animation_controls(
             frame_duration=frame_duration_ms,
@@ -125,14 +158,18 @@ def apply_controls_and_slider(
             center_lat=center_lat,
             center_lon=center_lon,
             zoom_level=zoom_level,
+            client_playback=client_playback,
+            trail_options=list(trail_options) if trail_options else None,
+            trail_minutes=trail_minutes,
         ),
         sliders=[
             create_enhanced_slider_config(
-                list(unique_times),
+                unique_times,
                 position_y=0.02,
                 position_x=0.05,
                 length=0.9,
                 enable_prominent_display=True,
+                client_playback=client_playback,
             )
         ],
     )
@@ -149,15 +186,241 @@ def attach_frames(
     enable_prominent_time_display: bool = False,
     strategy: str = "markers_fade",
     enable_precipitation_overlay: bool = False,
-) -> None:
-    """Use the TrailSystem to generate and attach frames to the figure."""
+    max_workers: Optional[int] = None,
+    validate: bool = True,
+) -> Optional[List[dict]]:
+    """Use the TrailSystem to generate and attach frames to the figure.
+
+    Frames are built as plain dicts and validated once on assignment. With
+    validate=False the figure is left without frames and the frame dicts
+    are returned instead, for render_animation_html to write unvalidated
+    (see attach_animation). Long timelines are built in max_workers
+    processes (None: FRAME_WORKERS environment variable or CPU count,
+    1: serial), see utils.parallel_frames.
+    """
     frames = trail_system.create_frames_with_trail(
         df,
         list(vulture_ids),
         color_map,
-        list(unique_times),
+        unique_times,
         enable_prominent_time_display=enable_prominent_time_display,
         strategy=strategy,
         enable_precipitation_overlay=enable_precipitation_overlay,
+        max_workers=max_workers,
+        raw_frames=True,
     )
+    if not validate:
+        return frames
     fig.frames = frames
+    return None
+
+
+def build_frame_index(
+    *,
+    trail_system,
+    df,
+    vulture_ids: Sequence[str],
+    color_map: Dict[str, str],
+    unique_times: Sequence[str],
+    enable_prominent_time_display: bool = False,
+    strategy: str = "markers_fade",
+    enable_precipitation_overlay: bool = False,
+) -> Dict:
+    """Index-referenced counterpart of attach_frames; pass the result to render_animation_html."""
+    return trail_system.create_frame_index(
+        df,
+        list(vulture_ids),
+        color_map,
+        unique_times,
+        enable_prominent_time_display=enable_prominent_time_display,
+        strategy=strategy,
+        enable_precipitation_overlay=enable_precipitation_overlay,
+    )
+
+
+def build_playback_payload(
+    *,
+    trail_system,
+    df,
+    vulture_ids: Sequence[str],
+    color_map: Dict[str, str],
+    unique_times: Sequence[str],
+    strategy: str = "markers_fade",
+    enable_precipitation_overlay: bool = False,
+    frame_duration_ms: int = 800,
+    **_frame_options,
+) -> Dict:
+    """Track payload of the client playback runtime (frame-only options such as the prominent time display are ignored)."""
+    return trail_system.create_playback_payload(
+        df,
+        list(vulture_ids),
+        color_map,
+        unique_times,
+        strategy=strategy,
+        enable_precipitation_overlay=enable_precipitation_overlay,
+        frame_duration_ms=frame_duration_ms,
+    )
+
+
+def attach_animation(fig: go.Figure, *, output_mode: str = "frames", frame_duration_ms: int = 800,
+                     chunk_frames: int = DEFAULT_CHUNK_FRAMES, max_workers: Optional[int] = None,
+                     validate_frames: bool = True, **frame_args) -> Optional[Dict]:
+    """Attach frames to the figure or build the browser payload of the output mode.
+
+    frame_args are the keyword arguments of attach_frames; max_workers and
+    validate_frames only apply to the "frames" mode. Returns None when the
+    frames are attached to the figure, otherwise a dict for
+    write_animation_html: {"mode", "payload"} for the browser modes, or
+    {"mode": "frames", "frames"} with unvalidated frame dicts when
+    validate_frames is False (for figures that are only written to HTML).
+    """
+    if output_mode == "indexed":
+        return {"mode": output_mode, "payload": build_frame_index(**frame_args)}
+    if output_mode in CLIENT_PLAYBACK_MODES:
+        payload = build_playback_payload(frame_duration_ms=frame_duration_ms, **frame_args)
+        return {"mode": output_mode, "payload": payload, "chunk_frames": chunk_frames}
+    frames = attach_frames(fig, max_workers=max_workers, validate=validate_frames, **frame_args)
+    return None if frames is None else {"mode": "frames", "frames": frames}
+
+
+def stream_animation_html(fig: go.Figure, file: TextIO, config: Optional[dict] = None,
+                          client_output: Optional[Dict] = None,
+                          coordinate_decimals: Optional[int] = DEFAULT_COORDINATE_DECIMALS,
+                          compact: bool = True, shared_assets: Optional[SharedAssets] = None) -> None:
+    """Write the figure's HTML with fullscreen support to an open text file.
+
+    client_output is the result of attach_animation; for the "indexed" and
+    "player" modes the figure has no frames and the matching browser
+    runtime is embedded with the track payload. Unvalidated "frames" are
+    written into the figure JSON as they are.
+
+    The document is streamed (see utils.figure_encoding.write_figure_html):
+    frames are converted and serialized a batch at a time and the fullscreen
+    and runtime assets are written in the same pass. With compact (default)
+    numeric trace arrays are written as base64 typed arrays and coordinates
+    rounded to coordinate_decimals (None: full precision) and serialized
+    with orjson when installed; compact=False writes plain plotly JSON.
+
+    shared_assets (from utils.shared_assets.ensure_shared_assets) references
+    plotly.js and the runtime from the output folder's bundle instead of
+    embedding them.
+    """
+    frames = fig.frames
+    if client_output is not None and client_output["mode"] == "frames":
+        frames = client_output["frames"]
+    frame_index = playback = None
+    if client_output is not None and client_output["mode"] != "frames":
+        payload = client_output["payload"]
+        if compact:
+            payload = compact_track_coordinates(payload, coordinate_decimals)
+        if client_output["mode"] == "indexed":
+            frame_index = payload
+        elif client_output["mode"] == "chunked" and "chunks" not in payload:
+            raise ValueError("Chunked output needs its chunk files, use write_animation_html")
+        else:
+            playback = payload
+    if shared_assets is not None:
+        assets = shared_runtime_assets(shared_assets.runtime_css, shared_assets.runtime_js, frame_index, playback)
+        include_plotlyjs = shared_assets.plotly_js
+    else:
+        assets = fullscreen_assets()
+        if frame_index is not None:
+            assets += indexed_frames_assets(frame_index)
+        if playback is not None:
+            assets += client_playback_assets(playback)
+        include_plotlyjs = True
+    write_figure_html(file, fig.data, fig.layout, frames, config, assets, coordinate_decimals=coordinate_decimals,
+                      compact=compact, include_plotlyjs=include_plotlyjs)
+
+
+def render_animation_html(fig: go.Figure, config: Optional[dict] = None, client_output: Optional[Dict] = None,
+                          coordinate_decimals: Optional[int] = DEFAULT_COORDINATE_DECIMALS,
+                          compact: bool = True, shared_assets: Optional[SharedAssets] = None) -> str:
+    """Render the figure to an HTML string, see stream_animation_html."""
+    buffer = io.StringIO()
+    stream_animation_html(fig, buffer, config, client_output, coordinate_decimals, compact, shared_assets)
+    return buffer.getvalue()
+
+
+def write_animation_html(fig: go.Figure, output_path: str, config: Optional[dict] = None,
+                         client_output: Optional[Dict] = None,
+                         coordinate_decimals: Optional[int] = DEFAULT_COORDINATE_DECIMALS,
+                         compact: bool = True, asset_mode: Optional[str] = None) -> str:
+    """Stream the animation HTML to output_path.
+
+    For the "chunked" mode the track chunks are written to a folder next to
+    the HTML file (see utils.playback_chunks) and the HTML embeds only the
+    manifest. asset_mode "shared" (default: HTML_ASSET_MODE, else
+    "embedded") writes plotly.js and the runtime once into the folder's
+    gps_assets/ bundle and references them (see utils.shared_assets).
+    Returns output_path.
+    """
+    shared_assets = None
+    if html_asset_mode(asset_mode) == "shared":
+        shared_assets = ensure_shared_assets(os.path.dirname(os.path.abspath(output_path)))
+    if client_output is not None and client_output["mode"] == "chunked":
+        payload = client_output["payload"]
+        if compact:
+            payload = compact_track_coordinates(payload, coordinate_decimals)
+        manifest = export_playback_chunks(payload, output_path,
+                                          chunk_frames=client_output.get("chunk_frames", DEFAULT_CHUNK_FRAMES))
+        client_output = {**client_output, "payload": manifest}
+    with open(output_path, "w", encoding="utf-8") as f:
+        stream_animation_html(fig, f, config, client_output, coordinate_decimals, compact, shared_assets)
+    return output_path
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _fade_marker_styles(n: int, min_size: float, size_range: float, head_size: float,
+                        min_opacity: float, opacity_range: float) -> Tuple[tuple, tuple]:
+    age = np.arange(n - 1) / max(1, n - 1)
+    sizes = tuple((min_size + (size_range * age)).tolist()) + (head_size,)
+    opacities = tuple((min_opacity + (opacity_range * age)).tolist()) + (1.0,)
+    return sizes, opacities
+
+
+def fade_marker_styles(
+    n: int,
+    *,
+    min_size: float,
+    size_range: float,
+    head_size: float,
+    min_opacity: float,
+    opacity_range: float,
+) -> Tuple[List[float], List[float]]:
+    """Marker sizes and opacities for a fading trail of ``n`` points (oldest first).
+
+    Trail points grow from ``min_size`` by up to ``size_range`` and from
+    ``min_opacity`` by up to ``opacity_range`` with their age factor
+    ``i / (n - 1)``; the last point is the head (``head_size``, opacity 1.0).
+    Results only depend on ``n`` and are cached, so frames sharing a trail
+    length reuse the same values.
+    """
+    if n <= 0:
+        return [], []
+    sizes, opacities = _fade_marker_styles(n, min_size, size_range, head_size, min_opacity, opacity_range)
+    return list(sizes), list(opacities)
+
+
+def raw_trace(trace_type: str, **props) -> dict:
+    """Plain trace dict, the unvalidated equivalent of ``go.<Type>(**props).to_plotly_json()``.
+
+    Properties that are None are left out, as graph objects do; values
+    (numpy arrays included) are kept as given. Frames built from these are
+    validated once when assigned to ``fig.frames`` or written unvalidated
+    by render_animation_html.
+    """
+    trace = {key: value for key, value in props.items() if value is not None}
+    trace["type"] = trace_type
+    return trace
+
+
+def raw_frame(data: List[dict], name: str, layout: Optional[dict] = None,
+              traces: Optional[List[int]] = None) -> dict:
+    """Plain frame dict (see raw_trace); traces are the figure trace indices data updates"""
+    frame = {"data": data, "name": name}
+    if layout:
+        frame["layout"] = layout
+    if traces is not None:
+        frame["traces"] = traces
+    return frame
@@ -12,6 +12,25 @@ This module provides robust animation control that handles common issues:
 from typing import Dict, Any, Optional, List
 
 
+def client_playback_control(control: Dict[str, Any], action: str, **params) -> Dict[str, Any]:
+    """
+    Turn a button or slider step into a control of the client playback runtime
+
+    The control keeps its label and styling but uses Plotly's no-op 'skip'
+    method; the runtime (utils.html_injection.inject_client_playback) reads
+    the action from its args when the click/slider event fires.
+
+    Args:
+        control: Button or slider step configuration
+        action: Runtime action ('play', 'pause', 'restart', 'speed', 'seek', ...)
+        **params: Action parameters (e.g. speed=2.0, frame=10)
+
+    Returns:
+        Control configuration dict
+    """
+    return {**control, "method": "skip", "args": [{"action": action, **params}]}
+
+
 class AnimationStateManager:
     """Manages reliable animation state for Plotly visualizations"""
     
@@ -143,12 +162,14 @@ class AnimationStateManager:
     }
 
     
-    def create_speed_control_buttons(self, speeds: List[float] = None) -> List[Dict[str, Any]]:
+    def create_speed_control_buttons(self, speeds: List[float] = None,
+                                     client_playback: bool = False) -> List[Dict[str, Any]]:
         """
         Create speed control buttons for dynamic playback speed
         
         Args:
             speeds: List of speed multipliers (default: [1.0, 2.0, 3.0, 5.0, 10.0])
+            client_playback: Emit controls for the client playback runtime instead of animate calls
             
         Returns:
             List of speed control button configurations
@@ -178,9 +199,57 @@ class AnimationStateManager:
                 }],
                 "execute": True
             })
+            if client_playback:
+                speed_buttons[-1] = client_playback_control(speed_buttons[-1], "speed", speed=speed)
         
         return speed_buttons
     
+    @staticmethod
+    def _trail_length_label(minutes: Optional[int]) -> str:
+        """Short label of a trail length option"""
+        if minutes is None:
+            return "Full path"
+        if minutes < 60:
+            return f"{minutes} min"
+        return f"{minutes / 60:g} h"
+
+    def create_trail_length_menu(self, options: List[Optional[int]],
+                                 active_minutes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Create a dropdown that switches the trail length of the client playback runtime
+        
+        Args:
+            options: Trail lengths in minutes (None shows the complete flight path)
+            active_minutes: Trail length the animation starts with
+            
+        Returns:
+            Dropdown updatemenu configuration dict
+        """
+        buttons = [
+            client_playback_control(
+                {"label": f"🐾 Trail: {self._trail_length_label(minutes)}", "execute": True},
+                "trail",
+                seconds=minutes * 60 if minutes else 0,  # 0 = complete flight path
+            )
+            for minutes in options
+        ]
+        return {
+            "type": "dropdown",
+            "direction": "down",
+            "x": 0.98,
+            "y": 0.98,
+            "xanchor": "right",
+            "yanchor": "top",
+            "active": options.index(active_minutes) if active_minutes in options else 0,
+            "showactive": True,
+            "bgcolor": "rgba(255,255,255,0.95)",
+            "bordercolor": "rgba(0,0,0,0.3)",
+            "borderwidth": 1,
+            "font": {"size": 12, "color": "#333"},
+            "buttons": buttons,
+            "pad": {"t": 4, "b": 4, "l": 8, "r": 8}
+        }
+    
     def create_speed_control_slider(self, min_speed: float = 1.0, max_speed: float = 10.0, 
                                    step: float = 0.5, position_y: float = 0.25) -> Dict[str, Any]:
         """
@@ -257,7 +326,10 @@ class AnimationStateManager:
                                    frame_duration: Optional[int] = None,
                                    center_lat: Optional[float] = None,
                                    center_lon: Optional[float] = None,
-                                   zoom_level: Optional[int] = None) -> List[Dict[str, Any]]:
+                                   zoom_level: Optional[int] = None,
+                                   client_playback: bool = False,
+                                   trail_options: Optional[List[Optional[int]]] = None,
+                                   trail_minutes: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Create enhanced animation control menus with improved reliability
         
@@ -267,11 +339,24 @@ class AnimationStateManager:
             center_lat: Map center latitude for recenter button
             center_lon: Map center longitude for recenter button
             zoom_level: Map zoom level for recenter button
+            client_playback: Emit controls for the client playback runtime instead of animate calls
+            trail_options: Trail lengths in minutes for a trail dropdown (client playback only)
+            trail_minutes: Trail length the animation starts with
             
         Returns:
             List of updatemenu configurations
         """
         duration = frame_duration or self.frame_duration
+        playback_buttons = [
+            self.create_robust_play_button(duration),
+            self.create_robust_pause_button(),
+            self.create_robust_restart_button(duration),
+        ]
+        if client_playback:
+            playback_buttons = [
+                client_playback_control(button, action)
+                for button, action in zip(playback_buttons, ["play", "pause", "restart"])
+            ]
         
         # Main playback controls (centered, bottom position)
         main_controls = {
@@ -286,10 +371,7 @@ class AnimationStateManager:
             "bordercolor": "rgba(0,0,0,0.3)",
             "borderwidth": 2,
             "font": {"size": 14, "color": "#333"},
-            "buttons": [
-                self.create_robust_play_button(duration),
-                self.create_robust_pause_button(),
-                self.create_robust_restart_button(duration),
+            "buttons": playback_buttons + [
                 self.create_fullscreen_button()
             ] + ([self.create_recenter_button(center_lat, center_lon, zoom_level)] 
                  if all(x is not None for x in [center_lat, center_lon, zoom_level]) else []),
@@ -313,12 +395,16 @@ class AnimationStateManager:
                 "bordercolor": "rgba(0,0,0,0.2)",
                 "borderwidth": 1,
                 "font": {"size": 11, "color": "#666"},
-                "buttons": self.create_speed_control_buttons(),
+                "buttons": self.create_speed_control_buttons(client_playback=client_playback),
                 # Compact padding to keep buttons tight
                 "pad": {"t": 4, "b": 4, "l": 8, "r": 8}
             }
             updatemenus.append(speed_controls)
         
+        # Trail length is a runtime parameter of the client playback, frames have it baked in
+        if client_playback and trail_options:
+            updatemenus.append(self.create_trail_length_menu(trail_options, trail_minutes))
+        
         return updatemenus
     
     def create_robust_slider_step(self, frame_index: int, 
@@ -408,7 +494,10 @@ def create_reliable_animation_controls(frame_duration: int = 500,
                                      include_speed_controls: bool = True,
                                      center_lat: Optional[float] = None,
                                      center_lon: Optional[float] = None,
-                                     zoom_level: Optional[int] = None) -> Dict[str, Any]:
+                                     zoom_level: Optional[int] = None,
+                                     client_playback: bool = False,
+                                     trail_options: Optional[List[Optional[int]]] = None,
+                                     trail_minutes: Optional[int] = None) -> Dict[str, Any]:
     """
     Factory function to create reliable animation controls
     
@@ -418,6 +507,9 @@ def create_reliable_animation_controls(frame_duration: int = 500,
         center_lat: Map center latitude for recenter button
         center_lon: Map center longitude for recenter button
         zoom_level: Map zoom level for recenter button
+        client_playback: Emit controls for the client playback runtime instead of animate calls
+        trail_options: Trail lengths in minutes for a trail dropdown (client playback only)
+        trail_minutes: Trail length the animation starts with
         
     Returns:
         Dictionary containing updatemenus configuration
@@ -429,6 +521,9 @@ def create_reliable_animation_controls(frame_duration: int = 500,
             frame_duration=frame_duration,
             center_lat=center_lat,
             center_lon=center_lon,
-            zoom_level=zoom_level
+            zoom_level=zoom_level,
+            client_playback=client_playback,
+            trail_options=trail_options,
+            trail_minutes=trail_minutes,
         )
     }
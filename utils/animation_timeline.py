@@ -0,0 +1,130 @@
+"""
+Animation Timeline
+
+Integer epoch timeline for the animation pipeline.
+
+Frames are identified by int64 epoch nanoseconds (UTC, whole seconds). The
+'%d.%m.%Y %H:%M:%S' strings used as Plotly frame names and slider labels are
+formatted once, in a vectorized pass, from the sorted integer keys. Ordering
+and trail window comparisons are done on the integers, so frames sort
+chronologically (day-first strings do not sort correctly across month
+boundaries) and no frame time has to be parsed back from its label.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+FRAME_TIME_FORMAT = '%d.%m.%Y %H:%M:%S'
+DISPLAY_TIME_FORMAT = '%d.%m %H:%M'
+
+NS_PER_SECOND = 1_000_000_000
+
+
+def to_epoch_ns(values) -> np.ndarray:
+    """
+    Convert timestamps to int64 nanoseconds since the epoch (UTC)
+
+    Naive timestamps are treated as UTC, tz-aware ones are converted to UTC.
+
+    Args:
+        values: Sequence, Series or single timestamp-like value
+
+    Returns:
+        numpy int64 array
+    """
+    if np.isscalar(values) or isinstance(values, (pd.Timestamp, np.datetime64)):
+        values = [values]
+    index = pd.DatetimeIndex(values)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.to_numpy(dtype='datetime64[ns]').view('int64')
+
+
+def frame_keys(times_ns: np.ndarray) -> np.ndarray:
+    """Frame key of each timestamp: epoch nanoseconds floored to whole seconds"""
+    return times_ns - np.mod(times_ns, NS_PER_SECOND)
+
+
+def format_epoch_ns(times_ns: np.ndarray, fmt: str = FRAME_TIME_FORMAT) -> List[str]:
+    """Format epoch nanoseconds (UTC) with a strftime pattern in one pass"""
+    return pd.DatetimeIndex(np.asarray(times_ns, dtype='int64').view('datetime64[ns]')).strftime(fmt).tolist()
+
+
+def add_timeline_columns(df: pd.DataFrame, time_col: str = 'Timestamp [UTC]') -> pd.DataFrame:
+    """
+    Add the timeline columns used by the animation engines (in place)
+
+    - 'timestamp_ns': int64 epoch nanoseconds (UTC)
+    - 'timestamp_str': frame name of the fix ('%d.%m.%Y %H:%M:%S')
+    - 'timestamp_display': short hover label ('%d.%m %H:%M')
+
+    The strings are formatted once per distinct second, not per row.
+
+    Returns:
+        The same DataFrame, for chaining
+    """
+    times_ns = to_epoch_ns(df[time_col])
+    keys = frame_keys(times_ns)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    df['timestamp_ns'] = times_ns
+    df['timestamp_str'] = np.asarray(format_epoch_ns(unique_keys, FRAME_TIME_FORMAT), dtype=object)[inverse]
+    df['timestamp_display'] = np.asarray(format_epoch_ns(unique_keys, DISPLAY_TIME_FORMAT), dtype=object)[inverse]
+    return df
+
+
+class AnimationTimeline(Sequence):
+    """
+    Chronologically sorted frame times
+
+    Behaves as a sequence of frame names (the '%d.%m.%Y %H:%M:%S' strings),
+    so it can be passed wherever a list of frame names is expected, and
+    carries the matching int64 keys in ``times_ns``.
+    """
+
+    def __init__(self, times_ns: np.ndarray, labels: Sequence[str] = None):
+        self.times_ns = np.asarray(times_ns, dtype='int64')
+        self.labels = list(labels) if labels is not None else format_epoch_ns(self.times_ns)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, time_col: str = 'Timestamp [UTC]') -> 'AnimationTimeline':
+        """Timeline of the distinct fix seconds in ``df``"""
+        if 'timestamp_ns' in df.columns:
+            times_ns = df['timestamp_ns'].to_numpy(dtype='int64')
+        else:
+            times_ns = to_epoch_ns(df[time_col])
+        return cls(np.unique(frame_keys(times_ns)))
+
+    @classmethod
+    def from_labels(cls, labels: Sequence[str]) -> 'AnimationTimeline':
+        """Timeline from frame names, parsed in one vectorized pass and sorted by time"""
+        parsed = to_epoch_ns(pd.to_datetime(pd.Index(list(labels), dtype=object), format=FRAME_TIME_FORMAT))
+        order = np.argsort(parsed, kind='stable')
+        return cls(parsed[order], [labels[i] for i in order])
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.labels)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return AnimationTimeline(self.times_ns[i], self.labels[i])
+        return self.labels[i]
+
+    def __repr__(self) -> str:
+        if not self.labels:
+            return "AnimationTimeline([])"
+        return f"AnimationTimeline({len(self)} frames, {self.labels[0]} .. {self.labels[-1]})"
+
+
+def as_timeline(unique_times: Union[AnimationTimeline, Sequence[str]]) -> AnimationTimeline:
+    """Return ``unique_times`` as an AnimationTimeline (parsing frame names if needed)"""
+    if isinstance(unique_times, AnimationTimeline):
+        return unique_times
+    return AnimationTimeline.from_labels(list(unique_times))
@@ -7,7 +7,10 @@ time frames (minutes, hours, days, weeks) with two-line display for better clari
 """
 
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Union
+
+from .animation_timeline import NS_PER_SECOND, AnimationTimeline, as_timeline
+from .animation_state_manager import client_playback_control
 
 
 class TimelineLabelSystem:
@@ -16,25 +19,22 @@ class TimelineLabelSystem:
     def __init__(self):
         self.timezone_offset = 0  # Can be configured for local time display
     
-    def analyze_time_span(self, unique_times: List[str]) -> Dict:
+    def analyze_time_span(self, unique_times: Union[AnimationTimeline, List[str]]) -> Dict:
         """
         Analyze the time span to determine optimal labeling strategy
         
         Args:
-            unique_times: List of time strings in format '%d.%m.%Y %H:%M:%S'
+            unique_times: AnimationTimeline or list of time strings in format '%d.%m.%Y %H:%M:%S'
             
         Returns:
             Dict with time span analysis and labeling recommendations
         """
-        if not unique_times or len(unique_times) < 2:
+        if unique_times is None or len(unique_times) < 2:
             return {'strategy': 'single_point', 'total_duration': 0}
         
-        # Convert to datetime objects
-        times = [pd.to_datetime(time_str, format='%d.%m.%Y %H:%M:%S') for time_str in unique_times]
-        times.sort()
-        
-        start_time = times[0]
-        end_time = times[-1]
+        timeline = as_timeline(unique_times)
+        start_time = pd.Timestamp(int(timeline.times_ns.min()))
+        end_time = pd.Timestamp(int(timeline.times_ns.max()))
         total_duration = (end_time - start_time).total_seconds()
         
         # Determine strategy based on duration
@@ -76,33 +76,40 @@ class TimelineLabelSystem:
             'frame_count': len(unique_times)
         }
     
-    def create_enhanced_slider_labels(self, unique_times: List[str]) -> List[Dict]:
+    def create_enhanced_slider_labels(self, unique_times: Union[AnimationTimeline, List[str]]) -> List[Dict]:
         """
         Create enhanced two-line labels for animation slider
         
         Args:
-            unique_times: List of time strings in format '%d.%m.%Y %H:%M:%S'
+            unique_times: AnimationTimeline or list of time strings in format '%d.%m.%Y %H:%M:%S'
             
         Returns:
-            List of enhanced label dictionaries for Plotly slider
+            List of enhanced label dictionaries for Plotly slider, in chronological order
         """
-        analysis = self.analyze_time_span(unique_times)
+        timeline = as_timeline(unique_times)
+        analysis = self.analyze_time_span(timeline)
         
         if analysis['strategy'] == 'single_point':
-            return self._create_single_point_labels(unique_times)
-        
-        strategy = analysis['strategy']
-        
-        if strategy == 'minutes':
-            return self._create_minute_labels(unique_times, analysis)
-        elif strategy == 'hours':
-            return self._create_hour_labels(unique_times, analysis)
-        elif strategy == 'days':
-            return self._create_day_labels(unique_times, analysis)
-        elif strategy == 'weeks':
-            return self._create_week_labels(unique_times, analysis)
+            labels = self._elegant_labels(timeline)
+        elif analysis['strategy'] in ('minutes', 'hours'):
+            labels = self._elegant_labels(timeline)
+        elif analysis['strategy'] == 'days':
+            labels = self._day_labels(timeline, analysis)
+        elif analysis['strategy'] == 'weeks':
+            labels = self._week_labels(timeline, analysis)
         else:
-            return self._create_fallback_labels(unique_times)
+            labels = self._fallback_labels(timeline)
+        
+        return [{
+            'args': [[time_str], dict(mode="immediate", transition=dict(duration=300))],
+            'label': label,
+            'method': 'animate'
+        } for time_str, label in zip(timeline.labels, labels)]
+    
+    @staticmethod
+    def _datetime_index(timeline: AnimationTimeline) -> pd.DatetimeIndex:
+        """Naive UTC datetimes of the timeline frames"""
+        return pd.DatetimeIndex(timeline.times_ns.view('datetime64[ns]'))
     
     def _format_elegant_time(self, time_str: str) -> str:
         """
@@ -115,124 +122,47 @@ class TimelineLabelSystem:
             Elegant formatted time string
         """
         try:
-            time_obj = pd.to_datetime(time_str, format='%d.%m.%Y %H:%M:%S')
-            # Format: "15:30 • 4 Sep" (time • short date)
-            time_part = time_obj.strftime('%H:%M')
-            date_part = time_obj.strftime('%-d %b')  # Remove leading zero from day
-            return f"{time_part} • {date_part}"
+            return self._elegant_labels(AnimationTimeline.from_labels([time_str]))[0]
         except Exception:
             # Fallback to original format if parsing fails
             return time_str
     
-    def _create_single_point_labels(self, unique_times: List[str]) -> List[Dict]:
-        """Create labels for single time point"""
-        return [{
-            'args': [[time_str], dict(mode="immediate", transition=dict(duration=300))],
-            'label': self._format_elegant_time(time_str),
-            'method': 'animate'
-        } for time_str in unique_times]
+    def _elegant_labels(self, timeline: AnimationTimeline) -> List[str]:
+        """Labels like "15:30 • 4 Sep" (time • short date) for minute/hour scale animations"""
+        times = self._datetime_index(timeline)
+        labels = times.strftime('%H:%M') + ' • ' + times.day.astype(str) + ' ' + times.strftime('%b')
+        return labels.tolist()
     
-    def _create_minute_labels(self, unique_times: List[str], analysis: Dict) -> List[Dict]:
-        """Create labels for minute-scale animations with elegant formatting"""
-        labels = []
-        
-        for time_str in unique_times:
-            labels.append({
-                'args': [[time_str], dict(mode="immediate", transition=dict(duration=300))],
-                'label': self._format_elegant_time(time_str),
-                'method': 'animate'
-            })
-        
-        return labels
-    
-    def _create_hour_labels(self, unique_times: List[str], analysis: Dict) -> List[Dict]:
-        """Create labels for hour-scale animations with elegant formatting"""
-        labels = []
-        
-        for time_str in unique_times:
-            labels.append({
-                'args': [[time_str], dict(mode="immediate", transition=dict(duration=300))],
-                'label': self._format_elegant_time(time_str),
-                'method': 'animate'
-            })
+    def _day_labels(self, timeline: AnimationTimeline, analysis: Dict) -> List[str]:
+        """Two-line labels for day-scale animations: date, then time or weekday"""
+        times = self._datetime_index(timeline)
+        date_labels = times.strftime('%d.%m')
         
-        return labels
-    
-    def _create_day_labels(self, unique_times: List[str], analysis: Dict) -> List[Dict]:
-        """Create labels for day-scale animations"""
-        labels = []
-        times = [pd.to_datetime(time_str, format='%d.%m.%Y %H:%M:%S') for time_str in unique_times]
-        start_time = analysis['start_time']
-        
-        for i, (time_str, time_obj) in enumerate(zip(unique_times, times)):
-            elapsed_days = (time_obj - start_time).total_seconds() / 86400
-            
-            # First line: date, second line: time or day name
-            date_label = time_obj.strftime('%d.%m')
-            
-            if analysis['total_days'] <= 7:
-                time_label = time_obj.strftime('%H:%M')
-            else:
-                time_label = time_obj.strftime('%a')  # Weekday name
-                if elapsed_days >= 7:
-                    time_label += f" (Week {elapsed_days/7:.0f})"
-            
-            # Show major marks more prominently  
-            if time_obj.day % analysis['major_step'] == 0 or i == 0 or i == len(unique_times) - 1:
-                label = f"{date_label}\n{time_label}"  # Two lines, no HTML
-            else:
-                label = f"{date_label}\n{time_label}"  # Consistent formatting
-            
-            labels.append({
-                'args': [[time_str], dict(mode="immediate", transition=dict(duration=300))],
-                'label': label,
-                'method': 'animate'
-            })
+        if analysis['total_days'] <= 7:
+            time_labels = times.strftime('%H:%M').tolist()
+        else:
+            elapsed_days = (timeline.times_ns - timeline.times_ns.min()) / (86400 * NS_PER_SECOND)
+            time_labels = [
+                f"{weekday} (Week {elapsed / 7:.0f})" if elapsed >= 7 else weekday
+                for weekday, elapsed in zip(times.strftime('%a'), elapsed_days)
+            ]
         
-        return labels
+        return [f"{date_label}\n{time_label}" for date_label, time_label in zip(date_labels, time_labels)]
     
-    def _create_week_labels(self, unique_times: List[str], analysis: Dict) -> List[Dict]:
-        """Create labels for week-scale animations"""
-        labels = []
-        times = [pd.to_datetime(time_str, format='%d.%m.%Y %H:%M:%S') for time_str in unique_times]
-        start_time = analysis['start_time']
+    def _week_labels(self, timeline: AnimationTimeline, analysis: Dict) -> List[str]:
+        """Two-line labels for week-scale animations: week number, then date"""
+        times = self._datetime_index(timeline)
+        elapsed_weeks = (timeline.times_ns - timeline.times_ns.min()) / (86400 * 7 * NS_PER_SECOND)
         
-        for i, (time_str, time_obj) in enumerate(zip(unique_times, times)):
-            elapsed_weeks = (time_obj - start_time).total_seconds() / (86400 * 7)
-            
-            # First line: week info, second line: date
-            week_info = f"Week {elapsed_weeks:.0f}" if elapsed_weeks >= 1 else "Week 1"
-            date_label = time_obj.strftime('%d.%m.%Y')
-            
-            # Show major marks more prominently
-            if int(elapsed_weeks) % analysis['major_step'] == 0 or i == 0 or i == len(unique_times) - 1:
-                label = f"{week_info}\n{date_label}"  # Two lines, no HTML
-            else:
-                label = f"{week_info}\n{date_label}"  # Consistent formatting
-            
-            labels.append({
-                'args': [[time_str], dict(mode="immediate", transition=dict(duration=300))],
-                'label': label,
-                'method': 'animate'
-            })
-        
-        return labels
-    
-    def _create_fallback_labels(self, unique_times: List[str]) -> List[Dict]:
-        """Create fallback labels for edge cases"""
-        return [{
-            'args': [[time_str], dict(mode="immediate", transition=dict(duration=300))],
-            'label': self._format_single_time(time_str),
-            'method': 'animate'
-        } for time_str in unique_times]
+        return [
+            f"{f'Week {elapsed:.0f}' if elapsed >= 1 else 'Week 1'}\n{date_label}"
+            for elapsed, date_label in zip(elapsed_weeks, times.strftime('%d.%m.%Y'))
+        ]
     
-    def _format_single_time(self, time_str: str) -> str:
-        """Format a single time for display"""
-        try:
-            time_obj = pd.to_datetime(time_str, format='%d.%m.%Y %H:%M:%S')
-            return f"{time_obj.strftime('%H:%M')}\n{time_obj.strftime('%d.%m.%Y')}"  # No HTML
-        except Exception:
-            return time_str
+    def _fallback_labels(self, timeline: AnimationTimeline) -> List[str]:
+        """Fallback labels for edge cases: time, then full date"""
+        times = self._datetime_index(timeline)
+        return (times.strftime('%H:%M') + '\n' + times.strftime('%d.%m.%Y')).tolist()
     
     def get_time_span_summary(self, unique_times: List[str]) -> str:
         """
@@ -270,20 +200,22 @@ class TimelineLabelSystem:
         return f"Animation spans {len(unique_times)} time points"
 
 
-def create_enhanced_slider_config(unique_times: List[str], 
+def create_enhanced_slider_config(unique_times: Union[AnimationTimeline, List[str]], 
                                  position_y: float = 0.02, 
                                  position_x: float = 0.1, 
                                  length: float = 0.8,
-                                 enable_prominent_display: bool = False) -> Dict:
+                                 enable_prominent_display: bool = False,
+                                 client_playback: bool = False) -> Dict:
     """
     Create enhanced slider configuration for Plotly animations
     
     Args:
-        unique_times: List of time strings in format '%d.%m.%Y %H:%M:%S'
+        unique_times: AnimationTimeline or list of time strings in format '%d.%m.%Y %H:%M:%S'
         position_y: Y position of slider (0-1)
         position_x: X position of slider (0-1)
         length: Length of slider (0-1)
         enable_prominent_display: Whether to enable prominent date/time display
+        client_playback: Steps seek the client playback runtime instead of animating to a frame
         
     Returns:
         Enhanced slider configuration dict for Plotly
@@ -308,6 +240,8 @@ def create_enhanced_slider_config(unique_times: List[str],
             'execute': True,  # Ensure step execution
             'value': idx      # Track position so play can resume correctly
         }
+        if client_playback:
+            improved_step = client_playback_control(improved_step, 'seek', frame=idx)
         improved_steps.append(improved_step)
     
     # Enhanced current value display with prominent styling
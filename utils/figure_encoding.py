@@ -0,0 +1,384 @@
+"""
+Figure Encoding
+
+Compact JSON encoding of figures written to HTML.
+
+Numeric trace arrays (in ``data`` and in every frame) are written as base64
+typed arrays that plotly.js decodes itself (``{'dtype': 'f8', 'bdata': ...}``)
+instead of decimal lists:
+
+- Map coordinates (lat/lon, x/y of 3D traces) are rounded to
+  ``coordinate_decimals`` (6 decimals: about 0.1 m) and stored as float32
+  when that keeps them within the same precision, otherwise as float64.
+- Other float arrays (marker sizes, opacities, heights) are stored as
+  float32 when that keeps about 7 significant digits (FLOAT32_RTOL).
+- Integer arrays use the smallest integer type that holds them.
+- Per-point marker colors that are all the same become a single color.
+- Terrain elevations go through quantize_elevations before they are put in
+  the figure: whole meters as int16 (2 bytes per vertex).
+
+Arrays shorter than MIN_TYPED_ARRAY_LENGTH stay lists (with rounded
+coordinates), as the typed array wrapper would cost more than it saves.
+Layout, strings and mixed arrays such as hover customdata are unchanged.
+plotly.js decodes typed arrays from version 2.28 on (plotly 5.19); with an
+older bundled plotly.js the arrays are written as rounded lists instead.
+
+write_figure_html streams a page from plotly's HTML template to a file: the
+traces and frames are encoded and serialized a batch of frames at a time,
+with orjson when it is installed, so the whole document is never held in
+memory. plotly's own serializer escapes every "/" (frequent in base64) as a
+6 character sequence; figure_json only escapes what could end the inline
+script. figure_html is the string counterpart.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterable, Optional, Sequence, TextIO
+
+import numpy as np
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+
+try:
+    import orjson
+except ImportError:  # Optional: plotly's serializer is used without it
+    orjson = None
+
+
+DEFAULT_COORDINATE_DECIMALS = 6
+MIN_TYPED_ARRAY_LENGTH = 8
+FRAME_BATCH = 50
+FLOAT32_RTOL = 1e-6
+
+# Trace properties holding geographic coordinates, by trace type
+_COORDINATE_KEYS = {
+    'scattermap': ('lat', 'lon'),
+    'scattermapbox': ('lat', 'lon'),
+    'scattergeo': ('lat', 'lon'),
+    'densitymap': ('lat', 'lon'),
+    'scatter3d': ('x', 'y'),
+    'surface': ('x', 'y'),
+}
+
+# numpy dtype -> plotly.js typed array dtype
+_PLOTLY_DTYPES = {
+    'float64': 'f8',
+    'float32': 'f4',
+    'int32': 'i4',
+    'uint32': 'u4',
+    'int16': 'i2',
+    'uint16': 'u2',
+    'int8': 'i1',
+    'uint8': 'u1',
+}
+_NUMPY_DTYPES = {short: name for name, short in _PLOTLY_DTYPES.items()}
+
+# Characters that must not appear raw in JSON inside a <script> element
+_SCRIPT_UNSAFE = (('<', '\\u003c'), ('\u2028', '\\u2028'), ('\u2029', '\\u2029'))
+
+# Placeholders figure_html swaps for the serialized traces and frames
+_DATA_PLACEHOLDER = '__GPS_FIGURE_DATA__'
+_FRAMES_PLACEHOLDER = '__GPS_FIGURE_FRAMES__'
+
+
+@lru_cache(maxsize=None)
+def plotlyjs_typed_arrays() -> bool:
+    """Whether the bundled plotly.js decodes typed array specs (2.28 and later)"""
+    try:
+        from plotly.offline import get_plotlyjs_version
+        major, minor = (int(part) for part in get_plotlyjs_version().split('.')[:2])
+    except Exception:
+        return False
+    return (major, minor) >= (2, 28)
+
+
+def _typed_or_list(array: np.ndarray, fallback: np.ndarray):
+    """Typed array spec of array, or fallback as a list for a plotly.js without typed arrays"""
+    return plotly_typed_array(array) if plotlyjs_typed_arrays() else fallback.tolist()
+
+
+def plotly_typed_array(array: np.ndarray) -> dict:
+    """Encode a numeric array as a plotly.js typed array spec"""
+    array = np.ascontiguousarray(array)
+    spec = {
+        'dtype': _PLOTLY_DTYPES[array.dtype.name],
+        'bdata': base64.b64encode(array.astype(array.dtype.newbyteorder('<'), copy=False).tobytes()).decode('ascii'),
+    }
+    if array.ndim > 1:
+        spec['shape'] = ', '.join(str(size) for size in array.shape)
+    return spec
+
+
+def _decode_typed_array(spec: dict) -> Optional[np.ndarray]:
+    dtype = _NUMPY_DTYPES.get(spec.get('dtype'))
+    if dtype is None or not isinstance(spec.get('bdata'), str):
+        return None
+    array = np.frombuffer(base64.b64decode(spec['bdata']), dtype=np.dtype(dtype).newbyteorder('<'))
+    if spec.get('shape'):
+        array = array.reshape([int(size) for size in str(spec['shape']).split(',')])
+    return array
+
+
+def _numeric_array(value) -> Optional[np.ndarray]:
+    """value as a numeric numpy array, None for anything else (strings, mixed, booleans, scalars)"""
+    if isinstance(value, dict) and 'bdata' in value:
+        return _decode_typed_array(value)
+    if isinstance(value, np.ndarray):
+        array = value
+    elif isinstance(value, (list, tuple)) and value:
+        first = value[0]
+        if isinstance(first, bool) or not isinstance(first, (int, float, np.number)):
+            return None
+        try:
+            array = np.asarray(value)
+        except ValueError:  # ragged nested lists
+            return None
+    else:
+        return None
+    if array.dtype.kind not in 'iuf' or array.size == 0:
+        return None
+    return array
+
+
+def _smallest_int_array(array: np.ndarray) -> np.ndarray:
+    low, high = int(array.min()), int(array.max())
+    for dtype in (np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return array.astype(dtype)
+    return array.astype(np.float64)
+
+
+def quantize_elevations(elevations) -> np.ndarray:
+    """
+    Terrain elevations rounded to whole meters as int16
+
+    Half a meter is far below what a terrain surface shows (its hover
+    already rounds to meters), and plotly.js decodes int16 typed arrays
+    natively. Grids with NaN or values outside the int16 range are
+    returned as float64.
+    """
+    array = np.asarray(elevations, dtype=np.float64)
+    info = np.iinfo(np.int16)
+    if array.size == 0 or not np.isfinite(array).all():
+        return array
+    rounded = np.round(array)
+    if rounded.min() < info.min or rounded.max() > info.max:
+        return array
+    return rounded.astype(np.int16)
+
+
+def compact_coordinates(values, decimals: int) -> np.ndarray:
+    """Coordinates rounded to ``decimals``, as float32 when that stays within the rounding precision"""
+    array = np.round(np.asarray(values, dtype=np.float64), decimals)
+    single = array.astype(np.float32)
+    with np.errstate(invalid='ignore'):
+        if not np.any(np.abs(single - array) > 0.5 * 10.0 ** -decimals):
+            return single
+    return array
+
+
+def compact_track_coordinates(payload: Dict[str, Any], decimals: Optional[int] = DEFAULT_COORDINATE_DECIMALS) -> dict:
+    """Copy of a browser runtime payload (frame index / playback) with compacted track lat/lon"""
+    if decimals is None or 'tracks' not in payload:
+        return payload
+    tracks = []
+    for track in payload['tracks']:
+        track = dict(track)
+        for key in ('lat', 'lon'):
+            if track.get(key) is not None and len(track[key]):
+                track[key] = compact_coordinates(track[key], decimals)
+        tracks.append(track)
+    return {**payload, 'tracks': tracks}
+
+
+def encode_array(value, decimals: Optional[int] = None):
+    """
+    Compact encoding of one trace property value
+
+    Args:
+        value: Property value; anything that is not a numeric array is returned unchanged
+        decimals: Round to this many decimals (coordinates), None keeps full precision
+
+    Returns:
+        Typed array spec, a (rounded) list for short arrays, or the unchanged value
+    """
+    array = _numeric_array(value)
+    if array is None:
+        return value
+
+    if array.dtype.kind in 'iu':
+        if array.size < MIN_TYPED_ARRAY_LENGTH:
+            return value if not isinstance(value, np.ndarray) else array.tolist()
+        return _typed_or_list(_smallest_int_array(array), array)
+
+    if decimals is not None:
+        if array.size < MIN_TYPED_ARRAY_LENGTH:
+            return np.round(array.astype(np.float64), decimals).tolist()
+        rounded = np.round(array.astype(np.float64), decimals)
+        return _typed_or_list(compact_coordinates(rounded, decimals), rounded)
+
+    if array.size < MIN_TYPED_ARRAY_LENGTH:
+        return value if isinstance(value, list) else array.tolist()
+    array = array.astype(np.float64, copy=False)
+    single = array.astype(np.float32)
+    with np.errstate(invalid='ignore'):
+        fits = not np.any(np.abs(single - array) > FLOAT32_RTOL * np.abs(array))
+    return _typed_or_list(single if fits else array, array)
+
+
+def encode_trace(trace: Dict[str, Any], coordinate_decimals: Optional[int] = DEFAULT_COORDINATE_DECIMALS) -> dict:
+    """Compactly encoded copy of a trace dict (see module docstring)"""
+    coordinate_keys = _COORDINATE_KEYS.get(trace.get('type'), ())
+    encoded = {}
+    for key, value in trace.items():
+        if key in coordinate_keys:
+            encoded[key] = encode_array(value, coordinate_decimals)
+        elif isinstance(value, dict) and 'bdata' not in value:
+            # Nested properties such as marker.size or marker.opacity
+            encoded[key] = {name: encode_array(item) for name, item in value.items()}
+            color = encoded[key].get('color')
+            if isinstance(color, list) and color and isinstance(color[0], str) and color.count(color[0]) == len(color):
+                encoded[key]['color'] = color[0]
+        else:
+            encoded[key] = encode_array(value)
+    return encoded
+
+
+def encode_figure(figure: Dict[str, Any], coordinate_decimals: Optional[int] = DEFAULT_COORDINATE_DECIMALS) -> dict:
+    """
+    Compactly encoded copy of a figure dict (``fig.to_dict()``, frames may be plain frame dicts)
+
+    Args:
+        figure: Figure dict with data, layout and optional frames
+        coordinate_decimals: Coordinate rounding, None keeps full precision
+
+    Returns:
+        Figure dict for ``plotly.io.to_html(..., validate=False)``
+    """
+    encoded = dict(figure)
+    encoded['data'] = [encode_trace(trace, coordinate_decimals) for trace in figure.get('data', [])]
+    if figure.get('frames'):
+        encoded['frames'] = [
+            {**frame, 'data': [encode_trace(trace, coordinate_decimals) for trace in frame.get('data', [])]}
+            for frame in figure['frames']
+        ]
+    return encoded
+
+
+def figure_json(value) -> str:
+    """
+    Compact JSON of figure data for an inline script
+
+    Uses orjson (numpy arrays serialized natively) when installed and falls
+    back to plotly's to_json_plotly without it or for values orjson cannot
+    serialize (non-contiguous arrays, pandas or plotly objects).
+    """
+    if orjson is None:
+        return to_json_plotly(value)
+    try:
+        text = orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    except TypeError:
+        return to_json_plotly(value)
+    for unsafe, safe in _SCRIPT_UNSAFE:
+        if unsafe in text:
+            text = text.replace(unsafe, safe)
+    return text
+
+
+def _plotly_json(item):
+    """Plain dict of a trace, frame or layout (graph objects via to_plotly_json)"""
+    return item.to_plotly_json() if hasattr(item, 'to_plotly_json') else item
+
+
+def _write_json_array(file: TextIO, items: Iterable, encode, serialize, batch: int) -> None:
+    """Write items as a JSON array, converting and serializing ``batch`` items at a time"""
+    file.write('[')
+    first = True
+    items = iter(items)
+    while True:
+        chunk = [encode(_plotly_json(item)) for item in islice(items, batch)]
+        if not chunk:
+            break
+        if not first:
+            file.write(',')
+        # Strip the enclosing brackets, the batches share one array
+        file.write(serialize(chunk)[1:-1])
+        first = False
+    file.write(']')
+
+
+def write_figure_html(file: TextIO, data: Sequence, layout, frames: Sequence = (), config: Optional[dict] = None,
+                      body_assets: str = '', coordinate_decimals: Optional[int] = DEFAULT_COORDINATE_DECIMALS,
+                      compact: bool = True, frame_batch: int = FRAME_BATCH, include_plotlyjs=True) -> None:
+    """
+    Stream a figure page to an open text file
+
+    plotly renders the page (script tags, div, newPlot/addFrames calls) around
+    placeholders; the parts between them are written as they are, the trace
+    and frame JSON is encoded and serialized ``frame_batch`` frames at a time,
+    and body_assets (fullscreen and runtime markup) go in before </body>.
+    Only one batch of frames is held in serialized form at any time.
+
+    Args:
+        file: Text file (or io.StringIO) to write to
+        data: Traces, as dicts or graph objects
+        layout: Layout dict or graph object
+        frames: Frames, as dicts or graph objects
+        config: Plotly config of the page
+        body_assets: Markup inserted before </body>
+        coordinate_decimals: Coordinate rounding, None keeps full precision
+        compact: Encode the arrays compactly (see module docstring); False
+            writes them with plotly's serializer as they are
+        frame_batch: Frames converted and serialized per write
+        include_plotlyjs: As for ``plotly.io.to_html``: True embeds plotly.js,
+            a path ending in .js references it
+    """
+    if compact:
+        def encode(trace):
+            return encode_trace(trace, coordinate_decimals)
+        serialize = figure_json
+    else:
+        def encode(trace):
+            return trace
+        serialize = to_json_plotly
+
+    def encode_frame(frame):
+        return {**frame, 'data': [encode(trace) for trace in frame.get('data', [])]}
+
+    skeleton = {
+        'data': _DATA_PLACEHOLDER,
+        'layout': _plotly_json(layout),
+        'frames': _FRAMES_PLACEHOLDER if len(frames) else None,
+    }
+    html_string = pio.to_html(skeleton, config=config, include_plotlyjs=include_plotlyjs, validate=False)
+    head, rest = html_string.split(f'"{_DATA_PLACEHOLDER}"', 1)
+    file.write(head)
+    _write_json_array(file, data, encode, serialize, max(len(data), 1))
+    if len(frames):
+        middle, rest = rest.split(f'"{_FRAMES_PLACEHOLDER}"', 1)
+        file.write(middle)
+        _write_json_array(file, frames, encode_frame, serialize, frame_batch)
+    body_end = rest.rfind('</body>')
+    if body_end < 0:
+        body_end = len(rest)
+    file.write(rest[:body_end])
+    file.write(body_assets)
+    file.write(rest[body_end:])
+
+
+def figure_html(figure: Dict[str, Any], config: Optional[dict] = None,
+                coordinate_decimals: Optional[int] = DEFAULT_COORDINATE_DECIMALS) -> str:
+    """
+    ``plotly.io.to_html(figure, validate=False)`` with compactly encoded data and frames
+
+    String counterpart of write_figure_html for a figure dict.
+    """
+    buffer = io.StringIO()
+    write_figure_html(buffer, figure.get('data', []), figure.get('layout', {}), figure.get('frames') or (),
+                      config, coordinate_decimals=coordinate_decimals)
+    return buffer.getvalue()
@@ -14,7 +14,10 @@ from .constants import (
     EARTH_RADIUS_KM, PERFORMANCE_THRESHOLDS, TIME_STEP_OPTIONS
 )
 
-from .calculations import haversine_distance, format_height_display, calculate_velocity, format_velocity_display
+from .calculations import (
+    haversine_distance, format_height_display, calculate_velocity, format_velocity_display,
+    format_height_display_array, format_velocity_display_array,
+)
 
 from .validation import (
     DataValidator, GPSVisualizationError, DataLoadError, 
@@ -51,6 +54,7 @@ __all__ = [
     
     # Functions
     'haversine_distance', 'format_height_display', 'calculate_velocity', 'format_velocity_display',
+    'format_height_display_array', 'format_velocity_display_array',
     'ensure_output_directories', 'get_output_path', 'get_numbered_output_path',
     'setup_logging',
     
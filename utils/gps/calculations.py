@@ -119,3 +119,44 @@ def format_velocity_display(velocity_value) -> str:
         
     except Exception:
         return "No velocity data"
+
+
+def _format_display_array(values, fmt: str, missing: str) -> list:
+    """Format numeric values with a %-pattern in one pass; NaN/None/non-numeric become ``missing``"""
+    import pandas as pd
+    
+    series = pd.Series(values)
+    if not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        series = pd.to_numeric(series.astype(object), errors='coerce')
+    numeric = series.to_numpy(dtype=float, na_value=np.nan)
+    
+    result = np.full(len(numeric), missing, dtype=object)
+    valid = ~np.isnan(numeric)
+    result[valid] = np.char.mod(fmt, numeric[valid])
+    return result.tolist()
+
+
+def format_height_display_array(height_values) -> list:
+    """
+    Vectorized format_height_display for a whole column
+    
+    Args:
+        height_values: Sequence, array or Series of height values
+        
+    Returns:
+        list: Display strings, identical to format_height_display per value
+    """
+    return _format_display_array(height_values, '%.1fm', "No height data")
+
+
+def format_velocity_display_array(velocity_values) -> list:
+    """
+    Vectorized format_velocity_display for a whole column
+    
+    Args:
+        velocity_values: Sequence, array or Series of velocities in m/s
+        
+    Returns:
+        list: Display strings, identical to format_velocity_display per value
+    """
+    return _format_display_array(velocity_values, '%.1f m/s', "No velocity data")
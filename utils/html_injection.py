@@ -4,32 +4,51 @@ HTML post-processing utilities for Plotly exports.
 Currently includes:
 - inject_fullscreen: Adds CSS/JS to enable a custom fullscreen button that
   toggles the entire page into fullscreen while properly resizing Plotly.
+- inject_indexed_frames: Embeds tracks once and rebuilds the frames in the browser.
+- inject_client_playback: Embeds tracks once and plays them back with
+  requestAnimationFrame instead of Plotly frames.
+
+Each inject_* function has an *_assets counterpart returning the markup it
+inserts before </body>, for writers that stream the document.
+shared_runtime_assets references the same code from the shared asset files
+of utils.shared_assets instead of embedding it.
 """
 
 from __future__ import annotations
 
+from typing import Optional, Tuple
+
 
 def inject_fullscreen(html_string: str) -> str:
     """
     Injects CSS and JavaScript before </body> to support a custom
     "⛶ Fullscreen" updatemenus button in Plotly figures.
 
+    Args:
+        html_string: HTML document produced by fig.to_html(...)
+
+    Returns:
+        Modified HTML string with fullscreen support.
+    """
+    return html_string.replace('</body>', fullscreen_assets() + '</body>')
+
+
+def fullscreen_assets() -> str:
+    """
+    CSS and JavaScript of the custom "⛶ Fullscreen" updatemenus button,
+    for the end of the document body.
+
     The script:
     - Styles windowed mode to be centered with padding.
     - Applies a fullscreen-mode class in fullscreen for near-full viewport fit.
     - Binds the updatemenus button labeled "⛶ Fullscreen" to the Fullscreen API.
     - Resizes the Plotly graph on enter/exit and window resize.
     - Uses a MutationObserver to rebind handlers after Plotly DOM updates.
+    """
+    return '\n<style>\n' + _FULLSCREEN_CSS + '</style>\n<script>\n' + _FULLSCREEN_JS + '</script>\n'
 
-    Args:
-        html_string: HTML document produced by fig.to_html(...)
 
-    Returns:
-        Modified HTML string with fullscreen support.
-    """
-    fullscreen_assets = """
-<style>
-/* Improve centering for windowed mode */
+_FULLSCREEN_CSS = """/* Improve centering for windowed mode */
 body {
     display: flex;
     justify-content: center;
@@ -94,9 +113,9 @@ body.fullscreen-mode .plotly-graph-div {
     width: 98vw !important;
     height: 95vh !important;
 }
-</style>
-<script>
-// Enhanced fullscreen functionality with better centering
+"""
+
+_FULLSCREEN_JS = """// Enhanced fullscreen functionality with better centering
 document.addEventListener('DOMContentLoaded', function() {
     // (Removed legacy Radar overlay injection)
     // Centralized control-state helpers (button glow / play/pause/fullscreen/recenter)
@@ -278,10 +297,6 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    }
-
-    // Find all buttons and add fullscreen functionality
-
     function metersPerPixelAtLat(zoom, lat) {
         // More accurate Web Mercator meters-per-pixel using Earth radius
         // metersPerPixel = (2 * PI * R * cos(lat)) / (tileSize * 2^zoom)
@@ -495,7 +510,540 @@ document.addEventListener('DOMContentLoaded', function() {
     });
     syncObserver.observe(document.body, {childList: true, subtree: true});
 });
-</script>
 """
 
-    return html_string.replace('</body>', fullscreen_assets + '</body>')
+
+# Typed array names understood by the injected runtimes
+_TYPED_ARRAY_DTYPES = {
+    'float64': 'Float64Array',
+    'float32': 'Float32Array',
+    'int32': 'Int32Array',
+    'uint32': 'Uint32Array',
+    'int16': 'Int16Array',
+    'uint16': 'Uint16Array',
+    'int8': 'Int8Array',
+    'uint8': 'Uint8Array',
+}
+
+
+def encode_typed_array(values) -> dict:
+    """
+    Encode a numeric numpy array as ``{'dtype', 'bdata'}`` (little-endian, base64)
+
+    The injected runtimes decode it into the matching JavaScript typed array.
+    """
+    import base64
+    import numpy as np
+
+    array = np.ascontiguousarray(values)
+    dtype = array.dtype.name
+    if dtype not in _TYPED_ARRAY_DTYPES:
+        raise ValueError(f"Unsupported typed array dtype: {dtype}")
+    data = array.astype(array.dtype.newbyteorder('<'), copy=False).tobytes()
+    return {'dtype': dtype, 'bdata': base64.b64encode(data).decode('ascii')}
+
+
+def encode_typed_arrays(obj):
+    """Recursively replace numpy arrays in a payload with encoded typed arrays"""
+    import numpy as np
+
+    if isinstance(obj, np.ndarray):
+        return encode_typed_array(obj)
+    if isinstance(obj, dict):
+        return {key: encode_typed_arrays(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [encode_typed_arrays(value) for value in obj]
+    return obj
+
+
+def payload_script_tag(payload: dict, element_id: str) -> str:
+    """Serialize a payload into a ``<script type="application/json">`` element"""
+    from .figure_encoding import figure_json
+
+    # figure_json escapes "<", so the JSON cannot terminate the script element early
+    payload_json = figure_json(encode_typed_arrays(payload))
+    return f'<script type="application/json" id="{element_id}">{payload_json}</script>\n'
+
+
+# Shared helpers of the injected runtimes: payload decoding and graph lookup
+_RUNTIME_COMMON_JS = """
+window.__GPS_RUNTIME = window.__GPS_RUNTIME || (function () {
+    var TYPES = {
+        float64: Float64Array, float32: Float32Array, int32: Int32Array, uint32: Uint32Array,
+        int16: Int16Array, uint16: Uint16Array, int8: Int8Array, uint8: Uint8Array
+    };
+    function decode(value) {
+        if (value && typeof value === 'object' && !Array.isArray(value)) {
+            if (typeof value.bdata === 'string' && TYPES[value.dtype]) {
+                var bin = atob(value.bdata);
+                var bytes = new Uint8Array(bin.length);
+                for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+                return new TYPES[value.dtype](bytes.buffer);
+            }
+            var out = {};
+            for (var key in value) out[key] = decode(value[key]);
+            return out;
+        }
+        if (Array.isArray(value)) return value.map(decode);
+        return value;
+    }
+    function readPayload(elementId) {
+        var el = document.getElementById(elementId);
+        return el ? decode(JSON.parse(el.textContent)) : null;
+    }
+    function whenGraphReady(callback) {
+        var gd = document.querySelector('.plotly-graph-div');
+        if (gd && gd._fullLayout && window.Plotly) { callback(gd); return; }
+        setTimeout(function () { whenGraphReady(callback); }, 30);
+    }
+    function clone(obj) { return JSON.parse(JSON.stringify(obj)); }
+    // Same values as utils.animation_builders.fade_marker_styles
+    function fadeStyles(fade, n) {
+        var cache = fade.__cache || (fade.__cache = {});
+        if (cache[n]) return cache[n];
+        var size = new Array(n), opacity = new Array(n);
+        for (var i = 0; i < n - 1; i++) {
+            var age = i / Math.max(1, n - 1);
+            size[i] = fade.min_size + (fade.size_range * age);
+            opacity[i] = fade.min_opacity + (fade.opacity_range * age);
+        }
+        size[n - 1] = fade.head_size;
+        opacity[n - 1] = 1.0;
+        return (cache[n] = {size: size, opacity: opacity});
+    }
+    return {decode: decode, readPayload: readPayload, whenGraphReady: whenGraphReady, clone: clone,
+            fadeStyles: fadeStyles};
+})();
+"""
+
+
+_INDEXED_FRAMES_JS = """
+(function () {
+    var R = window.__GPS_RUNTIME;
+    var payload = R.readPayload('gps-frame-index');
+    if (!payload) return;
+
+    var tracks = payload.tracks;
+    var names = payload.frame_names;
+    var ranges = payload.ranges;
+    var fade = payload.fade;
+    var nv = tracks.length;
+
+    function trailTraces(t, s, e, data) {
+        var trace = R.clone(t.templates.trail);
+        trace.lat = t.lat.subarray(s, e);
+        trace.lon = t.lon.subarray(s, e);
+        if (payload.strategy === 'line_head') {
+            data.push(trace);
+            var h = e - 1;
+            var head = R.clone(t.templates.head);
+            head.lat = [t.lat[h]];
+            head.lon = [t.lon[h]];
+            head.marker = {
+                color: t.marker_color ? t.marker_color[h] : t.color,
+                size: t.head_size ? t.head_size[h] : 12
+            };
+            head.customdata = [t.customdata[h]];
+            if (t.precip_info && t.precip_info[h]) {
+                head.hovertemplate = head.hovertemplate.replace('<extra></extra>', t.precip_info[h] + '<extra></extra>');
+            }
+            data.push(head);
+        } else {
+            var styles = R.fadeStyles(fade, e - s);
+            trace.marker = {
+                color: t.marker_color ? t.marker_color.slice(s, e) : t.color,
+                size: styles.size,
+                opacity: styles.opacity
+            };
+            trace.customdata = t.customdata.slice(s, e);
+            data.push(trace);
+        }
+    }
+
+    function frameLayout(name) {
+        if (!payload.frame_layout) return {};
+        return JSON.parse(JSON.stringify(payload.frame_layout).split(payload.time_placeholder).join(name));
+    }
+
+    function buildFrame(f) {
+        var data = [];
+        for (var v = 0; v < nv; v++) {
+            var t = tracks[v];
+            var s = ranges[(f * nv + v) * 2], e = ranges[(f * nv + v) * 2 + 1];
+            if (e > s) trailTraces(t, s, e, data);
+            else data.push(t.templates.empty);
+        }
+        return {name: names[f], data: data, layout: frameLayout(names[f])};
+    }
+
+    R.whenGraphReady(function (gd) {
+        var frames = new Array(names.length);
+        for (var f = 0; f < names.length; f++) frames[f] = buildFrame(f);
+        window.Plotly.addFrames(gd, frames);
+    });
+})();
+"""
+
+
+def inject_indexed_frames(html_string: str, frame_index: dict) -> str:
+    """
+    Embed an index-referenced frame payload and the runtime that expands it
+
+    Track coordinates and hover data are embedded once (coordinates as
+    typed arrays); the runtime rebuilds each frame's traces from its
+    [start, end) ranges and registers them with ``Plotly.addFrames``, so
+    the existing play/pause buttons and slider work unchanged.
+
+    Args:
+        html_string: HTML document produced by fig.to_html(...) for a figure without frames
+        frame_index: Payload from TrailSystem.create_frame_index
+
+    Returns:
+        Modified HTML string
+    """
+    return html_string.replace('</body>', indexed_frames_assets(frame_index) + '</body>')
+
+
+def indexed_frames_assets(frame_index: dict) -> str:
+    """Payload element and runtime script of inject_indexed_frames, for the end of the document body"""
+    return (
+        payload_script_tag(frame_index, 'gps-frame-index')
+        + '<script>' + _RUNTIME_COMMON_JS + _INDEXED_FRAMES_JS + '</script>\n'
+    )
+
+
+_CLIENT_PLAYBACK_JS = """
+(function () {
+    var R = window.__GPS_RUNTIME;
+    var payload = R.readPayload('gps-playback');
+    if (!payload || !payload.frame_times.length) return;
+
+    var tracks = payload.tracks;
+    var frameTimes = payload.frame_times;
+    var lastFrame = frameTimes.length - 1;
+    var lineHead = payload.strategy === 'line_head';
+    var maxGap = payload.max_gap_seconds;
+
+    function upperBound(arr, x) {
+        var lo = 0, hi = arr.length;
+        while (lo < hi) { var mid = (lo + hi) >> 1; if (arr[mid] <= x) lo = mid + 1; else hi = mid; }
+        return lo;
+    }
+    function lowerBound(arr, x) {
+        var lo = 0, hi = arr.length;
+        while (lo < hi) { var mid = (lo + hi) >> 1; if (arr[mid] < x) lo = mid + 1; else hi = mid; }
+        return lo;
+    }
+    function medianStep(times) {
+        var steps = [];
+        for (var i = 1; i < times.length; i++) steps.push(times[i] - times[i - 1]);
+        steps.sort(function (a, b) { return a - b; });
+        return steps.length ? steps[steps.length >> 1] : 1;
+    }
+
+    // Track seconds per wall-clock millisecond at 1x: one median frame step per frame duration,
+    // the same average pace as the frame-based animation
+    var baseRate = medianStep(frameTimes) / payload.frame_duration_ms;
+
+    var state = {
+        t: frameTimes[0], speed: 1, playing: false, wall: null,
+        trailSeconds: payload.trail_seconds, frame: 0, syncedAt: 0, busy: false, dirty: false,
+        waiting: false
+    };
+
+    // Chunked payloads: track arrays live in time-chunk scripts next to the HTML (script tags
+    // load from file:// URLs and static servers alike). Chunks covering the trail window and
+    // the next few chunks are kept; the tracks are re-assembled from them when the set changes.
+    var chunking = payload.chunks || null;
+    var chunkData = {}, chunkPending = {}, chunkSpan = null;
+
+    function chunkIndex(x) {
+        return Math.min(chunking.count - 1, Math.max(0, upperBound(chunking.starts, x) - 1));
+    }
+    function neededChunks() {
+        var current = chunkIndex(state.t);
+        var first = state.trailSeconds === null ? 0 : chunkIndex(state.t - state.trailSeconds);
+        return {first: first, current: current, last: Math.min(chunking.count - 1, current + chunking.lookahead)};
+    }
+    function chunksReady() {
+        if (!chunking) return true;
+        var need = neededChunks();
+        for (var c = need.first; c <= need.current; c++) if (!chunkData[c]) return false;
+        return true;
+    }
+    function requestChunk(c) {
+        if (chunkData[c] || chunkPending[c]) return;
+        chunkPending[c] = true;
+        var script = document.createElement('script');
+        script.src = chunking.url + chunking.names[c];
+        script.onload = function () { script.remove(); };
+        script.onerror = function () {
+            script.remove();
+            delete chunkPending[c];
+            console.warn('Could not load animation chunk', script.src);
+        };
+        document.head.appendChild(script);
+    }
+    function concatTyped(parts) {
+        var n = 0, i;
+        for (i = 0; i < parts.length; i++) n += parts[i].length;
+        var out = new parts[0].constructor(n), offset = 0;
+        for (i = 0; i < parts.length; i++) { out.set(parts[i], offset); offset += parts[i].length; }
+        return out;
+    }
+    function concatLists(parts) { return parts[0] === null ? null : [].concat.apply([], parts); }
+    // Rebuild the track arrays from the contiguous run of loaded chunks starting at the trail window
+    function assembleTracks(first) {
+        var last = first - 1;
+        while (last + 1 < chunking.count && chunkData[last + 1]) last++;
+        if (chunkSpan && chunkSpan[0] === first && chunkSpan[1] === last) return;
+        chunkSpan = [first, last];
+        for (var v = 0; v < tracks.length; v++) {
+            var parts = [];
+            for (var c = first; c <= last; c++) parts.push(chunkData[c].tracks[v]);
+            if (!parts.length) { tracks[v].times = new Float64Array(0); continue; }
+            ['times', 'lat', 'lon', 'head_size'].forEach(function (key) {
+                tracks[v][key] = parts[0][key] === null ? null : concatTyped(parts.map(function (p) { return p[key]; }));
+            });
+            ['customdata', 'marker_color', 'precip_info'].forEach(function (key) {
+                tracks[v][key] = concatLists(parts.map(function (p) { return p[key]; }));
+            });
+        }
+    }
+    function updateChunks() {
+        if (!chunking) return;
+        var need = neededChunks();
+        for (var c = need.current; c <= need.last; c++) requestChunk(c);
+        for (c = need.first; c < need.current; c++) requestChunk(c);
+        for (var key in chunkData) {
+            c = +key;
+            if (c < need.first || c > need.last + 1) delete chunkData[key];
+        }
+        if (chunksReady()) assembleTracks(need.first);
+    }
+    window.__GPS_CHUNK = function (c, data) {
+        delete chunkPending[c];
+        chunkData[c] = R.decode(data);
+        updateChunks();
+        if (state.waiting && chunksReady()) { state.waiting = false; render(); }
+    };
+    if (chunking) {
+        tracks.forEach(function (tr) { tr.times = new Float64Array(0); });
+    }
+
+    // Head position between the last fix and the next one (null when not moving or the gap is too long)
+    function interpolatedHead(track, e, t) {
+        var times = track.times;
+        if (e <= 0 || e >= times.length) return null;
+        var t0 = times[e - 1], t1 = times[e];
+        if (t1 <= t0 || t <= t0 || (maxGap !== null && t1 - t0 > maxGap)) return null;
+        var f = (t - t0) / (t1 - t0);
+        return [track.lat[e - 1] + f * (track.lat[e] - track.lat[e - 1]),
+                track.lon[e - 1] + f * (track.lon[e] - track.lon[e - 1])];
+    }
+
+    function withHead(values, s, e, head) {
+        var out = new Float64Array(e - s + (head ? 1 : 0));
+        out.set(values.subarray(s, e));
+        if (head) out[out.length - 1] = head;
+        return out;
+    }
+
+    // One restyle update for all traces; undefined leaves an attribute of a trace untouched
+    function traceUpdate(t) {
+        var u = {lat: [], lon: [], customdata: [], 'marker.color': [], 'marker.size': [],
+                 'marker.opacity': [], hovertemplate: []};
+        function push(lat, lon, customdata, color, size, opacity, hovertemplate) {
+            u.lat.push(lat); u.lon.push(lon); u.customdata.push(customdata);
+            u['marker.color'].push(color); u['marker.size'].push(size);
+            u['marker.opacity'].push(opacity); u.hovertemplate.push(hovertemplate);
+        }
+        for (var v = 0; v < tracks.length; v++) {
+            var tr = tracks[v];
+            var e = upperBound(tr.times, t);
+            var s = state.trailSeconds === null ? 0 : Math.min(e, lowerBound(tr.times, t - state.trailSeconds));
+            if (e <= s) {
+                push([], [], undefined, undefined, undefined, undefined, undefined);
+                if (lineHead) push([], [], undefined, undefined, undefined, undefined, undefined);
+                continue;
+            }
+            var h = e - 1;
+            var head = interpolatedHead(tr, e, t);
+            var lat = withHead(tr.lat, s, e, head && head[0]);
+            var lon = withHead(tr.lon, s, e, head && head[1]);
+            if (lineHead) {
+                push(lat, lon, undefined, undefined, undefined, undefined, undefined);
+                var template = tr.templates.head.hovertemplate;
+                if (tr.precip_info && tr.precip_info[h]) {
+                    template = template.replace('<extra></extra>', tr.precip_info[h] + '<extra></extra>');
+                }
+                push([lat[lat.length - 1]], [lon[lon.length - 1]], [tr.customdata[h]],
+                     tr.marker_color ? tr.marker_color[h] : tr.color,
+                     tr.head_size ? tr.head_size[h] : 12, 1, template);
+            } else {
+                var customdata = tr.customdata.slice(s, e);
+                var colors = tr.marker_color ? tr.marker_color.slice(s, e) : tr.color;
+                if (head) {
+                    customdata.push(tr.customdata[h]);
+                    if (tr.marker_color) colors.push(tr.marker_color[h]);
+                }
+                var styles = R.fadeStyles(payload.fade, lat.length);
+                push(lat, lon, customdata, colors, styles.size, styles.opacity, undefined);
+            }
+        }
+        return u;
+    }
+
+    var gd = null;
+    var traceIndices = [];
+    // create_base_figure adds one trace per vulture (two with line_head), in payload order
+    for (var i = 0; i < tracks.length * (lineHead ? 2 : 1); i++) traceIndices.push(i);
+
+    function render() {
+        updateChunks();
+        if (!chunksReady()) { state.waiting = true; return; }
+        if (state.busy) { state.dirty = true; return; }
+        state.busy = true;
+        window.Plotly.restyle(gd, traceUpdate(state.t), traceIndices).then(function () {
+            state.busy = false;
+            if (state.dirty) { state.dirty = false; render(); }
+        });
+    }
+
+    // Move the slider along with the clock (throttled, it redraws the slider)
+    function syncSlider(now, force) {
+        var frame = Math.max(0, upperBound(frameTimes, state.t) - 1);
+        if (frame === state.frame || (!force && now - state.syncedAt < 250)) return;
+        state.frame = frame;
+        state.syncedAt = now;
+        window.Plotly.relayout(gd, {'sliders[0].active': frame});
+        if (state.playing && window.__CONTROL) {
+            window.__CONTROL.setControlActive('▶️ Play', true);
+            window.__CONTROL.setControlActive('⏸️ Pause', false);
+        }
+    }
+
+    function tick(now) {
+        if (!state.playing) return;
+        if (!chunksReady()) {
+            // Buffering: hold the clock until the chunks of the playhead have loaded
+            state.wall = now;
+            updateChunks();
+            window.requestAnimationFrame(tick);
+            return;
+        }
+        if (state.wall !== null) state.t += (now - state.wall) * baseRate * state.speed;
+        state.wall = now;
+        if (state.t >= frameTimes[lastFrame]) { state.t = frameTimes[lastFrame]; state.playing = false; }
+        render();
+        syncSlider(now, !state.playing);
+        if (state.playing) window.requestAnimationFrame(tick);
+    }
+
+    var player = {
+        state: state,
+        play: function () {
+            if (state.t >= frameTimes[lastFrame]) state.t = frameTimes[0];
+            if (state.playing) return;
+            state.playing = true;
+            state.wall = null;
+            window.requestAnimationFrame(tick);
+        },
+        pause: function () { state.playing = false; },
+        seek: function (t) {
+            state.t = Math.min(Math.max(t, frameTimes[0]), frameTimes[lastFrame]);
+            render();
+        },
+        seekFrame: function (frame) { state.frame = frame; player.seek(frameTimes[frame]); },
+        setSpeed: function (speed) { state.speed = speed; },
+        setTrailSeconds: function (seconds) { state.trailSeconds = seconds; render(); }
+    };
+    window.__GPS_PLAYER = player;
+    updateChunks();
+
+    R.whenGraphReady(function (graph) {
+        gd = graph;
+        gd.on('plotly_buttonclicked', function (e) {
+            var cmd = e && e.button && e.button.args && e.button.args[0];
+            if (!cmd || !cmd.action) return;
+            if (cmd.action === 'play') player.play();
+            else if (cmd.action === 'pause') player.pause();
+            else if (cmd.action === 'restart') { player.seekFrame(0); player.play(); }
+            else if (cmd.action === 'speed') { player.setSpeed(cmd.speed); player.play(); }
+            else if (cmd.action === 'trail') player.setTrailSeconds(cmd.seconds > 0 ? cmd.seconds : null);
+        });
+        gd.on('plotly_sliderchange', function (e) {
+            var cmd = e && e.step && e.step.args && e.step.args[0];
+            if (e.interaction === false || !cmd || cmd.action !== 'seek') return;
+            player.seekFrame(cmd.frame);
+        });
+        render();
+    });
+})();
+"""
+
+
+def inject_client_playback(html_string: str, playback: dict) -> str:
+    """
+    Embed a track payload and the client-side playback runtime
+
+    The runtime advances a continuous clock with requestAnimationFrame,
+    cuts each trail from the embedded fix times, interpolates the heads
+    between fixes and updates the traces with ``Plotly.restyle``; speed
+    changes only change the clock rate, and the trail length can be switched
+    at any time (``trail`` action, e.g. from the trail dropdown). Buttons and
+    slider steps built with ``client_playback=True`` drive it, and it is
+    exposed as ``window.__GPS_PLAYER``.
+
+    Args:
+        html_string: HTML document produced by fig.to_html(...) for a figure without frames
+        playback: Payload from TrailSystem.create_playback_payload
+
+    Returns:
+        Modified HTML string
+    """
+    return html_string.replace('</body>', client_playback_assets(playback) + '</body>')
+
+
+def client_playback_assets(playback: dict) -> str:
+    """Payload element and runtime script of inject_client_playback, for the end of the document body"""
+    return (
+        payload_script_tag(playback, 'gps-playback')
+        + '<script>' + _RUNTIME_COMMON_JS + _CLIENT_PLAYBACK_JS + '</script>\n'
+    )
+
+
+def runtime_bundle() -> Tuple[str, str]:
+    """
+    (CSS, JavaScript) of the fullscreen button and both browser runtimes,
+    for the shared asset files of utils.shared_assets
+
+    The runtimes read their payload element when the script runs and stay
+    idle on pages without one, so every page can load the same bundle.
+    """
+    return _FULLSCREEN_CSS, _FULLSCREEN_JS + _RUNTIME_COMMON_JS + _INDEXED_FRAMES_JS + _CLIENT_PLAYBACK_JS
+
+
+def shared_runtime_assets(runtime_css: str, runtime_js: str, frame_index: Optional[dict] = None,
+                          playback: Optional[dict] = None) -> str:
+    """
+    Markup that loads the shared runtime bundle, for the end of the document body
+
+    The payload element (if any) precedes the runtime script, which reads it
+    when loaded.
+
+    Args:
+        runtime_css: URL of the bundle's CSS file
+        runtime_js: URL of the bundle's JavaScript file
+        frame_index: Payload of the "indexed" output mode
+        playback: Payload (or chunk manifest) of the client playback modes
+
+    Returns:
+        HTML markup
+    """
+    markup = f'\n<link rel="stylesheet" href="{runtime_css}">\n'
+    if frame_index is not None:
+        markup += payload_script_tag(frame_index, 'gps-frame-index')
+    if playback is not None:
+        markup += payload_script_tag(playback, 'gps-playback')
+    return markup + f'<script src="{runtime_js}"></script>\n'
@@ -0,0 +1,109 @@
+"""
+Parallel Frames
+
+Builds animation frames in worker processes.
+
+The timeline is split into contiguous frame ranges. Each worker receives the
+read-only track data once (pool initializer) and builds the frames of the
+ranges it is given with the same range builder the serial path uses; the
+frames come back as plain dicts and are reassembled in timeline order, so the
+figure (and its HTML) is identical to a serial build. Small timelines, a
+single worker or a failing pool fall back to building serially in-process.
+
+Worker count: ``max_workers`` argument, else the FRAME_WORKERS environment
+variable, else the CPU count.
+"""
+
+from __future__ import annotations
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+# Below this many frames the worker start-up costs more than it saves
+PARALLEL_MIN_FRAMES = 500
+
+# Ranges per worker; cumulative trails make later frames heavier, so several
+# smaller ranges per worker balance the load better than one range each
+RANGES_PER_WORKER = 4
+
+RangeBuilder = Callable[[Any, int, int], Sequence[Any]]
+
+_worker_builder: Optional[RangeBuilder] = None
+_worker_shared: Any = None
+
+
+def resolve_workers(max_workers: Optional[int] = None) -> int:
+    """Number of frame worker processes to use (at least 1)"""
+    if max_workers is None:
+        try:
+            max_workers = int(os.environ.get('FRAME_WORKERS', '0')) or os.cpu_count() or 1
+        except ValueError:
+            max_workers = os.cpu_count() or 1
+    return max(1, int(max_workers))
+
+
+def split_frame_ranges(n_frames: int, n_ranges: int) -> List[Tuple[int, int]]:
+    """Split range(n_frames) into up to n_ranges contiguous [start, end) ranges"""
+    n_ranges = max(1, min(n_ranges, n_frames))
+    bounds = [n_frames * i // n_ranges for i in range(n_ranges + 1)]
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def _init_worker(build_range: RangeBuilder, shared: Any) -> None:
+    global _worker_builder, _worker_shared
+    _worker_builder = build_range
+    _worker_shared = shared
+
+
+def _build_in_worker(start: int, end: int) -> List[dict]:
+    return [_frame_dict(frame) for frame in _worker_builder(_worker_shared, start, end)]
+
+
+def _frame_dict(frame) -> dict:
+    return frame if isinstance(frame, dict) else frame.to_plotly_json()
+
+
+def build_frames(build_range: RangeBuilder, shared: Any, n_frames: int,
+                 max_workers: Optional[int] = None,
+                 min_frames: Optional[int] = None) -> List[Any]:
+    """
+    Build frames 0..n_frames-1, in worker processes when worthwhile
+
+    Args:
+        build_range: Module-level function (shared, start, end) -> frames of that range
+        shared: Read-only data the builder needs (sent to each worker once)
+        n_frames: Total number of frames
+        max_workers: Worker processes (see resolve_workers); 1 builds serially
+        min_frames: Smallest timeline built in parallel (default PARALLEL_MIN_FRAMES)
+
+    Returns:
+        Frames in timeline order: what build_range returns when built serially,
+        frame dicts when built in workers (both give the same figure)
+    """
+    if min_frames is None:
+        min_frames = PARALLEL_MIN_FRAMES
+    # At least half the minimum timeline per worker
+    workers = min(resolve_workers(max_workers), max(1, n_frames // max(1, min_frames // 2)))
+    if workers <= 1 or n_frames < min_frames:
+        return list(build_range(shared, 0, n_frames))
+
+    ranges = split_frame_ranges(n_frames, workers * RANGES_PER_WORKER)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(build_range, shared),
+        ) as executor:
+            futures = [executor.submit(_build_in_worker, start, end) for start, end in ranges]
+            frames = []
+            for future in futures:
+                frames.extend(future.result())
+        return frames
+    except Exception as e:
+        # Pool could not start or a worker died (e.g. out of memory): build serially instead
+        print(f"⚠️ Parallel frame building failed ({type(e).__name__}: {e}), building serially")
+        return list(build_range(shared, 0, n_frames))
@@ -0,0 +1,144 @@
+"""
+Playback Chunks
+
+Splits a client playback payload (TrailSystem.create_playback_payload) into
+time chunks for the "chunked" output mode.
+
+The HTML only embeds a manifest: the timeline, trace templates and the chunk
+start times. Track arrays are written as small scripts in a sibling folder,
+one per chunk of ``chunk_frames`` frames, which call
+``window.__GPS_CHUNK(index, data)`` when loaded. Script tags (unlike fetch)
+load from file:// URLs as well as from a local static server such as
+``python -m http.server``, so the exported folder works either way.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .html_injection import encode_typed_arrays
+
+
+DEFAULT_CHUNK_FRAMES = 1000
+DEFAULT_LOOKAHEAD_CHUNKS = 2
+
+# Per-fix track fields moved into the chunks (everything else stays in the manifest)
+_ARRAY_FIELDS = ('times', 'lat', 'lon', 'head_size')
+_LIST_FIELDS = ('customdata', 'marker_color', 'precip_info')
+
+
+def split_playback_payload(payload: Dict, chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+                           lookahead: int = DEFAULT_LOOKAHEAD_CHUNKS) -> Tuple[Dict, List[Dict]]:
+    """
+    Split a playback payload into a manifest and per-chunk track data
+
+    Chunk ``c`` starts at frame ``c * chunk_frames`` and holds every fix from
+    its start time up to the next chunk's start time.
+
+    Args:
+        payload: Payload from TrailSystem.create_playback_payload
+        chunk_frames: Frames per chunk
+        lookahead: Chunks the browser loads ahead of the playhead
+
+    Returns:
+        (manifest without chunk URLs, list of chunk payloads)
+    """
+    if chunk_frames <= 0:
+        raise ValueError(f"chunk_frames must be positive, got {chunk_frames}")
+
+    frame_times = np.asarray(payload['frame_times'], dtype=np.float64)
+    starts = frame_times[::chunk_frames]
+    if not len(starts):
+        starts = np.zeros(1)
+
+    chunks = [{'tracks': []} for _ in range(len(starts))]
+    manifest_tracks = []
+    for track in payload['tracks']:
+        # Chunk boundaries as row positions; fixes before the first frame go to chunk 0
+        bounds = [0] + np.searchsorted(track['times'], starts[1:], side='left').tolist() + [len(track['times'])]
+        for c, chunk in enumerate(chunks):
+            start, end = bounds[c], bounds[c + 1]
+            part = {}
+            for field in _ARRAY_FIELDS:
+                part[field] = None if track[field] is None else np.asarray(track[field])[start:end]
+            for field in _LIST_FIELDS:
+                part[field] = None if track[field] is None else list(track[field][start:end])
+            chunk['tracks'].append(part)
+        manifest_tracks.append({
+            key: value for key, value in track.items() if key not in _ARRAY_FIELDS + _LIST_FIELDS
+        })
+
+    manifest = {key: value for key, value in payload.items() if key != 'tracks'}
+    manifest['tracks'] = manifest_tracks
+    manifest['chunks'] = {
+        'count': len(chunks),
+        'frames': int(chunk_frames),
+        'starts': starts,
+        'lookahead': int(lookahead),
+    }
+    return manifest, chunks
+
+
+def chunk_filename(index: int) -> str:
+    return f"chunk_{index:05d}.js"
+
+
+def write_playback_chunks(chunks: List[Dict], directory: str) -> List[str]:
+    """
+    Write chunk payloads as loader scripts
+
+    Args:
+        chunks: Chunk payloads from split_playback_payload
+        directory: Output folder (created if needed, stale chunk files are removed)
+
+    Returns:
+        Chunk file names, in chunk order
+    """
+    from plotly.io.json import to_json_plotly
+
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.startswith('chunk_') and name.endswith('.js'):
+            os.remove(os.path.join(directory, name))
+
+    names = []
+    for index, chunk in enumerate(chunks):
+        name = chunk_filename(index)
+        data = to_json_plotly(encode_typed_arrays(chunk))
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            f.write(f"window.__GPS_CHUNK && window.__GPS_CHUNK({index}, {data});\n")
+        names.append(name)
+    return names
+
+
+def export_playback_chunks(payload: Dict, html_path: str, chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+                           lookahead: int = DEFAULT_LOOKAHEAD_CHUNKS) -> Dict:
+    """
+    Write the chunk folder next to an HTML file and return its manifest
+
+    Chunks go to ``<html name>_chunks/`` and are referenced relative to the
+    HTML file, so the HTML and the folder can be moved together.
+
+    Returns:
+        Manifest payload for utils.html_injection.inject_client_playback
+    """
+    manifest, chunks = split_playback_payload(payload, chunk_frames, lookahead)
+    stem = os.path.splitext(os.path.basename(html_path))[0]
+    folder = f"{stem}_chunks"
+    names = write_playback_chunks(chunks, os.path.join(os.path.dirname(os.path.abspath(html_path)), folder))
+    manifest['chunks']['url'] = folder + '/'
+    manifest['chunks']['names'] = names
+    return manifest
+
+
+def read_chunk_file(path: str) -> Tuple[int, Dict]:
+    """Parse a chunk script back into (index, JSON data); used by tests and tooling"""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    _, _, rest = text.partition('window.__GPS_CHUNK(')
+    index, _, data = rest.partition(', ')
+    return int(index), json.loads(data.rstrip().rstrip(';').rstrip(')'))
@@ -13,6 +13,7 @@ from typing import List
 from core.analysis.proximity_engine import ProximityEvent, ProximityStatistics
 from core.gps_utils import get_numbered_output_path
 from utils.user_interface import UserInterface
+from utils.shared_assets import write_figure_page
 
 
 class ProximityVisualizer:
@@ -111,7 +112,7 @@ class ProximityVisualizer:
         # Generate filename with bird names
         birds_filename = "_".join(all_vultures) if len(all_vultures) <= 3 else f"{'_'.join(all_vultures[:3])}_and_{len(all_vultures)-3}_more"
         output_path = get_numbered_output_path(f'proximity_timeline_{birds_filename}')
-        fig.write_html(output_path)
+        write_figure_page(fig, output_path)
         print(f"      💾 Timeline saved to: {output_path}")
     
     def _create_map_visualization(self, events: List[ProximityEvent]) -> None:
@@ -166,7 +167,7 @@ class ProximityVisualizer:
         # Generate filename with bird names
         birds_filename = "_".join(all_vultures) if len(all_vultures) <= 3 else f"{'_'.join(all_vultures[:3])}_and_{len(all_vultures)-3}_more"
         output_path = get_numbered_output_path(f'proximity_map_{birds_filename}')
-        fig.write_html(output_path)
+        write_figure_page(fig, output_path)
         print(f"      💾 Map saved to: {output_path}")
     
     def _create_dashboard(self, events: List[ProximityEvent], 
@@ -293,7 +294,7 @@ class ProximityVisualizer:
         # Generate filename with bird names
         birds_filename = "_".join(all_vultures) if len(all_vultures) <= 3 else f"{'_'.join(all_vultures[:3])}_and_{len(all_vultures)-3}_more"
         output_path = get_numbered_output_path(f'proximity_dashboard_{birds_filename}')
-        fig.write_html(output_path)
+        write_figure_page(fig, output_path)
         print(f"      💾 Dashboard saved to: {output_path}")
     
     def display_statistics(self, statistics: ProximityStatistics) -> None:
@@ -0,0 +1,116 @@
+"""
+Shared Assets
+
+Output folder asset bundle for the "shared" HTML asset mode.
+
+By default every HTML output is self-contained: it embeds plotly.js (several
+MB) and the injected fullscreen / playback runtime. In the "shared" mode
+these are written once per output folder, to ``gps_assets/``, and each HTML
+file references them with relative ``<script src>`` / ``<link>`` tags:
+
+- ``plotly-<plotly.js version>.<hash>.min.js``
+- ``gps-runtime.<hash>.js`` and ``gps-runtime.<hash>.css`` (fullscreen
+  button plus the indexed-frame and client-playback runtimes; each runtime
+  stays idle on pages without its payload)
+
+File names carry a hash of their content, so outputs written by different
+versions can share a folder and files are never rewritten in place. Keep
+the folder next to the HTML files when moving them.
+
+The mode is chosen per call or with the HTML_ASSET_MODE environment
+variable ("embedded" or "shared").
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+from .html_injection import runtime_bundle
+
+
+HTML_ASSET_MODES = ("embedded", "shared")
+SHARED_ASSETS_DIR = "gps_assets"
+
+
+@dataclass(frozen=True)
+class SharedAssets:
+    """Asset URLs relative to the HTML files of one output folder"""
+    plotly_js: str
+    runtime_js: str
+    runtime_css: str
+
+
+def html_asset_mode(mode: Optional[str] = None) -> str:
+    """The asset mode to use: mode, else HTML_ASSET_MODE, else "embedded" """
+    if mode is None:
+        mode = os.environ.get('HTML_ASSET_MODE', 'embedded')
+    mode = mode.strip().lower()
+    if mode not in HTML_ASSET_MODES:
+        print(f"⚠️ Unknown HTML_ASSET_MODE: {mode}, using 'embedded'")
+        return 'embedded'
+    return mode
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+
+
+def _write_once(directory: str, name: str, text: str) -> None:
+    """Write an asset unless it exists; atomic, as parallel renders may write the same file"""
+    path = os.path.join(directory, name)
+    if os.path.exists(path):
+        return
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix=os.path.splitext(name)[1])
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def ensure_shared_assets(output_dir: str) -> SharedAssets:
+    """
+    Write the shared asset bundle into output_dir (if not there yet)
+
+    Args:
+        output_dir: Folder of the HTML files that reference the bundle
+
+    Returns:
+        SharedAssets with URLs relative to output_dir
+    """
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    directory = os.path.join(output_dir or '.', SHARED_ASSETS_DIR)
+    os.makedirs(directory, exist_ok=True)
+
+    plotly_js = get_plotlyjs()
+    runtime_css, runtime_js = runtime_bundle()
+    names = {
+        'plotly_js': (f"plotly-{get_plotlyjs_version()}.{_content_hash(plotly_js)}.min.js", plotly_js),
+        'runtime_js': (f"gps-runtime.{_content_hash(runtime_js)}.js", runtime_js),
+        'runtime_css': (f"gps-runtime.{_content_hash(runtime_css)}.css", runtime_css),
+    }
+    for name, text in names.values():
+        _write_once(directory, name, text)
+    return SharedAssets(**{key: f"{SHARED_ASSETS_DIR}/{name}" for key, (name, _) in names.items()})
+
+
+def write_figure_page(fig, output_path: str, asset_mode: Optional[str] = None, **write_args) -> str:
+    """
+    ``fig.write_html(output_path)`` honoring the HTML asset mode
+
+    In the "shared" mode plotly.js is referenced from the output folder's
+    bundle instead of being embedded. Returns output_path.
+    """
+    if html_asset_mode(asset_mode) == 'shared':
+        assets = ensure_shared_assets(os.path.dirname(os.path.abspath(output_path)))
+        write_args['include_plotlyjs'] = assets.plotly_js
+    fig.write_html(output_path, **write_args)
+    return output_path
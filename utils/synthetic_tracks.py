@@ -0,0 +1,211 @@
+"""
+Synthetic GPS Track Generator
+
+Deterministic generator for large collar-format GPS datasets, used to test
+and benchmark the pipeline far beyond the size of the bundled sample CSVs.
+
+Birds alternate between two behaviours:
+- roosting at night: stationary near a roost site with small GPS jitter
+- soaring by day: a correlated random walk with thermal circling and
+  altitude changes
+
+Encounters are injected by moving one bird next to another for a while, so
+proximity analysis finds a controllable number of events.
+
+Output files match the collar CSV format read by ``DataLoader``:
+``Timestamp [UTC];Longitude;Latitude;Height;display``.
+
+Usage:
+    python -m utils.synthetic_tracks --birds 5 --days 7 --interval 60 --out data/synthetic
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.gps.constants import CSV_SEPARATOR, TIMESTAMP_FORMAT
+
+
+# Meters per degree latitude (spherical approximation)
+_METERS_PER_DEG = 111_320.0
+
+
+@dataclass
+class SyntheticTrackConfig:
+    """Parameters of a synthetic dataset"""
+    n_birds: int = 2
+    duration_hours: float = 24.0
+    fix_interval_seconds: int = 120
+    encounters_per_day: float = 2.0
+    encounter_minutes: float = 20.0
+    start_time: str = '2024-06-15 00:00:00'
+    center_lat: float = 47.60
+    center_lon: float = 12.98
+    home_range_km: float = 15.0
+    roost_start_hour: int = 19
+    roost_end_hour: int = 5
+    seed: int = 42
+
+    @property
+    def points_per_bird(self) -> int:
+        return int(self.duration_hours * 3600 // self.fix_interval_seconds) + 1
+
+
+def _bird_track(rng: np.random.Generator, times: pd.DatetimeIndex,
+                cfg: SyntheticTrackConfig) -> Dict[str, np.ndarray]:
+    """Simulate one bird: positions in meters relative to the dataset center"""
+    n = len(times)
+    dt = float(cfg.fix_interval_seconds)
+    hours = times.hour.to_numpy()
+    if cfg.roost_start_hour > cfg.roost_end_hour:
+        roosting = (hours >= cfg.roost_start_hour) | (hours < cfg.roost_end_hour)
+    else:
+        roosting = (hours >= cfg.roost_start_hour) & (hours < cfg.roost_end_hour)
+
+    home_range_m = cfg.home_range_km * 1000.0
+    roost = rng.uniform(-0.5, 0.5, size=2) * home_range_m
+
+    # Correlated random walk for soaring flight
+    heading = np.cumsum(rng.normal(0.0, 0.35, size=n)) + rng.uniform(0, 2 * np.pi)
+    speed = np.clip(rng.normal(9.0, 3.0, size=n), 0.0, 22.0)
+    # Thermal circling: periodic tight turns superimposed on the heading
+    heading += 2.5 * np.sin(np.arange(n) * dt / 180.0) * (rng.random(n) < 0.4)
+    step_x = np.where(roosting, 0.0, speed * dt * np.cos(heading))
+    step_y = np.where(roosting, 0.0, speed * dt * np.sin(heading))
+
+    # Each soaring bout starts at the roost: cumulative steps minus the
+    # cumulative sum at the last roosting fix
+    index = np.arange(n)
+    last_roost = np.maximum.accumulate(np.where(roosting, index, -1))
+    cum_x = np.cumsum(step_x)
+    cum_y = np.cumsum(step_y)
+    base_x = np.where(last_roost >= 0, cum_x[np.clip(last_roost, 0, None)], 0.0)
+    base_y = np.where(last_roost >= 0, cum_y[np.clip(last_roost, 0, None)], 0.0)
+    off_x = cum_x - base_x
+    off_y = cum_y - base_y
+
+    # Keep birds inside their home range with a smooth radial squash
+    distance = np.hypot(off_x, off_y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.where(distance > 0, home_range_m * np.tanh(distance / home_range_m) / distance, 1.0)
+    jitter = rng.normal(0.0, 8.0, size=(2, n)) * roosting
+    x = roost[0] + off_x * scale + jitter[0]
+    y = roost[1] + off_y * scale + jitter[1]
+
+    ground = 700.0 + 400.0 * np.sin(x / 3000.0) * np.cos(y / 4000.0)
+    climb = np.clip(np.cumsum(rng.normal(0.0, 25.0, size=n)), -600.0, 1800.0)
+    height = np.where(roosting, ground + rng.normal(0.0, 3.0, size=n), ground + 800.0 + np.abs(climb))
+    return {'x': x, 'y': y, 'height': height, 'roosting': roosting}
+
+
+def _inject_encounters(rng: np.random.Generator, tracks: List[Dict[str, np.ndarray]],
+                       cfg: SyntheticTrackConfig) -> int:
+    """Move pairs of birds next to each other during random daytime windows"""
+    if len(tracks) < 2:
+        return 0
+    n = len(tracks[0]['x'])
+    length = max(1, int(cfg.encounter_minutes * 60 // cfg.fix_interval_seconds))
+    n_encounters = int(round(cfg.encounters_per_day * cfg.duration_hours / 24.0))
+    injected = 0
+    for _ in range(n_encounters):
+        if n <= length:
+            break
+        a, b = rng.choice(len(tracks), size=2, replace=False)
+        start = int(rng.integers(0, n - length))
+        window = slice(start, start + length)
+        if tracks[a]['roosting'][window].any():
+            continue
+        # Smoothly blend bird b onto a course ~100-300 m next to bird a
+        offset = rng.normal(0.0, 150.0, size=2)
+        blend = np.sin(np.linspace(0.0, np.pi, length))
+        for key, off in (('x', offset[0]), ('y', offset[1])):
+            target = tracks[a][key][window] + off
+            tracks[b][key][window] = (1 - blend) * tracks[b][key][window] + blend * target
+        tracks[b]['height'][window] = (1 - blend) * tracks[b]['height'][window] + blend * tracks[a]['height'][window]
+        injected += 1
+    return injected
+
+
+def generate_tracks(cfg: SyntheticTrackConfig) -> List[pd.DataFrame]:
+    """
+    Generate synthetic collar tracks
+
+    Args:
+        cfg: Dataset configuration
+
+    Returns:
+        One DataFrame per bird with collar columns (timestamps as datetimes)
+    """
+    rng = np.random.default_rng(cfg.seed)
+    times = pd.date_range(cfg.start_time, periods=cfg.points_per_bird,
+                          freq=pd.Timedelta(seconds=cfg.fix_interval_seconds))
+    tracks = [_bird_track(rng, times, cfg) for _ in range(cfg.n_birds)]
+    _inject_encounters(rng, tracks, cfg)
+
+    meters_per_deg_lon = _METERS_PER_DEG * np.cos(np.radians(cfg.center_lat))
+    dataframes = []
+    for track in tracks:
+        dataframes.append(pd.DataFrame({
+            'Timestamp [UTC]': times,
+            'Longitude': cfg.center_lon + track['x'] / meters_per_deg_lon,
+            'Latitude': cfg.center_lat + track['y'] / _METERS_PER_DEG,
+            'Height': np.round(track['height']).astype(int),
+            'display': 1,
+        }))
+    return dataframes
+
+
+def write_collar_csvs(dataframes: List[pd.DataFrame], out_dir: str,
+                      prefix: str = 'synthetic_vulture') -> List[str]:
+    """
+    Write tracks as collar-format CSV files
+
+    Returns:
+        List of written file paths
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i, df in enumerate(dataframes, 1):
+        out = df.copy()
+        out['Timestamp [UTC]'] = out['Timestamp [UTC]'].dt.strftime(TIMESTAMP_FORMAT)
+        path = os.path.join(out_dir, f'{prefix}_{i:02d}.csv')
+        out.to_csv(path, sep=CSV_SEPARATOR, index=False)
+        paths.append(path)
+    return paths
+
+
+def generate_dataset(out_dir: str, cfg: Optional[SyntheticTrackConfig] = None) -> List[str]:
+    """Generate tracks for ``cfg`` and write them to ``out_dir``"""
+    return write_collar_csvs(generate_tracks(cfg or SyntheticTrackConfig()), out_dir)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic collar-format GPS tracks")
+    parser.add_argument('--out', required=True, help="Output directory for the CSV files")
+    parser.add_argument('--birds', type=int, default=2, help="Number of birds")
+    parser.add_argument('--days', type=float, default=1.0, help="Duration in days")
+    parser.add_argument('--interval', type=int, default=120, help="Fix interval in seconds")
+    parser.add_argument('--encounters-per-day', type=float, default=2.0, help="Injected encounters per day")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    args = parser.parse_args(argv)
+
+    cfg = SyntheticTrackConfig(
+        n_birds=args.birds,
+        duration_hours=args.days * 24.0,
+        fix_interval_seconds=args.interval,
+        encounters_per_day=args.encounters_per_day,
+        seed=args.seed,
+    )
+    paths = generate_dataset(args.out, cfg)
+    print(f"✅ Wrote {len(paths)} files with {cfg.points_per_bird:,} fixes each to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""
+Terrain mesh sizing and decimation for the 3D terrain surface.
+
+- resolution_for_budget: grid resolution from a vertex budget, never finer
+  than the elevation source resolution
+- decimate_terrain_grid: drops grid rows / columns that linear
+  interpolation between their neighbours reproduces within a tolerance
+  (flat areas), leaving a non-uniform rectilinear grid that plotly's
+  Surface trace draws as is
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+
+# Spacing of the SRTM 3 arc-second data behind the Open Elevation API
+DEFAULT_MIN_SPACING_M = 90.0
+MIN_RESOLUTION = 20
+
+
+def resolution_for_budget(height_km: float, width_km: float, vertex_budget: int,
+                          min_spacing_m: float = DEFAULT_MIN_SPACING_M) -> int:
+    """
+    Square grid resolution for an area
+
+    Args:
+        height_km, width_km: Extent of the area
+        vertex_budget: Maximum number of grid vertices (resolution ** 2)
+        min_spacing_m: Finest useful vertex spacing (source data resolution)
+
+    Returns:
+        Resolution between MIN_RESOLUTION and sqrt(vertex_budget)
+    """
+    budget_resolution = max(int(math.isqrt(max(vertex_budget, 0))), MIN_RESOLUTION)
+    extent_m = max(height_km, width_km) * 1000.0
+    source_resolution = int(extent_m / min_spacing_m) + 1 if min_spacing_m > 0 else budget_resolution
+    return max(MIN_RESOLUTION, min(budget_resolution, source_resolution))
+
+
+def _kept_lines(coords: np.ndarray, z: np.ndarray, tolerance: float) -> np.ndarray:
+    """Indices of the lines (along axis 0 of z) needed to interpolate z within tolerance"""
+    n = len(coords)
+    if n < 3:
+        return np.arange(n)
+    kept = [0]
+    anchor = 0
+    for end in range(2, n):
+        # Can the lines between anchor and end be skipped?
+        t = (coords[anchor + 1:end] - coords[anchor]) / (coords[end] - coords[anchor])
+        interpolated = z[anchor] + t[:, None] * (z[end] - z[anchor])
+        if np.max(np.abs(interpolated - z[anchor + 1:end])) > tolerance:
+            kept.append(end - 1)
+            anchor = end - 1
+    kept.append(n - 1)
+    return np.array(kept)
+
+
+def decimate_terrain_grid(lons: np.ndarray, lats: np.ndarray, elevations: np.ndarray,
+                          tolerance_m: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Remove terrain grid rows and columns in flat areas
+
+    Args:
+        lons, lats: Grid axes (elevations has shape (len(lats), len(lons)))
+        elevations: Terrain heights in meters
+        tolerance_m: Maximum vertical error of the decimated surface
+            (half of it per axis); 0 keeps the full grid
+
+    Returns:
+        (lons, lats, elevations) of the kept grid lines
+    """
+    if tolerance_m <= 0:
+        return lons, lats, elevations
+    elevations = np.asarray(elevations, dtype=np.float64)
+    rows = _kept_lines(np.asarray(lats, dtype=np.float64), elevations, tolerance_m / 2)
+    reduced = elevations[rows]
+    cols = _kept_lines(np.asarray(lons, dtype=np.float64), reduced.T, tolerance_m / 2)
+    return np.asarray(lons)[cols], np.asarray(lats)[rows], reduced[:, cols]